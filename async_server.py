@@ -0,0 +1,319 @@
+# async_server.py
+# Asyncio serving mode for large design reviews. Socket.IO runs on an event loop (ASGI under
+# uvicorn) with viewers grouped into rooms. The Flask routes from server.py are mounted
+# unchanged, each request on its own pool thread with the body streamed in both directions.
+# Usage: python async_server.py [port]
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import socketio
+import uvicorn
+from werkzeug.exceptions import ClientDisconnected
+from werkzeug.wsgi import FileWrapper
+
+import server
+
+# Publications arriving within this window go out as one batch, newest payload per export
+BATCH_WINDOW = 0.05
+# Viewers get a notify-to-fetch window to spread downloads over; it grows with the room
+FETCH_SPREAD_PER_VIEWER_MS = 4
+MAX_FETCH_SPREAD_MS = 4000
+# Threads running Flask requests; each download or upload holds one while it streams
+HTTP_WORKERS = 64
+# Block size for files Flask sends; each block is one hop from the worker to the loop
+FILE_BLOCK_SIZE = 1 << 20
+# Room every viewer joins unless it asks for others: the export folder being watched
+DEFAULT_ROOM = os.path.basename(server.EXPORTS_FOLDER)
+
+broadcast_delay = server.metrics.histogram('b2t_broadcast_delay_seconds',
+                                           'Watcher handoff to the fan-out of its batch finishing')
+broadcast_batch = server.metrics.histogram('b2t_broadcast_batch_size', 'Publications gathered per batch',
+                                           buckets=(1, 2, 5, 10, 20, 50, 100))
+
+
+def rooms_for(payload):
+    # An export is announced to its folder's room and to viewers pinned to that file
+    rooms = [DEFAULT_ROOM]
+    if isinstance(payload, dict) and 'filename' in payload:
+        rooms.append(f"file:{payload['filename']}")
+    return rooms
+
+
+class RoomBroadcaster:
+    # Carries publications from any thread onto the event loop and fans them out per room.
+    # publish() never blocks the caller: it schedules a queue put on the loop and returns.
+    # The loop gathers everything published within batch_window, keeps the newest payload
+    # per (event, rooms, filename) -- viewers fall back to a full load when a delta's base
+    # was skipped -- and sends each once with a fetch window sized to its audience, so a
+    # room of hundreds does not hit the HTTP side in the same instant.
+    def __init__(self, sio, batch_window=BATCH_WINDOW):
+        self.sio = sio
+        self.batch_window = batch_window
+        self.loop = None
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._task = self.loop.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def publish(self, event, payload, rooms=None):
+        # Thread-safe; this is the emit the watcher thread is given
+        item = (time.perf_counter(), event, payload, tuple(rooms or rooms_for(payload)))
+        self.loop.call_soon_threadsafe(self._queue.put_nowait, item)
+
+    def viewers(self, rooms):
+        return sum(1 for _ in self.sio.manager.get_participants('/', list(rooms)))
+
+    def fetch_window_ms(self, viewers):
+        return min(MAX_FETCH_SPREAD_MS, max(viewers - 1, 0) * FETCH_SPREAD_PER_VIEWER_MS)
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(self.batch_window)
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._fan_out(batch)
+            except Exception as e:
+                print(f'[broadcast] Failed to send batch of {len(batch)}: {e}')
+
+    async def _fan_out(self, batch):
+        broadcast_batch.observe(len(batch))
+        latest = {}
+        for published, event, payload, rooms in batch:
+            filename = payload.get('filename') if isinstance(payload, dict) else None
+            latest[(event, rooms, filename)] = payload
+        for (event, rooms, _), payload in latest.items():
+            viewers = self.viewers(rooms)
+            if not viewers:
+                continue
+            message = payload
+            if isinstance(payload, dict):
+                message = dict(payload, fetch_window_ms=self.fetch_window_ms(viewers))
+            start = time.perf_counter()
+            await self.sio.emit(event, message, to=list(rooms))
+            server.socket_emit.observe(time.perf_counter() - start, event)
+            server.socket_emit_bytes.observe(len(json.dumps(message, separators=(',', ':'))), event)
+        done = time.perf_counter()
+        for published, *_ in batch:
+            broadcast_delay.observe(done - published)
+
+
+class RequestBody:
+    # wsgi.input for one request: pulls body messages off the connection as the app reads,
+    # so an upload is validated while it streams in rather than spooled first
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._buffer = bytearray()
+        self._more = True
+
+    def _fill(self):
+        message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+        if message['type'] == 'http.disconnect':
+            self._more = False
+            raise ClientDisconnected()
+        self._buffer += message.get('body', b'')
+        self._more = message.get('more_body', False)
+
+    def _take(self, size):
+        if size < 0 or size >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return data
+
+    def read(self, size=-1):
+        # Returns what has arrived (at least one byte) rather than waiting for size bytes
+        while self._more and (size is None or size < 0 or not self._buffer):
+            self._fill()
+        return self._take(-1 if size is None else size)
+
+    def readline(self, size=-1):
+        while self._more and b'\n' not in self._buffer and (size < 0 or len(self._buffer) < size):
+            self._fill()
+        end = self._buffer.find(b'\n') + 1 or len(self._buffer)
+        return self._take(end if size < 0 else min(end, size))
+
+    def __iter__(self):
+        return iter(self.readline, b'')
+
+
+class ThreadedWSGI:
+    # ASGI app running a WSGI app with one pool thread per request in flight (asgiref's
+    # adapter funnels every request through a single thread). Response chunks go out as the
+    # app yields them and each waits for the socket, so a slow client holds up its own
+    # thread and nothing else; a watcher notices disconnects so abandoned downloads stop.
+    def __init__(self, app, workers=HTTP_WORKERS):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._handle, scope, receive, send, loop)
+
+    def _environ(self, scope, body):
+        server_name, server_port = scope.get('server') or ('localhost', 80)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf8').decode('latin1'),
+            'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin1'),
+            'SERVER_NAME': server_name,
+            'SERVER_PORT': str(server_port),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.input_terminated': True,  # Chunked uploads carry no Content-Length; the body ends itself
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+            'wsgi.file_wrapper': lambda f, block_size=FILE_BLOCK_SIZE: FileWrapper(f, max(block_size, FILE_BLOCK_SIZE)),
+        }
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin1').upper().replace('-', '_')
+            key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f'HTTP_{name}'
+            value = value.decode('latin1')
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+        return environ
+
+    def _handle(self, scope, receive, send, loop):
+        body = RequestBody(receive, loop)
+        started = []
+        disconnected = threading.Event()
+        watcher = None
+
+        def call(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and started:
+                raise exc_info[1].with_traceback(exc_info[2])
+            started[:] = [int(status.split(' ', 1)[0]),
+                          [(k.lower().encode('latin1'), v.encode('latin1')) for k, v in headers]]
+
+        async def watch():
+            # Whatever body the app left unread is drained; only a disconnect matters here
+            while body._more:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    disconnected.set()
+                    return
+                body._more = message.get('more_body', False)
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            disconnected.set()
+
+        result = self.app(self._environ(scope, body), start_response)
+        try:
+            for chunk in result:
+                if watcher is None:
+                    watcher = asyncio.run_coroutine_threadsafe(watch(), loop)
+                    call({'type': 'http.response.start', 'status': started[0], 'headers': started[1]})
+                if disconnected.is_set():
+                    return
+                if chunk:
+                    call({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if watcher is None:
+                call({'type': 'http.response.start', 'status': started[0], 'headers': started[1]})
+            call({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            if hasattr(result, 'close'):
+                result.close()
+
+
+sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
+broadcaster = RoomBroadcaster(sio)
+
+
+def _requested_rooms(value):
+    # Rooms as a list or a comma-separated string; anything else asks for none
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, (list, tuple)):
+        return []
+    return [room.strip() for room in value if isinstance(room, str) and room.strip()]
+
+
+def unknown_rooms(rooms):
+    # Announcements only go to rooms_for() rooms: the folder room and file:<name> rooms
+    return [room for room in rooms if room != DEFAULT_ROOM and not (room.startswith('file:') and room[5:])]
+
+
+@sio.event
+async def connect(sid, environ, auth=None):
+    # Rooms come from the auth payload or a ?room=a,b query; the folder room otherwise.
+    # A room nothing is published to is refused rather than left silently empty.
+    rooms = _requested_rooms(auth.get('rooms') if isinstance(auth, dict) else None)
+    if not rooms:
+        rooms = _requested_rooms(parse_qs(environ.get('QUERY_STRING', '')).get('room', [''])[0])
+    unknown = unknown_rooms(rooms)
+    if unknown:
+        raise socketio.exceptions.ConnectionRefusedError(
+            f"Unknown rooms {', '.join(unknown)}; use {DEFAULT_ROOM} or file:<export name>")
+    for room in rooms or [DEFAULT_ROOM]:
+        await sio.enter_room(sid, room)
+    server.socket_clients.inc(1)
+
+
+@sio.event
+async def subscribe(sid, data):
+    # Switches a connected viewer to another set of rooms, given as {'rooms': ...} or bare
+    rooms = _requested_rooms(data.get('rooms') if isinstance(data, dict) else data) or [DEFAULT_ROOM]
+    unknown = unknown_rooms(rooms)
+    if unknown:
+        return {'error': f"Unknown rooms {', '.join(unknown)}"}
+    for room in sio.rooms(sid):
+        if room != sid:
+            await sio.leave_room(sid, room)
+    for room in rooms:
+        await sio.enter_room(sid, room)
+    return {'rooms': rooms}
+
+
+@sio.event
+async def disconnect(sid, *args):
+    server.socket_clients.inc(-1)
+
+
+def create_app(watch=True):
+    # ASGI app: Socket.IO on the loop, everything else handed to the Flask app on the pool
+    async def startup():
+        broadcaster.start()
+        if watch:
+            threading.Thread(target=server.start_watcher, args=(broadcaster.publish,), daemon=True).start()
+
+    return socketio.ASGIApp(sio, other_asgi_app=ThreadedWSGI(server.app), on_startup=startup,
+                            on_shutdown=broadcaster.stop)
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    uvicorn.run(create_app(), port=port, log_level='warning')
@@ -0,0 +1,200 @@
+# benchmarks/bench_broadcast.py
+# Load harness for the async server: N Socket.IO viewers in one room receive a series of
+# model_updated announcements published from a plain thread (as the watcher does), then
+# two fetch rounds in which every viewer downloads the announced export over HTTP -- once
+# straight away and once after a random slice of the fetch window. Reports publish-to-
+# receive latency percentiles, server CPU per broadcast, notify-to-last-byte fetch times,
+# and how long /models takes to answer while the downloads are running.
+# The server runs in its own process so its CPU time is measured apart from the clients.
+# Usage: python benchmarks/bench_broadcast.py [updates] [fetch MB] [client counts...]
+import asyncio, json, os, random, shutil, socket, subprocess, sys, tempfile, threading, time
+
+import aiohttp
+import numpy as np
+import socketio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+from builders import write_glb
+
+UPDATE_INTERVAL = 0.25
+CONNECT_CONCURRENCY = 50
+FETCH_ROUNDS = ('immediate', 'jittered')
+FETCH_TIMEOUT = 300
+PROBE_INTERVAL = 0.05
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def serve(port, clients, updates, fetch_bytes):
+    # Server process: waits for every viewer, publishes, runs the fetch rounds (each ends
+    # when every viewer reports its download done), then reports its own CPU time
+    import uvicorn
+    import async_server
+    import server
+    from export_catalog import ExportCatalog
+
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, 'assembly.glb')
+    write_glb(path, fetch_bytes)
+    server.EXPORTS_FOLDER = folder
+    server.catalog = ExportCatalog(folder)
+    entry = server.catalog.update(path)
+    config = uvicorn.Config(async_server.create_app(watch=False), port=port, log_level='error')
+    uvicorn_server = uvicorn.Server(config)
+    payload = {'filename': entry.filename, 'size': entry.size, 'url': server.model_url(entry),
+               'delta': {'added': [], 'removed': [], 'changed': [{'node': '/root/part_17', 'mesh': 17}],
+                         'transform_only': [], 'renumbered': False, 'delta_bytes': 240_000,
+                         'full_bytes': entry.size, 'previous_hash': '0122'}}
+    fetched = []
+
+    @async_server.sio.on('fetched')
+    async def on_fetched(sid, mode):
+        fetched.append(mode)
+
+    def publisher():
+        while async_server.broadcaster.viewers([async_server.DEFAULT_ROOM]) < clients:
+            time.sleep(0.05)
+        time.sleep(0.5)
+        cpu, wall = time.process_time(), time.perf_counter()
+        for i in range(updates):
+            async_server.broadcaster.publish('model_updated', dict(payload, hash=f'{i:04d}', sent_at=time.time()))
+            time.sleep(UPDATE_INTERVAL)
+        time.sleep(1.0)
+        report = {'cpu': time.process_time() - cpu, 'wall': time.perf_counter() - wall}
+        for mode in FETCH_ROUNDS:
+            async_server.broadcaster.publish('model_updated', dict(payload, hash=entry.hash, sent_at=time.time(),
+                                                                   fetch=mode))
+            deadline = time.perf_counter() + FETCH_TIMEOUT
+            while fetched.count(mode) < clients and time.perf_counter() < deadline:
+                time.sleep(0.05)
+            time.sleep(0.5)
+        print(json.dumps(report), flush=True)
+        uvicorn_server.should_exit = True
+
+    threading.Thread(target=publisher, daemon=True).start()
+    uvicorn_server.run()
+    shutil.rmtree(folder, ignore_errors=True)
+
+async def viewers(port, clients, updates):
+    base = f'http://127.0.0.1:{port}'
+    latencies, windows = [], []
+    fetches = {mode: [] for mode in FETCH_ROUNDS}  # (seconds from notify to last byte, complete)
+    probes = {mode: [] for mode in FETCH_ROUNDS}  # /models response times during the round
+    round_mode = [None]
+    done = asyncio.Event()
+    semaphore = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    sockets, tasks = [], []
+    session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0),
+                                    timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT))
+
+    async def fetch(client, update):
+        mode = update['fetch']
+        if mode == 'jittered':
+            await asyncio.sleep(random.uniform(0, update.get('fetch_window_ms', 0)) / 1e3)
+        size = 0
+        try:
+            async with session.get(base + update['url']) as response:
+                async for chunk in response.content.iter_chunked(1 << 20):
+                    size += len(chunk)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        fetches[mode].append((time.time() - update['sent_at'], size == update['size']))
+        await client.emit('fetched', mode)
+        if all(len(results) >= clients for results in fetches.values()):
+            done.set()
+
+    async def connect():
+        client = socketio.AsyncClient(reconnection=False)
+
+        @client.on('model_updated')
+        def received(update):
+            if update.get('fetch'):
+                round_mode[0] = update['fetch']
+                tasks.append(asyncio.ensure_future(fetch(client, update)))
+                return
+            latencies.append(time.time() - update['sent_at'])
+            windows.append(update.get('fetch_window_ms', 0))
+
+        async with semaphore:
+            await client.connect(base, transports=['websocket'], wait_timeout=30)
+        sockets.append(client)
+
+    async def probe():
+        # Another user browsing the history while the room downloads
+        while not done.is_set():
+            if round_mode[0]:
+                start = time.perf_counter()
+                try:
+                    async with session.get(base + '/models') as response:
+                        await response.read()
+                    probes[round_mode[0]].append(time.perf_counter() - start)
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    pass
+            await asyncio.sleep(PROBE_INTERVAL)
+
+    await asyncio.gather(*(connect() for _ in range(clients)))
+    prober = asyncio.ensure_future(probe())
+    try:
+        await asyncio.wait_for(done.wait(), timeout=updates * UPDATE_INTERVAL + 2 * FETCH_TIMEOUT)
+    except asyncio.TimeoutError:
+        pass
+    done.set()
+    await prober
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.gather(*(client.disconnect() for client in sockets), return_exceptions=True)
+    await session.close()
+    return np.array(latencies), windows, fetches, probes
+
+def run(clients, updates, fetch_bytes):
+    port = free_port()
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', str(port), str(clients),
+                                str(updates), str(fetch_bytes)],
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, cwd=ROOT)
+    for _ in range(200):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    latencies, windows, fetches, probes = asyncio.run(viewers(port, clients, updates))
+    report = None
+    for line in process.stdout:
+        if line.startswith('{'):
+            report = json.loads(line)
+    process.wait(timeout=30)
+    received = len(latencies) / (clients * updates)
+    p50, p95, p99 = (np.percentile(latencies, q) * 1e3 for q in (50, 95, 99)) if len(latencies) else (0, 0, 0)
+    cpu = report['cpu'] / updates * 1e3 if report else float('nan')
+    busy = report['cpu'] / report['wall'] if report else float('nan')
+    window = max(windows) if windows else 0
+    row = (f'{clients:>6}  {received:>8.1%}  {p50:>8.1f}  {p95:>8.1f}  {p99:>8.1f}  {cpu:>10.2f}  {busy:>6.1%}  '
+           f'{window:>7}')
+    for mode in FETCH_ROUNDS:
+        times = np.array([seconds for seconds, complete in fetches[mode] if complete])
+        fetch_p50, fetch_p99 = (np.percentile(times, q) for q in (50, 99)) if len(times) else (0, 0)
+        models = np.percentile(probes[mode], 99) * 1e3 if probes[mode] else float('nan')
+        print(f'{row}  {mode:>9}  {len(times) / clients:>7.1%}  {fetch_p50:>7.2f}  {fetch_p99:>7.2f}  '
+              f'{models:>14.1f}')
+
+def main():
+    if sys.argv[1:2] == ['--serve']:
+        serve(int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4]), int(sys.argv[5]))
+        return
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    fetch_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    counts = [int(c) for c in sys.argv[3:]] or [10, 100, 1000]
+    print(f'{updates} updates every {UPDATE_INTERVAL * 1e3:.0f} ms; latency is publish (watcher thread) to receipt, '
+          f'including the batch window; then every viewer fetches the {fetch_mb} MB export, immediately and '
+          f'jittered over the window; clients share this machine\'s CPU')
+    print(f'{"viewers":>6}  {"received":>8}  {"p50 ms":>8}  {"p95 ms":>8}  {"p99 ms":>8}  {"cpu ms/upd":>10}  '
+          f'{"server":>6}  {"window":>7}  {"fetch":>9}  {"fetched":>7}  {"p50 s":>7}  {"p99 s":>7}  '
+          f'{"/models p99 ms":>14}')
+    for clients in counts:
+        run(clients, updates, fetch_mb << 20)
+
+if __name__ == '__main__':
+    main()
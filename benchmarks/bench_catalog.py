@@ -0,0 +1,55 @@
+# benchmarks/bench_catalog.py
+# Compares the old per-request directory scan in /latest-model with ExportCatalog lookups.
+# Usage: python benchmarks/bench_catalog.py [file_count]
+import os, sys, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from export_catalog import ExportCatalog
+
+def scan_latest(folder):
+    # The original /latest-model implementation
+    glbs = [f for f in os.listdir(folder) if f.endswith('.glb')]
+    return max(glbs, key=lambda f: os.path.getmtime(os.path.join(folder, f)))
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    with tempfile.TemporaryDirectory() as folder:
+        now = time.time()
+        for i in range(count):
+            path = os.path.join(folder, f'model_{i:06d}.glb')
+            with open(path, 'wb') as f:
+                f.write(b'glTF')
+            os.utime(path, (now - count + i, now - count + i))
+
+        catalog = ExportCatalog(folder)
+        seed_time, _ = timed(catalog.seed, 1)
+        scan_time, scanned = timed(lambda: scan_latest(folder), 20)
+        lookup_time, entry = timed(catalog.latest, 100_000)
+        page_time, _ = timed(lambda: catalog.page(offset=count // 2, limit=50), 10_000)
+        assert scanned == entry.filename
+
+        # Incremental churn: rename and delete the newest file, then add a new one
+        newest = os.path.join(folder, entry.filename)
+        renamed = os.path.join(folder, 'renamed.glb')
+        os.rename(newest, renamed)
+        catalog.move(newest, renamed)
+        assert catalog.latest().filename == scan_latest(folder) == 'renamed.glb'
+        os.remove(renamed)
+        catalog.remove(renamed)
+        assert catalog.latest().filename == scan_latest(folder)
+
+        print(f'files:              {count}')
+        print(f'catalog seed:       {seed_time * 1e3:9.2f} ms (once at startup)')
+        print(f'directory scan:     {scan_time * 1e3:9.2f} ms per /latest-model')
+        print(f'catalog.latest():   {lookup_time * 1e6:9.2f} us per /latest-model')
+        print(f'catalog.page(50):   {page_time * 1e6:9.2f} us per /models page')
+        print(f'speedup:            {scan_time / lookup_time:9.0f}x')
+
+if __name__ == '__main__':
+    main()
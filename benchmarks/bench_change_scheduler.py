@@ -0,0 +1,71 @@
+# benchmarks/bench_change_scheduler.py
+# Drives ChangeScheduler with a synthetic exporter that flushes GLBs in chunks and reports
+# write-complete -> callback latency, checking that interleaved writes are never dropped.
+# Usage: python benchmarks/bench_change_scheduler.py
+import os, struct, sys, tempfile, threading, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from change_scheduler import ChangeScheduler
+
+def write_glb_in_chunks(path, size, chunks, pause):
+    # Header first, then the body in flushed chunks like a slow exporter
+    body = os.urandom(size - 12)
+    step = max(len(body) // chunks, 1)
+    with open(path, 'wb') as f:
+        f.write(b'glTF' + struct.pack('<II', 2, size))
+        f.flush()
+        for i in range(0, len(body), step):
+            f.write(body[i:i + step])
+            f.flush()
+            os.fsync(f.fileno())
+            time.sleep(pause)
+    return time.monotonic()
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        fired = {}
+        done = threading.Event()
+        expected = 10
+
+        def on_settled(path):
+            fired.setdefault(path, []).append(time.monotonic())
+            if len(fired) == expected:
+                done.set()
+
+        scheduler = ChangeScheduler(on_settled).start()
+        finished = {}
+
+        def writer(i):
+            path = os.path.join(folder, f'model_{i}.glb')
+            # Each file is touched on every flush, the way watchdog reports modified events
+            stop = threading.Event()
+            def touch_loop():
+                while not stop.is_set():
+                    scheduler.touch(path)
+                    time.sleep(0.01)
+            toucher = threading.Thread(target=touch_loop)
+            toucher.start()
+            finished[path] = write_glb_in_chunks(path, 4 << 20, chunks=16, pause=0.01)
+            stop.set()
+            toucher.join()
+            scheduler.touch(path)
+
+        # Ten files written concurrently, all inside the old 0.5 s debounce window
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(expected)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        done.wait(10)
+        scheduler.stop()
+
+        latencies = sorted((fired[p][0] - finished[p]) * 1e3 for p in finished if p in fired)
+        print(f'files written:   {expected}')
+        print(f'callbacks fired: {sum(len(v) for v in fired.values())} (old debounce: 1 of {expected})')
+        print(f'premature fires: {sum(1 for p in fired if fired[p][0] < finished[p])}')
+        print(f'latency after last byte: min {latencies[0]:.1f} ms, '
+              f'median {latencies[len(latencies) // 2]:.1f} ms, max {latencies[-1]:.1f} ms')
+        print('old path: 0.5 s debounce + 1.0 s client setTimeout ~ 1500 ms')
+
+if __name__ == '__main__':
+    main()
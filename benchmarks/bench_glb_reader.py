@@ -0,0 +1,69 @@
+# benchmarks/bench_glb_reader.py
+# Memory and time for reading positions out of a large GLB: GLTFDocument (mmap + NumPy views)
+# against a naive read() + json.loads + struct.unpack baseline. Each method runs in its own
+# process so peak RSS is measured independently.
+# Usage: python benchmarks/bench_glb_reader.py [size_mb]
+import json, os, resource, struct, subprocess, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def write_synthetic_glb(path, size_mb):
+    # One float32 VEC3 POSITION accessor filling the BIN chunk
+    import numpy as np
+    count = size_mb * (1 << 20) // 12
+    positions = np.random.default_rng(0).random((count, 3), dtype=np.float32)
+    gltf = {
+        'asset': {'version': '2.0'},
+        'buffers': [{'byteLength': positions.nbytes}],
+        'bufferViews': [{'buffer': 0, 'byteLength': positions.nbytes}],
+        'accessors': [{'bufferView': 0, 'componentType': 5126, 'count': count, 'type': 'VEC3'}],
+        'meshes': [{'primitives': [{'attributes': {'POSITION': 0}}]}],
+    }
+    doc = json.dumps(gltf).encode()
+    doc += b' ' * (-len(doc) % 4)
+    with open(path, 'wb') as f:
+        f.write(b'glTF' + struct.pack('<II', 2, 12 + 8 + len(doc) + 8 + positions.nbytes))
+        f.write(struct.pack('<II', len(doc), 0x4E4F534A) + doc)
+        f.write(struct.pack('<II', positions.nbytes, 0x004E4942))
+        positions.tofile(f)
+
+def naive(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    json_length = struct.unpack_from('<I', data, 12)[0]
+    gltf = json.loads(data[20:20 + json_length])
+    count = gltf['accessors'][0]['count']
+    bin_start = 20 + json_length + 8
+    values = struct.unpack_from(f'<{count * 3}f', data, bin_start)
+    return max(values[1::3])
+
+def mapped(path):
+    from glb_reader import GLTFDocument
+    with GLTFDocument(path) as doc:
+        return float(doc.accessor(0)[:, 1].max())
+
+def run_one(method, path):
+    start = time.perf_counter()
+    result = {'naive': naive, 'mapped': mapped}[method](path)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'time': elapsed, 'peak_mb': peak_kb / 1024, 'result': result}))
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--run':
+        run_one(sys.argv[2], sys.argv[3])
+        return
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'synthetic.glb')
+        write_synthetic_glb(path, size_mb)
+        print(f'synthetic GLB: {os.path.getsize(path) / (1 << 20):.0f} MB')
+        for method in ('naive', 'mapped'):
+            out = subprocess.run([sys.executable, __file__, '--run', method, path],
+                                 capture_output=True, text=True, check=True).stdout
+            stats = json.loads(out.strip().splitlines()[-1])
+            print(f'{method:7s} time {stats["time"]:7.3f} s   peak RSS {stats["peak_mb"]:8.1f} MB')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/bench_ingest.py
+# Export-to-notify latency of the two ways an export reaches viewers: written into the
+# watched folder (watchdog events, settle detection, then the announcement) versus streamed
+# to POST /ingest (validated and hashed in flight, announced on commit). A Socket.IO client
+# timestamps each model_updated and the model_delta that follows it: the exports carry real
+# meshes, so the digest and diff run as they would for a Blender export. The server runs in
+# its own process against a temporary exports folder, with the other post-export stages
+# (precompression, optimization, LODs) switched off since they run after the announcement.
+# tests/test_ingest.py checks that broken uploads are rejected.
+# Usage: python benchmarks/bench_ingest.py [sizes in MB...]
+import http.client, json, os, queue, socket, subprocess, sys, tempfile, time
+
+import socketio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+from builders import write_glb
+
+WRITE_CHUNK = 1 << 20
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def serve(port, folder):
+    import threading
+    import server
+    from export_catalog import ExportCatalog
+
+    server.EXPORTS_FOLDER = folder
+    server.catalog = ExportCatalog(folder)
+    server.process_export = lambda entry: None
+    threading.Thread(target=server.start_watcher, daemon=True).start()
+    server.socketio.run(server.app, port=port, allow_unsafe_werkzeug=True, log_output=False)
+
+def copy_into(source, dest):
+    # The watchdog path: the export lands in the folder a chunk at a time
+    with open(source, 'rb') as src, open(dest, 'wb') as f:
+        for chunk in iter(lambda: src.read(WRITE_CHUNK), b''):
+            f.write(chunk)
+    return time.perf_counter()
+
+def upload(port, source, filename):
+    # The /ingest path, sent chunked the way the Blender addon sends it
+    last_byte = [None]
+
+    def body():
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(WRITE_CHUNK), b''):
+                yield chunk
+        last_byte[0] = time.perf_counter()
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=600)
+    conn.request('POST', f'/ingest?filename={filename}', body=body(), encode_chunked=True,
+                 headers={'Content-Type': 'model/gltf-binary'})
+    response = conn.getresponse()
+    result = json.loads(response.read())
+    conn.close()
+    return response.status, result, last_byte[0]
+
+def wait_for(updates, event, key, value, timeout=600):
+    deadline = time.perf_counter() + timeout
+    while True:
+        name, received, payload = updates.get(timeout=max(deadline - time.perf_counter(), 0.001))
+        if name == event and payload[key] == value:
+            return received, payload
+
+def main():
+    if sys.argv[1:2] == ['--serve']:
+        serve(int(sys.argv[2]), sys.argv[3])
+        return
+    sizes = [int(s) for s in sys.argv[1:]] or [1, 10, 100, 1000]
+    with tempfile.TemporaryDirectory() as folder, tempfile.TemporaryDirectory() as scratch:
+        port = free_port()
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', str(port), folder],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=ROOT)
+        try:
+            updates = queue.Queue()
+            client = socketio.Client()
+            for event in ('model_updated', 'model_delta'):
+                client.on(event, lambda payload, event=event: updates.put((event, time.perf_counter(), payload)))
+            for _ in range(200):
+                try:
+                    client.connect(f'http://127.0.0.1:{port}', transports=['websocket'])
+                    break
+                except socketio.exceptions.ConnectionError:
+                    time.sleep(0.1)
+            else:
+                raise RuntimeError('server did not come up')
+            print('latency from the first byte written/sent, and from the last, to model_updated at a viewer,\n'
+                  'and from the last byte to the model_delta that follows it')
+            print(f'{"size MB":>8}  {"path":>8}  {"total ms":>10}  {"after last byte ms":>18}  {"delta ms":>10}')
+            for size_mb in sizes:
+                source = os.path.join(scratch, 'export.glb')
+                write_glb(source, size_mb << 20)
+                repeats = 3 if size_mb < 1000 else 1
+                for path_name in ('watchdog', 'ingest'):
+                    totals, tails, deltas = [], [], []
+                    for i in range(repeats):
+                        filename = f'{path_name}_{size_mb}_{i}.glb'
+                        start = time.perf_counter()
+                        if path_name == 'watchdog':
+                            last_byte = copy_into(source, os.path.join(folder, filename))
+                        else:
+                            status, result, last_byte = upload(port, source, filename)
+                            assert status == 201 and result['announced'], result
+                        received, update = wait_for(updates, 'model_updated', 'filename', filename)
+                        totals.append(received - start)
+                        tails.append(received - last_byte)
+                        if update['delta_pending']:
+                            delta_received, _ = wait_for(updates, 'model_delta', 'hash', update['hash'])
+                            deltas.append(delta_received - last_byte)
+                        os.remove(os.path.join(folder, filename))
+                        time.sleep(0.3)  # Let the delete event pass before the next export
+                    median = lambda values: sorted(values)[len(values) // 2] * 1e3 if values else float('nan')
+                    print(f'{size_mb:>8}  {path_name:>8}  {median(totals):>10.1f}  {median(tails):>18.1f}  '
+                          f'{median(deltas):>10.1f}')
+                os.remove(source)
+            client.disconnect()
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# benchmarks/bench_lod.py
+# Decimation throughput (triangles/s) of the LOD builder, serial and through a process pool,
+# and estimated time-to-first-geometry for the coarse levels versus the full export.
+# Usage: python benchmarks/bench_lod.py [grid_size] [bandwidth_mbit]
+import multiprocessing, os, sys, tempfile, time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests'))
+from builders import build_soup
+from glb_optimizer import optimize_glb
+from lod import build_lod_chain
+
+RATIOS = (0.25, 0.05)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    bandwidth = float(sys.argv[2]) if len(sys.argv) > 2 else 50.0  # Mbit/s to the viewer
+    with tempfile.TemporaryDirectory() as folder:
+        raw = os.path.join(folder, 'raw.glb')
+        source = os.path.join(folder, 'export.glb')
+        build_soup(raw, n)
+        optimize_glb(raw, source)  # Decimate the welded mesh, as the server would see after export
+        cache = os.path.join(folder, 'cache')
+
+        start = time.perf_counter()
+        levels = build_lod_chain(source, cache, 'serial', RATIOS)
+        serial = time.perf_counter() - start
+        source_triangles = levels[0]['source_triangles']
+        print(f'source: {source_triangles:,} triangles, {os.path.getsize(source) / (1 << 20):.1f} MB')
+        print(f'serial chain ({len(RATIOS)} levels): {serial:.2f} s, '
+              f'{source_triangles * len(RATIOS) / serial / 1e6:.2f} M input triangles/s')
+
+        workers = max(1, (os.cpu_count() or 2) // 2)
+        jobs = workers * 2
+        start = time.perf_counter()
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            list(pool.map(build_lod_chain, [source] * jobs, [cache] * jobs,
+                          [f'job{i}' for i in range(jobs)], [RATIOS] * jobs))
+        pooled = time.perf_counter() - start
+        print(f'process pool ({workers} workers, {jobs} exports): {pooled:.2f} s, '
+              f'{source_triangles * len(RATIOS) * jobs / pooled / 1e6:.2f} M input triangles/s (incl. spawn)')
+
+        print(f'\ntime to first geometry at {bandwidth:.0f} Mbit/s (transfer only):')
+        full_bytes = os.path.getsize(source)
+        for level in levels + [{'ratio': 1.0, 'triangles': source_triangles, 'bytes': full_bytes}]:
+            seconds = level['bytes'] * 8 / (bandwidth * 1e6)
+            print(f"  {level['ratio']:>5.0%}  {level['triangles']:>9,} tris  {level['bytes'] / 1024:>9.1f} KB  "
+                  f'{seconds * 1e3:>8.1f} ms')
+
+if __name__ == '__main__':
+    main()
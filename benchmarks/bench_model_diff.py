@@ -0,0 +1,40 @@
+# benchmarks/bench_model_diff.py
+# Builds a synthetic assembly, edits one part, moves another and deletes a third, and reports
+# digest time and mesh bytes a viewer fetches versus a full reload. The classification
+# itself is checked in tests/test_model_diff.py.
+# Usage: python benchmarks/bench_model_diff.py [parts] [vertices_per_part]
+import os, sys, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests'))
+from builders import build_assembly
+from model_diff import compute_digest, diff_digests, extract_mesh_glb
+
+def main():
+    parts = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    vertices = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    with tempfile.TemporaryDirectory() as folder:
+        v1 = os.path.join(folder, 'v1.glb')
+        v2 = os.path.join(folder, 'v2.glb')
+        build_assembly(v1, parts, vertices)
+        build_assembly(v2, parts, vertices, edited=7, moved=12, removed=20)
+
+        start = time.perf_counter()
+        d1 = compute_digest(v1)
+        digest_time = time.perf_counter() - start
+        d2 = compute_digest(v2)
+        delta = diff_digests(d1, d2)
+
+        mesh = extract_mesh_glb(v2, delta['changed'][0]['mesh'])
+
+        size = os.path.getsize(v2)
+        print(f'parts: {parts}, vertices/part: {vertices}, file: {size / (1 << 20):.1f} MB')
+        print(f'digest time:        {digest_time * 1e3:8.1f} ms')
+        print(f'delta: {len(delta["changed"])} changed, {len(delta["transform_only"])} moved, '
+              f'{len(delta["removed"])} removed, {len(delta["renumbered"])} renumbered')
+        print(f'full reload bytes:  {size:>12,}')
+        print(f'delta fetch bytes:  {len(mesh):>12,}')
+        print(f'saved:              {100 * (1 - len(mesh) / size):8.2f} %')
+
+if __name__ == '__main__':
+    main()
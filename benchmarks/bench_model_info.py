@@ -0,0 +1,59 @@
+# benchmarks/bench_model_info.py
+# /model-info latency: cold (first request for a content hash) against warm (LRU hit), and
+# the metadata-only computation against decoding every POSITION accessor for the bounds.
+# Runs on blender_exports/scene.gltf (whose scene.bin is not in the repo, so any decode there
+# would fail) and on a synthetic GLB assembly. tests/test_model_info.py checks the results.
+# Usage: python benchmarks/bench_model_info.py [parts] [vertices]
+import json, os, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+import server
+from builders import build_assembly, decoded_bounds
+from export_catalog import ExportCatalog
+from model_info import model_info
+
+WARM_REQUESTS = 200
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def request_latency(client, filename):
+    server._model_info.cache_clear()
+    response, cold = timed(client.get, f'/model-info/{filename}')
+    assert response.status_code == 200, response.status_code
+    start = time.perf_counter()
+    for _ in range(WARM_REQUESTS):
+        client.get(f'/model-info/{filename}')
+    warm = (time.perf_counter() - start) / WARM_REQUESTS
+    return json.loads(response.data), cold, warm
+
+def main():
+    parts = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    vertices = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    client = server.app.test_client()
+
+    info, cold, warm = request_latency(client, 'scene.gltf')
+    print(f"scene.gltf: {info['counts']['meshes']} meshes, {info['triangles']:,} triangles, "
+          f"{info['geometry_bytes'] / (1 << 20):.0f} MB geometry, {info['decoded_accessors']} accessors decoded")
+    print(f'  cold {cold * 1e3:.2f} ms, warm {warm * 1e3:.3f} ms per request')
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'assembly.glb')
+        build_assembly(path, parts, vertices)
+        server.catalog = ExportCatalog(folder)
+        server.catalog.seed()
+        server.catalog.latest().hash  # The server hashes exports when they are announced
+        info, cold, warm = request_latency(client, 'assembly.glb')
+        _, metadata = timed(model_info, path)
+        (low, high), decoded = timed(decoded_bounds, path)
+        print(f"\nassembly.glb: {parts} parts, {info['triangles']:,} triangles, "
+              f'{os.path.getsize(path) / (1 << 20):.0f} MB')
+        print(f'  cold {cold * 1e3:.2f} ms, warm {warm * 1e3:.3f} ms per request')
+        print(f'  bounds from accessor min/max {metadata * 1e3:.2f} ms vs decoding positions {decoded * 1e3:.2f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+# benchmarks/bench_optimizer.py
+# Runs optimize_glb on a synthetic unwelded export (triangle soup with float normals, colors
+# and UVs, like an unoptimized Blender export) and reports attribute error, size reduction
+# and vertex-cache miss ratio before/after. tests/test_glb_optimizer.py checks the tolerance.
+# Usage: python benchmarks/bench_optimizer.py [grid_size]
+import os, sys, tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests'))
+from builders import acmr, build_soup, corners
+from glb_optimizer import optimize_glb
+
+TOLERANCE = 0.005
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    with tempfile.TemporaryDirectory() as folder:
+        source = os.path.join(folder, 'export.glb')
+        dest = os.path.join(folder, 'export.opt.glb')
+        build_soup(source, n)
+        report = optimize_glb(source, dest, tolerance=TOLERANCE)
+
+        before, before_indices = corners(source)
+        after, after_indices = corners(dest)
+        for name in ('NORMAL', 'COLOR_0', 'TEXCOORD_0'):
+            error = np.abs(before[name] - after[name]).max()
+            print(f'{name:11s} max error {error:.6f} (tolerance {TOLERANCE})')
+
+        print(f'triangles:  {len(after_indices) // 3}')
+        print(f'vertices:   {report["vertices_before"]} -> {report["vertices_after"]}')
+        print(f'bytes:      {report["source_bytes"]:,} -> {report["optimized_bytes"]:,} '
+              f'({report["reduction"]:.1%} smaller)')
+        print(f'ACMR (32):  {acmr(before_indices):.3f} -> {acmr(after_indices):.3f}')
+        print(f'time:       {report["seconds"] * 1e3:.1f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_serving.py
+# Load test for model serving: N simulated viewers fetch the same export against a live
+# threaded server. Compares the old flow (HEAD + full identity GET) with the new one
+# (hash URL + brotli/gzip variant) and a reconnect that revalidates with If-None-Match.
+# Usage: python benchmarks/bench_serving.py [parts]
+import http.client, logging, os, sys, tempfile, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import make_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+import server
+from builders import build_assembly
+from export_catalog import ExportCatalog
+from precompress import Precompressor
+
+def fetch(port, method, path, headers):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    conn.request(method, path, headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    header_bytes = sum(len(k) + len(v) + 4 for k, v in response.getheaders())
+    etag = response.getheader('ETag')
+    conn.close()
+    return len(body) + header_bytes, etag
+
+def old_viewer(port, entry):
+    sent, _ = fetch(port, 'HEAD', f'/blender_exports/{entry.filename}', {})
+    body, _ = fetch(port, 'GET', f'/blender_exports/{entry.filename}', {})
+    return sent + body
+
+def new_viewer(port, entry):
+    wire, _ = fetch(port, 'GET', f'/exports/{entry.hash}/{entry.filename}', {'Accept-Encoding': 'br, gzip'})
+    return wire
+
+def reconnecting_viewer(port, entry):
+    wire, _ = fetch(port, 'GET', f'/blender_exports/{entry.filename}',
+                    {'Accept-Encoding': 'br, gzip', 'If-None-Match': f'"{entry.hash}-br"'})
+    return wire
+
+def run(port, viewer, entry, count):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(count, 32)) as pool:
+        total = sum(pool.map(lambda _: viewer(port, entry), range(count)))
+    elapsed = time.perf_counter() - start
+    return total, count / elapsed
+
+def main():
+    parts = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    with tempfile.TemporaryDirectory() as folder:
+        build_assembly(os.path.join(folder, 'model.glb'), parts, 5000)
+        server.catalog = ExportCatalog(folder)
+        server.catalog.seed()
+        server.precompressor = Precompressor(os.path.join(folder, '.cache'))
+        entry = server.catalog.latest()
+        server.precompressor.submit(entry.path, entry.hash).result()
+
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        httpd = make_server('127.0.0.1', 0, server.app, threaded=True)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        port = httpd.server_port
+        print(f'export: {entry.size / (1 << 20):.1f} MB')
+        print(f'{"viewers":>8} {"flow":>12} {"MB on wire":>12} {"req/s":>10}')
+        for count in (1, 50, 500):
+            for name, viewer in (('old', old_viewer), ('new', new_viewer), ('reconnect', reconnecting_viewer)):
+                wire, rate = run(port, viewer, entry, count)
+                print(f'{count:>8} {name:>12} {wire / (1 << 20):>12.2f} {rate:>10.1f}')
+        httpd.shutdown()
+
+if __name__ == '__main__':
+    main()
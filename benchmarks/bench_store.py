@@ -0,0 +1,55 @@
+# benchmarks/bench_store.py
+# Stores a run of exports where each edits one part of the same assembly, then reports raw
+# versus stored bytes, ingest and rebuild time per version, and what retention plus garbage
+# collection leaves behind. tests/test_export_store.py checks rebuilds are byte-exact.
+# Usage: python benchmarks/bench_store.py [exports] [parts] [vertices_per_part]
+import hashlib, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests'))
+from builders import build_assembly
+from export_store import ExportStore, RetentionPolicy
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+def main():
+    exports = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    parts = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    vertices = int(sys.argv[3]) if len(sys.argv) > 3 else 2_000
+    with tempfile.TemporaryDirectory() as folder:
+        store = ExportStore(os.path.join(folder, 'store'))
+        path = os.path.join(folder, 'assembly.glb')
+        raw, ingest_times, hashes = 0, [], []
+        for i in range(exports):
+            build_assembly(path, parts, vertices, edited=i % parts, moved=(i * 7) % parts)
+            content_hash = file_hash(path)
+            start = time.perf_counter()
+            store.ingest(path, content_hash, filename=f'model_{i:04d}.glb', mtime=float(i))
+            ingest_times.append(time.perf_counter() - start)
+            raw += os.path.getsize(path)
+            hashes.append(content_hash)
+        stored = store.disk_usage()
+        print(f'{exports} exports of {parts} parts x {vertices} vertices, one part edited and one moved each')
+        print(f'raw bytes:     {raw:>14,}')
+        print(f'store bytes:   {stored:>14,}  ({stored / raw:.1%} of raw)')
+        ingest_times.sort()
+        print(f'ingest:        {ingest_times[len(ingest_times) // 2] * 1e3:8.2f} ms median, '
+              f'{ingest_times[-1] * 1e3:.2f} ms max')
+
+        start = time.perf_counter()
+        for i in range(exports):
+            store.rebuild(hashes[i], os.path.join(folder, 'rebuilt.glb'))
+        print(f'rebuild:       {(time.perf_counter() - start) / exports * 1e3:8.2f} ms per version')
+
+        keep = max(exports // 10, 1)
+        dropped = store.apply_retention(RetentionPolicy(keep_last=keep))
+        start = time.perf_counter()
+        removed, freed = store.collect()
+        print(f'retention keep_last={keep}: dropped {len(dropped)} versions, collect removed {removed} objects '
+              f'in {(time.perf_counter() - start) * 1e3:.1f} ms, freed {freed:,} bytes, '
+              f'store now {store.disk_usage():,} bytes')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_vred_loader.py
+# Burst of exports through the VRED loader outside VRED: vrFileIO, vrNodeService,
+# vrMaterialService and friends are stubs with fixed step costs, installed into the loader
+# module's namespace the way VRED provides them. Compares the previous behaviour (every
+# settled file loaded in turn on the scheduler thread, materials updated across the whole
+# scene) with the latest-wins load worker and subtree-scoped material updates.
+# tests/test_vred_loader.py checks the same stubs end with one model and the newest export.
+# Usage: python benchmarks/bench_vred_loader.py [exports] [scene_materials]
+import contextlib, io, os, struct, sys, tempfile, threading, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests'))
+from vred_stubs import LOAD_SECONDS, PART_MATERIALS, PARTS, StubScene, install, vred_loader
+
+EXPORT_INTERVAL = 0.02
+
+def previous_update_scene(self, root=None):
+    # The loader's material pass before it was scoped: every material in the scene
+    for material in vred_loader.vrMaterialService.getAllMaterials():
+        material.setRoughness(vred_loader.MATERIAL_ROUGHNESS)
+        material.setMetallic(vred_loader.MATERIAL_METALLIC)
+
+def run(exports, scene_materials, previous):
+    scene = StubScene(scene_materials)
+    install(scene)
+    vred_loader.VREDModelHandler._current_model_node = None
+    done = threading.Event()
+    results = []
+
+    def loaded(path, timings):
+        results.append((path, timings, time.perf_counter()))
+        if path == last_path and 'refresh' in timings:
+            done.set()
+    handler = vred_loader.VREDModelHandler(on_loaded=loaded)
+    if previous:
+        # Loads ran inside the scheduler callback, one settled file after another
+        handler._update_scene = previous_update_scene.__get__(handler)
+        handler.scheduler.callback = handler._reload_model
+    handler.start()
+    with tempfile.TemporaryDirectory() as folder:
+        paths = [os.path.join(folder, f'model_{i:03d}.glb') for i in range(exports)]
+        last_path = paths[-1]
+        with contextlib.redirect_stdout(io.StringIO()):
+            for path in paths:
+                with open(path, 'wb') as f:
+                    f.write(struct.pack('<4sII', b'glTF', 2, 1024) + b'\0' * 1012)  # Settles as a complete GLB
+                handler.scheduler.touch(path)
+                time.sleep(EXPORT_INTERVAL)
+            written = time.perf_counter()
+            done.wait(exports * 2)
+            handler.stop()
+    final = [r for r in results if r[0] == last_path]
+    latency = final[-1][2] - written if final else float('nan')
+    materials = [t['materials'] for _, t, _ in results if 'materials' in t]
+    steps = {}
+    for _, timings, _ in results:
+        for name, seconds in timings.items():
+            steps.setdefault(name, []).append(seconds)
+    skipped = handler.worker.skipped
+    label = 'previous' if previous else 'latest-wins'
+    mean = lambda values: sum(values) / len(values) * 1e3 if values else 0.0
+    print(f'{label:>12}  {scene.loads:>6}  {skipped:>8}  {latency * 1e3:>14.0f}  {mean(materials):>14.2f}  '
+          + '  '.join(f'{name} {mean(values):.1f}' for name, values in steps.items()))
+
+def main():
+    exports = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    scene_materials = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    print(f'{exports} exports {EXPORT_INTERVAL * 1e3:.0f} ms apart; load {LOAD_SECONDS * 1e3:.0f} ms, '
+          f'{PARTS} parts / {PART_MATERIALS} materials per model, {scene_materials} other materials in the scene')
+    print(f'{"":>12}  {"loads":>6}  {"skipped":>8}  {"last export ms":>14}  {"materials ms":>14}  mean step ms')
+    run(exports, scene_materials, previous=True)
+    run(exports, scene_materials, previous=False)
+
+if __name__ == '__main__':
+    main()
@@ -6,18 +6,60 @@ bl_info = {
 }
 
 import bpy
+import http.client
+import json
 import os
+import shutil
+import tempfile
 from datetime import datetime
+from urllib.parse import quote, urlsplit
+
+OUT_DIR = "/Users/shubhamjena/Desktop/Personal projects/blend-to-threejs/blender_exports"
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+def stream_to_server(path, filename, server_url, token=""):
+    # Chunked POST to the server's /ingest endpoint, read from disk as it is sent
+    url = urlsplit(server_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=120)
+    
+    def body():
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+                yield chunk
+    headers = {"Content-Type": "model/gltf-binary"}
+    if token:
+        headers["X-Ingest-Token"] = token
+    try:
+        conn.request("POST", f"/ingest?filename={quote(filename)}", body=body(),
+                     headers=headers, encode_chunked=True)
+        response = conn.getresponse()
+        payload = json.loads(response.read() or b"{}")
+    finally:
+        conn.close()
+    if response.status != 201:
+        raise RuntimeError(payload.get("error", response.reason))
+    return payload
 
 class GLB_OT_QuickExport(bpy.types.Operator):
     bl_idname = "export.quick_glb"
     bl_label = "Export GLB"
     
     def execute(self, context):
-        timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M")
+        # Seconds in the name, plus a counter if needed, so quick re-exports never overwrite
+        timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
         filename = f"model_{timestamp}.glb"
-        out_dir = "/Users/shubhamjena/Desktop/Personal projects/blend-to-threejs/blender_exports"
+        out_dir = OUT_DIR
         output_path = os.path.join(out_dir, filename)
+        counter = 1
+        while os.path.exists(output_path):
+            filename = f"model_{timestamp}_{counter}.glb"
+            output_path = os.path.join(out_dir, filename)
+            counter += 1
+        final_path = output_path
+        stream = context.scene.glb_stream_to_server
+        if stream:
+            # Export outside the watched folder, then upload the finished file
+            output_path = os.path.join(tempfile.gettempdir(), filename)
         print("Exporting to:", output_path)
         bpy.ops.object.select_all(action="SELECT")
         bpy.ops.object.transform_apply(location=True, rotation=True, scale=False)
@@ -28,6 +70,20 @@ class GLB_OT_QuickExport(bpy.types.Operator):
         )
         print("Export successful.")
         
+        if stream:
+            try:
+                result = stream_to_server(output_path, filename, context.scene.glb_server_url,
+                                          context.scene.glb_ingest_token)
+            except (OSError, RuntimeError, ValueError, http.client.HTTPException) as e:
+                # Fall back to the watched folder so the export still reaches viewers
+                shutil.move(output_path, final_path)
+                self.report({'WARNING'}, f"Upload failed ({e}), saved to {final_path}")
+                return {'FINISHED'}
+            os.remove(output_path)
+            print("Streamed to server:", result)
+            self.report({'INFO'}, f"Streamed: {filename}")
+            return {'FINISHED'}
+        
         self.report({'INFO'}, f"Exported: {filename}")
         return {'FINISHED'}
 
@@ -38,13 +94,31 @@ class GLB_PT_Panel(bpy.types.Panel):
     bl_category = "GLB"
     
     def draw(self, context):
+        self.layout.prop(context.scene, "glb_stream_to_server")
+        if context.scene.glb_stream_to_server:
+            self.layout.prop(context.scene, "glb_server_url")
+            self.layout.prop(context.scene, "glb_ingest_token")
         self.layout.operator("export.quick_glb", text="Export GLB", icon='EXPORT')
 
 def register():
+    bpy.types.Scene.glb_stream_to_server = bpy.props.BoolProperty(
+        name="Stream to server",
+        description="Upload each export straight to the server instead of writing it to the watched folder",
+        default=False,
+    )
+    bpy.types.Scene.glb_server_url = bpy.props.StringProperty(name="Server", default="http://localhost:5000")
+    bpy.types.Scene.glb_ingest_token = bpy.props.StringProperty(
+        name="Token",
+        description="The server's INGEST_TOKEN, if it sets one",
+        subtype='PASSWORD',
+    )
     bpy.utils.register_class(GLB_OT_QuickExport)
     bpy.utils.register_class(GLB_PT_Panel)
 
 def unregister():
+    del bpy.types.Scene.glb_stream_to_server
+    del bpy.types.Scene.glb_server_url
+    del bpy.types.Scene.glb_ingest_token
     bpy.utils.unregister_class(GLB_OT_QuickExport)
     bpy.utils.unregister_class(GLB_PT_Panel)
 
@@ -0,0 +1,150 @@
+# change_scheduler.py
+import os
+import struct
+import threading
+import time
+
+GLB_MAGIC = b'glTF'
+
+
+def glb_declared_length(path):
+    # Reads the 12-byte GLB header and returns the total length it declares, or None
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(12)
+    except OSError:
+        return None
+    if len(header) < 12 or header[:4] != GLB_MAGIC:
+        return None
+    return struct.unpack('<I', header[8:12])[0]
+
+
+def is_write_complete(path, size):
+    # GLBs are only complete once the header length matches what is on disk;
+    # other formats have no length field, so stability alone has to do
+    if path.lower().endswith('.glb'):
+        return glb_declared_length(path) == size
+    return size > 0
+
+
+class _PendingChange:
+    __slots__ = ('first_event', 'last_event', 'events', 'signature', 'stable_since')
+
+    def __init__(self, now):
+        self.first_event = now
+        self.last_event = now
+        self.events = 1
+        self.signature = None  # (size, mtime_ns) at the last poll
+        self.stable_since = now
+
+
+class ChangeScheduler:
+    # Tracks each changed path separately and calls callback(path) once it has settled:
+    # size and mtime unchanged for quiet_period and, for GLBs, a header whose declared
+    # length matches the file size. Every new event restarts that path's quiet period
+    # (trailing edge), so bursts collapse into one callback without dropping other files.
+    # on_settle(path, change), if given, runs just before the callback with the change's
+    # monotonic first_event/last_event times, event count and (size, mtime_ns) signature.
+    def __init__(self, callback, extensions=('.glb',), poll_interval=0.02,
+                 quiet_period=0.05, timeout=120.0, name='change-scheduler', on_settle=None):
+        self.callback = callback
+        self.on_settle = on_settle
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.poll_interval = poll_interval
+        self.quiet_period = quiet_period
+        self.timeout = timeout
+        self._pending = {}  # path -> _PendingChange
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._name = name
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def touch(self, path):
+        # Called from watchdog callbacks; never blocks on the filesystem
+        if not path.lower().endswith(self.extensions):
+            return
+        now = time.monotonic()
+        with self._cond:
+            pending = self._pending.get(path)
+            if pending is None:
+                self._pending[path] = _PendingChange(now)
+            else:
+                pending.last_event = now
+                pending.events += 1
+                pending.stable_since = now
+            self._cond.notify()
+
+    def discard(self, path):
+        with self._cond:
+            self._pending.pop(path, None)
+
+    def pending(self):
+        with self._cond:
+            return list(self._pending)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._pending:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                paths = list(self._pending)
+            for path, change in self._check(paths):
+                try:
+                    if self.on_settle is not None:
+                        self.on_settle(path, change)
+                    self.callback(path)
+                except Exception as e:
+                    print(f'[scheduler] Error handling {os.path.basename(path)}: {e}')
+            with self._cond:
+                if self._pending:
+                    self._cond.wait(self.poll_interval)
+
+    def _check(self, paths):
+        # Returns (path, change) for paths that settled since the last poll and removes them
+        # from the pending set
+        now = time.monotonic()
+        ready = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+                signature = (st.st_size, st.st_mtime_ns)
+            except FileNotFoundError:
+                signature = None
+            with self._cond:
+                pending = self._pending.get(path)
+                if pending is None:
+                    continue
+                if signature is None:
+                    # Deleted or renamed away before it settled
+                    del self._pending[path]
+                    continue
+                if signature != pending.signature:
+                    pending.signature = signature
+                    pending.stable_since = max(now, pending.last_event)
+                    continue
+                quiet = now - pending.stable_since >= self.quiet_period
+                if quiet and is_write_complete(path, signature[0]):
+                    del self._pending[path]
+                    ready.append((path, pending))
+                elif now - pending.first_event > self.timeout:
+                    del self._pending[path]
+                    print(f'[scheduler] Gave up waiting for {os.path.basename(path)} to settle')
+        return ready
@@ -0,0 +1,211 @@
+# export_catalog.py
+import bisect
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+HASH_CHUNK_SIZE = 1 << 20  # 1 MB reads keep hashing memory flat for huge exports
+
+
+def hash_file(path):
+    # Streams the file through BLAKE2b so large exports never sit fully in memory
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExportEntry:
+    # Metadata for a single export; the content hash is computed on first use and cached
+    __slots__ = ('filename', 'path', 'size', 'mtime', '_hash')
+
+    def __init__(self, path, size, mtime, content_hash=None):
+        self.filename = os.path.basename(path)
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self._hash = content_hash
+
+    @property
+    def hash(self):
+        if self._hash is None:
+            self._hash = hash_file(self.path)
+        return self._hash
+
+    def to_dict(self):
+        # Never hashes: listings report None until the catalog's background hasher gets there
+        return {
+            'filename': self.filename,
+            'size': self.size,
+            'mtime': self.mtime,
+            'hash': self._hash,
+        }
+
+
+class ExportCatalog:
+    # Indexed view of the exports folder, seeded once and then kept current from watcher events.
+    # Entries are kept in a list sorted by (mtime, filename) so "latest" is the last element
+    # and history pages are plain slices. With hash_index set, known hashes are saved there
+    # keyed by (size, mtime), so a restart only rehashes files that changed while it was down.
+    def __init__(self, folder, extensions=('.glb',), hash_index=None):
+        self.folder = folder
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.hash_index = hash_index
+        self._entries = {}  # filename -> ExportEntry
+        self._order = []    # sorted (mtime, filename) keys
+        self._lock = threading.RLock()
+        # Missing hashes are filled in off the request path, one file at a time
+        self._hasher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='catalog-hash')
+        self._queued = 0  # hasher jobs not yet run; the index is saved when it drops to zero
+
+    def _matches(self, path):
+        return os.path.basename(path).lower().endswith(self.extensions)
+
+    def _insert(self, entry):
+        old = self._entries.get(entry.filename)
+        if old is not None:
+            self._discard_key((old.mtime, old.filename))
+        self._entries[entry.filename] = entry
+        bisect.insort(self._order, (entry.mtime, entry.filename))
+
+    def _discard_key(self, key):
+        i = bisect.bisect_left(self._order, key)
+        if i < len(self._order) and self._order[i] == key:
+            del self._order[i]
+
+    def seed(self):
+        # One directory scan at startup; everything after that comes from update()/remove()
+        if not os.path.isdir(self.folder):
+            return 0
+        known = self._load_hashes()
+        with self._lock:
+            self._entries.clear()
+            self._order = []
+            with os.scandir(self.folder) as it:
+                for item in it:
+                    if not self._matches(item.name) or not item.is_file():
+                        continue
+                    st = item.stat()
+                    size, mtime, content_hash = known.get(item.name, (None, None, None))
+                    if (size, mtime) != (st.st_size, st.st_mtime):
+                        content_hash = None
+                    entry = ExportEntry(item.path, st.st_size, st.st_mtime, content_hash)
+                    self._entries[entry.filename] = entry
+                    self._order.append((entry.mtime, entry.filename))
+            self._order.sort()
+            # Newest first, since those are the exports viewers ask about
+            for _, filename in reversed(self._order):
+                self._queue_hash(self._entries[filename])
+            return len(self._entries)
+
+    def _queue_hash(self, entry):
+        if entry._hash is None or self.hash_index is not None:
+            with self._lock:
+                self._queued += 1
+            self._hasher.submit(self._hash_entry, entry)
+
+    def _hash_entry(self, entry):
+        # Skips entries replaced or removed while queued, and any hashed on demand meanwhile
+        try:
+            with self._lock:
+                if self._entries.get(entry.filename) is not entry:
+                    return
+            try:
+                entry.hash
+            except OSError:
+                pass  # Gone or unreadable; the watcher will catch up with it
+        finally:
+            with self._lock:
+                self._queued -= 1
+                idle = not self._queued
+            if idle:
+                self._save_hashes()
+
+    def _load_hashes(self):
+        # filename -> (size, mtime, hash) from the last run; empty when missing or unreadable
+        if self.hash_index is None:
+            return {}
+        try:
+            with open(self.hash_index) as f:
+                return {name: tuple(value) for name, value in json.load(f).items()}
+        except (OSError, ValueError, TypeError):
+            return {}
+
+    def _save_hashes(self):
+        if self.hash_index is None:
+            return
+        with self._lock:
+            known = {e.filename: [e.size, e.mtime, e._hash] for e in self._entries.values() if e._hash}
+        try:
+            os.makedirs(os.path.dirname(self.hash_index), exist_ok=True)
+            tmp = f'{self.hash_index}.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(known, f)
+            os.replace(tmp, self.hash_index)
+        except OSError as e:
+            print(f'[catalog] Could not save hashes: {e}')
+
+    def update(self, path, content_hash=None):
+        # Re-stats a created/modified file; a file that vanished in the meantime is dropped
+        if not self._matches(path):
+            return None
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self.remove(path)
+            return None
+        with self._lock:
+            old = self._entries.get(os.path.basename(path))
+            if content_hash is None and old is not None and (old.size, old.mtime) == (st.st_size, st.st_mtime):
+                content_hash = old._hash
+            entry = ExportEntry(path, st.st_size, st.st_mtime, content_hash)
+            self._insert(entry)
+        self._queue_hash(entry)
+        return entry
+
+    def remove(self, path):
+        with self._lock:
+            entry = self._entries.pop(os.path.basename(path), None)
+            if entry is not None:
+                self._discard_key((entry.mtime, entry.filename))
+            return entry
+
+    def move(self, src_path, dest_path):
+        # Renames keep the cached hash since the bytes did not change
+        with self._lock:
+            old = self.remove(src_path)
+            if not self._matches(dest_path):
+                return None
+            content_hash = old._hash if old is not None else None
+            return self.update(dest_path, content_hash)
+
+    def get(self, filename):
+        with self._lock:
+            return self._entries.get(filename)
+
+    def has_hash(self, content_hash):
+        # Only compares hashes already computed; used for housekeeping, not lookups
+        with self._lock:
+            return any(e._hash == content_hash for e in self._entries.values())
+
+    def latest(self):
+        with self._lock:
+            if not self._order:
+                return None
+            return self._entries[self._order[-1][1]]
+
+    def page(self, offset=0, limit=50):
+        # Newest-first slice of the history
+        with self._lock:
+            total = len(self._order)
+            end = max(total - offset, 0)
+            start = max(end - limit, 0)
+            keys = self._order[start:end]
+            entries = [self._entries[name] for _, name in reversed(keys)]
+        return entries, total
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,333 @@
+# export_store.py
+import base64
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+from glb_reader import CHUNK_BIN, CHUNK_JSON, GLB_MAGIC
+
+INLINE_LIMIT = 64  # Segments up to this size (headers, padding) live in the recipe itself
+INLINE_PREFIX = 'inline:'
+
+
+def _blob_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _bin_segments(json_bytes, bin_length):
+    # (offset, length) ranges of the BIN chunk split at bufferView boundaries, gaps included.
+    # Views are stored separately so an unchanged mesh or image dedups even when it moved.
+    try:
+        gltf = json.loads(bytes(json_bytes))
+    except ValueError:
+        return [(0, bin_length)]
+    buffers = gltf.get('buffers', [])
+    if not buffers or 'uri' in buffers[0]:
+        return [(0, bin_length)]
+    views = sorted({(v.get('byteOffset', 0), v['byteLength']) for v in gltf.get('bufferViews', [])
+                    if v.get('buffer') == 0 and v.get('byteLength')})
+    ranges = []
+    position = 0
+    for offset, length in views:
+        end = offset + length
+        if end > bin_length:
+            return [(0, bin_length)]
+        if offset < position:
+            if end <= position:
+                continue  # Fully inside an earlier view (aliased data)
+            return [(0, bin_length)]  # Partially overlapping views: keep the chunk whole
+        if offset > position:
+            ranges.append((position, offset - position))
+        ranges.append((offset, length))
+        position = end
+    if position < bin_length:
+        ranges.append((position, bin_length - position))
+    return ranges
+
+
+def file_segments(data):
+    # Splits an export into (offset, length) ranges whose concatenation is the file.
+    # GLBs split into header, JSON chunk and one range per bufferView; anything else is
+    # kept as a single range.
+    size = len(data)
+    if size < 20 or data[:4] != GLB_MAGIC:
+        return [(0, size)]
+    length = struct.unpack_from('<I', data, 8)[0]
+    if length != size:
+        return [(0, size)]
+    ranges = [(0, 12)]
+    offset = 12
+    json_bytes = None
+    while offset + 8 <= size:
+        chunk_length, chunk_type = struct.unpack_from('<II', data, offset)
+        start = offset + 8
+        if start + chunk_length > size:
+            return [(0, size)]
+        ranges.append((offset, 8))
+        if chunk_type == CHUNK_JSON and json_bytes is None:
+            json_bytes = data[start:start + chunk_length]
+            ranges.append((start, chunk_length))
+        elif chunk_type == CHUNK_BIN and json_bytes is not None:
+            ranges.extend((start + o, n) for o, n in _bin_segments(json_bytes, chunk_length))
+        else:
+            ranges.append((start, chunk_length))
+        offset = start + chunk_length
+    if offset < size:
+        ranges.append((offset, size - offset))
+    return [(o, n) for o, n in ranges if n]
+
+
+class RetentionPolicy:
+    # Which versions survive garbage collection. Every limit that is set applies; the
+    # newest keep_min versions are always kept.
+    #   keep_last: newest N versions
+    #   max_age:   versions exported (file mtime) within this many seconds
+    #   max_bytes: newest versions whose combined unique (deduplicated) bytes fit this budget
+    def __init__(self, keep_last=None, max_age=None, max_bytes=None, keep_min=1):
+        self.keep_last = keep_last
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.keep_min = keep_min
+
+
+class ExportStore:
+    # Content-addressed history of every export. Each version is a recipe: the list of
+    # segments (GLB header, JSON chunk, each bufferView, padding) whose concatenation is the
+    # original file. Segments are stored once under their BLAKE2b hash, so re-exports share
+    # every mesh and image that did not change, and identical files share everything.
+    # Layout: objects/<xx>/<hash>, recipes/<file hash>.json, index.json
+    def __init__(self, folder):
+        self.folder = folder
+        self.objects = os.path.join(folder, 'objects')
+        self.recipes = os.path.join(folder, 'recipes')
+        self._index_path = os.path.join(folder, 'index.json')
+        self._lock = threading.RLock()
+        self._versions = []  # oldest first; version numbers only grow
+        self._next = 1
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self._index_path) as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return
+        self._versions = index['versions']
+        self._next = index['next']
+
+    def _save(self):
+        os.makedirs(self.folder, exist_ok=True)
+        tmp = f'{self._index_path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'next': self._next, 'versions': self._versions}, f)
+        os.replace(tmp, self._index_path)
+
+    def object_path(self, blob):
+        return os.path.join(self.objects, blob[:2], blob)
+
+    def recipe_path(self, content_hash):
+        return os.path.join(self.recipes, f'{content_hash}.json')
+
+    def _put(self, data):
+        if len(data) <= INLINE_LIMIT:
+            return INLINE_PREFIX + base64.b64encode(data).decode()
+        blob = _blob_hash(data)
+        path = self.object_path(blob)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f'{path}.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return blob
+
+    def recipe(self, content_hash):
+        try:
+            with open(self.recipe_path(content_hash)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def ingest(self, path, content_hash, filename=None, mtime=None):
+        # Records a new version of an export; bytes already in the store are not written again.
+        # Re-ingesting the same file (same name, hash and mtime) returns the existing version.
+        # The file is hashed as it is segmented: if it no longer matches content_hash (rewritten
+        # since the caller hashed it) nothing is recorded and None is returned.
+        filename = filename or os.path.basename(path)
+        mtime = os.stat(path).st_mtime if mtime is None else mtime
+        with self._lock:
+            for version in reversed(self._versions):
+                if (version['filename'], version['hash'], version['mtime']) == (filename, content_hash, mtime):
+                    return version
+            recipe = self.recipe(content_hash)
+            if recipe is None:
+                recipe = self._segment(path)
+                if recipe['hash'] != content_hash:
+                    print(f"[store] {filename} changed since it was hashed ({recipe['hash']}, "
+                          f'expected {content_hash}); not stored')
+                    return None
+                os.makedirs(self.recipes, exist_ok=True)
+                tmp = f'{self.recipe_path(content_hash)}.tmp'
+                with open(tmp, 'w') as f:
+                    json.dump(recipe, f)
+                os.replace(tmp, self.recipe_path(content_hash))
+            version = {'version': self._next, 'filename': filename, 'hash': content_hash,
+                       'size': recipe['size'], 'mtime': mtime, 'stored': time.time()}
+            self._next += 1
+            self._versions.append(version)
+            self._save()
+            return version
+
+    def _segment(self, path):
+        # Stores the segments of whatever is on disk now and returns its recipe, hashed from
+        # the very bytes that were segmented. Segments of a file that turns out stale are left
+        # unreferenced for collect().
+        digest = hashlib.blake2b(digest_size=16)
+        segments = []
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+            try:
+                for offset, length in file_segments(data):
+                    segment = data[offset:offset + length]
+                    digest.update(segment)
+                    segments.append(self._put(segment))
+            finally:
+                if size:
+                    data.close()
+        return {'hash': digest.hexdigest(), 'size': size, 'segments': segments}
+
+    def versions(self, filename=None):
+        with self._lock:
+            return [v for v in self._versions if filename is None or v['filename'] == filename]
+
+    def latest(self):
+        with self._lock:
+            return self._versions[-1] if self._versions else None
+
+    def get(self, number):
+        with self._lock:
+            index = self._position(number)
+            return self._versions[index] if index is not None else None
+
+    def neighbors(self, number):
+        # (previous, next) versions around number, either None at the ends of the history
+        with self._lock:
+            index = self._position(number)
+            if index is None:
+                return None, None
+            previous = self._versions[index - 1] if index > 0 else None
+            following = self._versions[index + 1] if index + 1 < len(self._versions) else None
+            return previous, following
+
+    def _position(self, number):
+        # Versions are appended in increasing order, so the list is sorted by number
+        lo, hi = 0, len(self._versions)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._versions[mid]['version'] < number:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self._versions) and self._versions[lo]['version'] == number:
+            return lo
+        return None
+
+    def iter_bytes(self, content_hash, chunk_size=1 << 20):
+        # Streams a stored file back, segment by segment
+        recipe = self.recipe(content_hash)
+        if recipe is None:
+            raise KeyError(content_hash)
+        for segment in recipe['segments']:
+            if segment.startswith(INLINE_PREFIX):
+                yield base64.b64decode(segment[len(INLINE_PREFIX):])
+                continue
+            with open(self.object_path(segment), 'rb') as f:
+                for chunk in iter(lambda: f.read(chunk_size), b''):
+                    yield chunk
+
+    def rebuild(self, content_hash, dest):
+        # Writes a stored file back out, byte for byte, and returns dest
+        tmp = f'{dest}.{threading.get_ident()}.tmp'  # Concurrent rebuilds of one file must not share it
+        os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+        with open(tmp, 'wb') as f:
+            for chunk in self.iter_bytes(content_hash):
+                f.write(chunk)
+        os.replace(tmp, dest)
+        return dest
+
+    def _blob_size(self, blob, sizes):
+        if blob not in sizes:
+            try:
+                sizes[blob] = os.path.getsize(self.object_path(blob))
+            except FileNotFoundError:
+                sizes[blob] = 0
+        return sizes[blob]
+
+    def apply_retention(self, policy, now=None):
+        # Drops versions outside the policy from the index and returns them. Their bytes stay
+        # on disk until collect() runs.
+        now = time.time() if now is None else now
+        with self._lock:
+            keep = []
+            seen, sizes, unique_bytes = set(), {}, 0
+            for position, version in enumerate(reversed(self._versions)):
+                if position >= policy.keep_min:
+                    if policy.keep_last is not None and position >= policy.keep_last:
+                        break
+                    if policy.max_age is not None and now - version['mtime'] > policy.max_age:
+                        break
+                if policy.max_bytes is not None:
+                    recipe = self.recipe(version['hash']) or {'segments': []}
+                    added = {s for s in recipe['segments'] if not s.startswith(INLINE_PREFIX)} - seen
+                    cost = sum(self._blob_size(blob, sizes) for blob in added)
+                    if position >= policy.keep_min and unique_bytes + cost > policy.max_bytes:
+                        break
+                    seen |= added
+                    unique_bytes += cost
+                keep.append(version)
+            keep.reverse()
+            dropped = self._versions[:len(self._versions) - len(keep)]
+            if dropped:
+                self._versions = keep
+                self._save()
+            return dropped
+
+    def collect(self):
+        # Mark and sweep: removes recipes no version uses and objects no recipe references.
+        # Returns (objects removed, bytes freed).
+        with self._lock:
+            live_hashes = {v['hash'] for v in self._versions}
+            live = set()
+            if os.path.isdir(self.recipes):
+                for name in os.listdir(self.recipes):
+                    if not name.endswith('.json'):
+                        continue
+                    content_hash = name[:-len('.json')]
+                    if content_hash not in live_hashes:
+                        os.remove(os.path.join(self.recipes, name))
+                        continue
+                    recipe = self.recipe(content_hash)
+                    live.update(s for s in recipe['segments'] if not s.startswith(INLINE_PREFIX))
+            removed = freed = 0
+            if os.path.isdir(self.objects):
+                for prefix in os.listdir(self.objects):
+                    directory = os.path.join(self.objects, prefix)
+                    for blob in os.listdir(directory):
+                        if blob not in live:
+                            path = os.path.join(directory, blob)
+                            freed += os.path.getsize(path)
+                            os.remove(path)
+                            removed += 1
+            return removed, freed
+
+    def disk_usage(self):
+        # Bytes the store occupies on disk (objects, recipes and index)
+        total = 0
+        for root, _, files in os.walk(self.folder):
+            total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        return total
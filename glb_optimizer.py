@@ -0,0 +1,179 @@
+# glb_optimizer.py
+import os
+import time
+
+import numpy as np
+
+from glb_reader import GLTFDocument
+from glb_writer import ARRAY_BUFFER, COMPONENT_TYPES, DTYPE_COMPONENTS, ELEMENT_ARRAY_BUFFER, GLBRewriter
+
+TRIANGLES = 4
+
+# Candidate encodings per attribute, smallest first; the first one within tolerance wins.
+# Signed types cover [-1, 1] data, unsigned types [0, 1].
+SIGNED_STEPS = [(np.int8, 127.0), (np.int16, 32767.0)]
+UNSIGNED_STEPS = [(np.uint8, 255.0), (np.uint16, 65535.0)]
+QUANTIZED_ATTRIBUTES = {
+    'NORMAL': SIGNED_STEPS,
+    'TANGENT': SIGNED_STEPS,
+    'COLOR_0': UNSIGNED_STEPS,
+    'TEXCOORD_0': UNSIGNED_STEPS[1:],
+    'TEXCOORD_1': UNSIGNED_STEPS[1:],
+}
+# Formats the core spec accepts without KHR_mesh_quantization
+CORE_FORMATS = {('COLOR_0', np.uint8), ('COLOR_0', np.uint16),
+                ('TEXCOORD_0', np.uint16), ('TEXCOORD_1', np.uint16)}
+
+
+def _part1by2(v):
+    # Spreads the low 10 bits of v so two zero bits sit between each, for 3D Morton codes
+    v = v.astype(np.uint64) & 0x3FF
+    v = (v | (v << 16)) & 0x30000FF
+    v = (v | (v << 8)) & 0x300F00F
+    v = (v | (v << 4)) & 0x30C30C3
+    v = (v | (v << 2)) & 0x9249249
+    return v
+
+
+def weld(arrays, indices):
+    # Collapses vertices whose every attribute is byte-identical. Returns (source, indices)
+    # where source[i] is an original vertex index for new vertex i.
+    count = len(arrays[0])
+    rows = np.concatenate([np.ascontiguousarray(a).reshape(count, -1).view(np.uint8) for a in arrays], axis=1)
+    keys = np.ascontiguousarray(rows).view(np.dtype((np.void, rows.shape[1]))).ravel()
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    return first, inverse.ravel()[indices]
+
+
+def reorder_for_cache(positions, indices):
+    # Sorts triangles along a Morton curve through their centroids so neighbouring triangles
+    # share vertices, then renumbers vertices in first-use order for fetch locality.
+    # Returns (vertex_order, new_indices) where vertex_order[i] is the old index of new vertex i.
+    triangles = indices.reshape(-1, 3)
+    if len(triangles):
+        centroids = positions[triangles].mean(axis=1)
+        low = centroids.min(axis=0)
+        extent = np.maximum(centroids.max(axis=0) - low, 1e-12)
+        cells = ((centroids - low) / extent * 1023).astype(np.uint32)
+        codes = _part1by2(cells[:, 0]) | (_part1by2(cells[:, 1]) << 1) | (_part1by2(cells[:, 2]) << 2)
+        triangles = triangles[np.argsort(codes, kind='stable')]
+    flat = triangles.ravel()
+    used, first_use = np.unique(flat, return_index=True)
+    vertex_order = used[np.argsort(first_use, kind='stable')]
+    remap = np.empty(len(positions), dtype=np.int64)
+    remap[vertex_order] = np.arange(len(vertex_order))
+    return vertex_order, remap[flat]
+
+
+def quantize(name, values, tolerance):
+    # Picks the smallest normalized integer type that reproduces values within tolerance.
+    # Returns (array, dtype, max_error); dtype is None when float32 has to stay.
+    values = np.asarray(values, dtype=np.float32)
+    steps = QUANTIZED_ATTRIBUTES.get(name)
+    if steps is None or not len(values):
+        return values, None, 0.0
+    if steps is SIGNED_STEPS and (values.min() < -1.0 or values.max() > 1.0):
+        return values, None, 0.0
+    if steps is not SIGNED_STEPS and (values.min() < 0.0 or values.max() > 1.0):
+        return values, None, 0.0
+    for dtype, scale in steps:
+        quantized = np.round(values * scale).astype(dtype)
+        restored = quantized.astype(np.float32) / scale
+        if steps is SIGNED_STEPS:
+            restored = np.maximum(restored, -1.0)
+        error = float(np.abs(restored - values).max())
+        if error <= tolerance:
+            return quantized, dtype, error
+    return values, None, 0.0
+
+
+def _add_vertex_attribute(builder, array, normalized):
+    # Vertex attribute elements must be 4-byte aligned, so narrow vectors are padded
+    array = np.ascontiguousarray(array)
+    components = 1 if array.ndim == 1 else array.shape[1]
+    element = array.dtype.itemsize * components
+    stride = element + (-element % 4)
+    if stride != element:
+        padded = np.zeros((len(array), stride // array.dtype.itemsize), dtype=array.dtype)
+        padded[:, :components] = array.reshape(len(array), components)
+        view = builder.add_buffer_view(padded.tobytes(), target=ARRAY_BUFFER, byte_stride=stride)
+    else:
+        view = builder.add_buffer_view(array.tobytes(), target=ARRAY_BUFFER)
+    accessor = {
+        'bufferView': view,
+        'componentType': DTYPE_COMPONENTS[array.dtype],
+        'count': len(array),
+        'type': COMPONENT_TYPES[components],
+    }
+    if normalized:
+        accessor['normalized'] = True
+    builder.json.setdefault('accessors', []).append(accessor)
+    return len(builder.json['accessors']) - 1
+
+
+class _Optimizer(GLBRewriter):
+    def __init__(self, doc, tolerance):
+        super().__init__(doc)
+        self.tolerance = tolerance
+        self.report = {'vertices_before': 0, 'vertices_after': 0, 'max_error': {}}
+
+    def primitive(self, primitive):
+        attributes = primitive['attributes']
+        if primitive.get('mode', TRIANGLES) != TRIANGLES or 'POSITION' not in attributes:
+            self.copy_primitive(primitive)
+            return
+        names = sorted(attributes)
+        arrays = [self.doc.accessor(attributes[name]) for name in names]
+        targets = [[self.doc.accessor(t[name]) for name in sorted(t)] for t in primitive.get('targets', [])]
+        count = len(arrays[0])
+        if 'indices' in primitive:
+            indices = self.doc.accessor(primitive['indices']).astype(np.int64)
+        else:
+            indices = np.arange(count, dtype=np.int64)
+        indices = indices[:len(indices) - len(indices) % 3]
+
+        source, indices = weld(arrays + [a for t in targets for a in t], indices)
+        positions = np.asarray(arrays[names.index('POSITION')], dtype=np.float32)[source]
+        order, indices = reorder_for_cache(positions, indices)
+        source = source[order]
+        self.report['vertices_before'] += count
+        self.report['vertices_after'] += len(source)
+
+        for name, array in zip(names, arrays):
+            values = array[source]
+            normalized = self.doc.accessors[attributes[name]].get('normalized', False)
+            if array.dtype == np.float32:
+                values, dtype, error = quantize(name, values, self.tolerance)
+                if dtype is not None:
+                    normalized = True
+                    if (name, dtype) not in CORE_FORMATS:
+                        self.required_extensions.add('KHR_mesh_quantization')
+                    previous = self.report['max_error'].get(name, 0.0)
+                    self.report['max_error'][name] = max(previous, error)
+            attributes[name] = _add_vertex_attribute(self.builder, values, normalized)
+            if name == 'POSITION':
+                accessor = self.builder.json['accessors'][attributes[name]]
+                accessor['min'] = [float(v) for v in values.min(axis=0)]
+                accessor['max'] = [float(v) for v in values.max(axis=0)]
+        for target, target_arrays in zip(primitive.get('targets', []), targets):
+            for name, array in zip(sorted(target), target_arrays):
+                target[name] = self.builder.add_accessor(array[source], target=ARRAY_BUFFER, bounds=True)
+
+        index_dtype = np.uint16 if len(source) < 65536 else np.uint32
+        primitive['indices'] = self.builder.add_accessor(indices.astype(index_dtype), target=ELEMENT_ARRAY_BUFFER)
+
+
+def optimize_glb(source_path, dest_path, tolerance=0.005):
+    # Welds duplicate vertices, reorders triangles/vertices for cache locality and quantizes
+    # normals, tangents, colors and UVs. Positions stay float32 so no node transform changes
+    # are needed. Returns a report with sizes and the worst per-attribute quantization error.
+    start = time.perf_counter()
+    with GLTFDocument(source_path) as doc:
+        optimizer = _Optimizer(doc, tolerance)
+        optimizer.run().write(dest_path)
+    report = optimizer.report
+    report['source_bytes'] = os.path.getsize(source_path)
+    report['optimized_bytes'] = os.path.getsize(dest_path)
+    report['reduction'] = 1.0 - report['optimized_bytes'] / max(report['source_bytes'], 1)
+    report['seconds'] = time.perf_counter() - start
+    return report
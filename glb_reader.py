@@ -0,0 +1,222 @@
+# glb_reader.py
+import base64
+import json
+import mmap
+import os
+import struct
+from urllib.parse import unquote, urlsplit
+
+import numpy as np
+
+GLB_MAGIC = b'glTF'
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+COMPONENT_DTYPES = {
+    5120: np.int8,
+    5121: np.uint8,
+    5122: np.int16,
+    5123: np.uint16,
+    5125: np.uint32,
+    5126: np.float32,
+}
+TYPE_SIZES = {'SCALAR': 1, 'VEC2': 2, 'VEC3': 3, 'VEC4': 4, 'MAT2': 4, 'MAT3': 9, 'MAT4': 16}
+
+
+class GLTFError(ValueError):
+    pass
+
+
+def _map_file(path):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise GLTFError(f'Empty file: {path}')
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class GLTFDocument:
+    # Read-only view of a .glb or .gltf. Only the JSON is parsed up front; buffers are
+    # memory-mapped on first access and every bufferView/accessor is a NumPy view into
+    # that mapping, so a 500 MB export costs page cache rather than heap.
+    def __init__(self, path):
+        self.path = path
+        self.json = None
+        self._maps = []
+        self._buffers = {}  # buffer index -> memoryview
+        self._glb_bin = None
+        if path.lower().endswith('.glb'):
+            self._open_glb()
+        else:
+            with open(path, 'rb') as f:
+                self.json = json.loads(f.read())
+
+    def _open_glb(self):
+        mm = _map_file(self.path)
+        self._maps.append(mm)
+        if len(mm) < 20 or mm[:4] != GLB_MAGIC:
+            raise GLTFError(f'Not a GLB file: {self.path}')
+        version, length = struct.unpack_from('<II', mm, 4)
+        if version != 2:
+            raise GLTFError(f'Unsupported GLB version {version}')
+        if length > len(mm):
+            raise GLTFError(f'Truncated GLB: header says {length} bytes, file has {len(mm)}')
+        view = memoryview(mm)[:length]
+        offset = 12
+        while offset + 8 <= length:
+            chunk_length, chunk_type = struct.unpack_from('<II', mm, offset)
+            start = offset + 8
+            if start + chunk_length > length:
+                raise GLTFError('Chunk runs past end of file')
+            if chunk_type == CHUNK_JSON and self.json is None:
+                self.json = json.loads(bytes(view[start:start + chunk_length]))
+            elif chunk_type == CHUNK_BIN and self._glb_bin is None:
+                self._glb_bin = view[start:start + chunk_length]
+            offset = start + chunk_length
+        if self.json is None:
+            raise GLTFError('GLB has no JSON chunk')
+
+    def close(self):
+        # Drops this document's references. The mappings are not closed explicitly: NumPy
+        # keeps the mmap itself as the base of every view handed out, so closing it here
+        # would leave those arrays dangling. Each mapping closes when its last view goes.
+        self._buffers.clear()
+        self._glb_bin = None
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Top-level collections
+    @property
+    def accessors(self):
+        return self.json.get('accessors', [])
+
+    @property
+    def buffer_views(self):
+        return self.json.get('bufferViews', [])
+
+    @property
+    def meshes(self):
+        return self.json.get('meshes', [])
+
+    @property
+    def nodes(self):
+        return self.json.get('nodes', [])
+
+    @property
+    def materials(self):
+        return self.json.get('materials', [])
+
+    @property
+    def images(self):
+        return self.json.get('images', [])
+
+    # Raw data
+    def buffer(self, index):
+        # Returns a memoryview over the whole buffer, mapping or decoding it on first use
+        cached = self._buffers.get(index)
+        if cached is not None:
+            return cached
+        info = self.json['buffers'][index]
+        uri = info.get('uri')
+        if uri is None:
+            if self._glb_bin is None:
+                raise GLTFError(f'Buffer {index} has no uri and there is no BIN chunk')
+            data = self._glb_bin
+        elif uri.startswith('data:'):
+            # Data URIs have to be decoded, so this is the one path that copies
+            data = memoryview(base64.b64decode(uri.split(',', 1)[1]))
+        else:
+            external = self._external_path(uri)
+            if not os.path.exists(external):
+                raise GLTFError(f'Missing external buffer: {uri}')
+            mm = _map_file(external)
+            self._maps.append(mm)
+            data = memoryview(mm)
+        if len(data) < info['byteLength']:
+            raise GLTFError(f'Buffer {index} is shorter than its byteLength')
+        data = data[:info['byteLength']]
+        self._buffers[index] = data
+        return data
+
+    def buffer_view_bytes(self, index):
+        view = self.buffer_views[index]
+        start = view.get('byteOffset', 0)
+        return self.buffer(view['buffer'])[start:start + view['byteLength']]
+
+    def buffer_view(self, index):
+        # Zero-copy uint8 array over a bufferView
+        return np.frombuffer(self.buffer_view_bytes(index), dtype=np.uint8)
+
+    def image_bytes(self, index):
+        # Encoded image data from a bufferView, data URI or external file
+        image = self.images[index]
+        if 'bufferView' in image:
+            return self.buffer_view_bytes(image['bufferView'])
+        uri = image.get('uri', '')
+        if uri.startswith('data:'):
+            return memoryview(base64.b64decode(uri.split(',', 1)[1]))
+        with open(self._external_path(uri), 'rb') as f:
+            return memoryview(f.read())
+
+    def _external_path(self, uri):
+        # Resolves a relative uri next to this file. Absolute paths, other schemes and
+        # anything that leaves the folder once decoded or through symlinks are refused,
+        # so a crafted export cannot read other files on the server.
+        name = unquote(uri)
+        if urlsplit(uri).scheme or os.path.isabs(name) or name.startswith(('/', '\\')):
+            raise GLTFError(f'External uri outside the export folder: {uri}')
+        folder = os.path.realpath(os.path.dirname(self.path))
+        path = os.path.realpath(os.path.join(folder, name))
+        if os.path.commonpath([folder, path]) != folder:
+            raise GLTFError(f'External uri outside the export folder: {uri}')
+        return path
+
+    def accessor(self, index):
+        # Returns a (count, components) view for vector types or (count,) for scalars,
+        # honouring byteStride without copying. Sparse accessors are densified (copied).
+        acc = self.accessors[index]
+        dtype = np.dtype(COMPONENT_DTYPES[acc['componentType']])
+        components = TYPE_SIZES[acc['type']]
+        count = acc['count']
+        shape = (count,) if components == 1 else (count, components)
+        if 'bufferView' not in acc:
+            array = np.zeros(shape, dtype=dtype)
+        else:
+            view = self.buffer_views[acc['bufferView']]
+            data = self.buffer_view_bytes(acc['bufferView'])
+            offset = acc.get('byteOffset', 0)
+            element_size = dtype.itemsize * components
+            stride = view.get('byteStride') or element_size
+            if count and offset + stride * (count - 1) + element_size > len(data):
+                raise GLTFError(f'Accessor {index} runs past its bufferView')
+            strides = (stride,) if components == 1 else (stride, dtype.itemsize)
+            array = np.ndarray(shape, dtype=dtype, buffer=data, offset=offset, strides=strides)
+        if 'sparse' in acc:
+            array = self._apply_sparse(acc['sparse'], array)
+        return array
+
+    def _apply_sparse(self, sparse, array):
+        array = array.copy()
+        count = sparse['count']
+        idx = sparse['indices']
+        idx_dtype = np.dtype(COMPONENT_DTYPES[idx['componentType']])
+        indices = np.frombuffer(self.buffer_view_bytes(idx['bufferView']), dtype=idx_dtype,
+                                count=count, offset=idx.get('byteOffset', 0))
+        val = sparse['values']
+        values = np.frombuffer(self.buffer_view_bytes(val['bufferView']), dtype=array.dtype,
+                               count=count * (array.size // max(len(array), 1)),
+                               offset=val.get('byteOffset', 0))
+        array[indices] = values.reshape((count,) + array.shape[1:])
+        return array
+
+    def accessor_bounds(self, index):
+        # Uses the accessor's min/max when present, otherwise scans the data
+        acc = self.accessors[index]
+        if 'min' in acc and 'max' in acc:
+            return np.asarray(acc['min'], dtype=np.float64), np.asarray(acc['max'], dtype=np.float64)
+        data = self.accessor(index)
+        return data.min(axis=0).astype(np.float64), data.max(axis=0).astype(np.float64)
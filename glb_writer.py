@@ -0,0 +1,166 @@
+# glb_writer.py
+import copy
+import json
+import os
+import struct
+
+import numpy as np
+
+from glb_reader import CHUNK_BIN, CHUNK_JSON, GLB_MAGIC
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+DTYPE_COMPONENTS = {
+    np.dtype(np.int8): 5120,
+    np.dtype(np.uint8): 5121,
+    np.dtype(np.int16): 5122,
+    np.dtype(np.uint16): 5123,
+    np.dtype(np.uint32): 5125,
+    np.dtype(np.float32): 5126,
+}
+COMPONENT_TYPES = {1: 'SCALAR', 2: 'VEC2', 3: 'VEC3', 4: 'VEC4', 16: 'MAT4'}
+
+
+def _pad(length, alignment=4):
+    return -length % alignment
+
+
+class GLBBuilder:
+    # Accumulates bufferViews into a single BIN chunk and writes a GLB. The JSON is a plain
+    # dict the caller fills in (meshes, nodes, materials ...); accessors and bufferViews
+    # are appended through the add_* helpers so offsets and alignment stay consistent.
+    def __init__(self, gltf=None):
+        self.json = gltf if gltf is not None else {}
+        self.json.setdefault('asset', {'version': '2.0', 'generator': 'blend-to-threejs'})
+        self._chunks = []
+        self._length = 0
+
+    def _list(self, key):
+        return self.json.setdefault(key, [])
+
+    def add_buffer_view(self, data, target=None, byte_stride=None):
+        data = memoryview(data).cast('B')
+        padding = _pad(self._length)
+        if padding:
+            self._chunks.append(b'\0' * padding)
+            self._length += padding
+        view = {'buffer': 0, 'byteOffset': self._length, 'byteLength': len(data)}
+        if target is not None:
+            view['target'] = target
+        if byte_stride:
+            view['byteStride'] = byte_stride
+        self._chunks.append(data)
+        self._length += len(data)
+        views = self._list('bufferViews')
+        views.append(view)
+        return len(views) - 1
+
+    def add_accessor(self, array, target=None, normalized=False, bounds=False):
+        # Writes a tightly packed copy of array and returns the new accessor index
+        array = np.ascontiguousarray(array)
+        components = 1 if array.ndim == 1 else array.shape[1]
+        view = self.add_buffer_view(array.tobytes(), target=target)
+        accessor = {
+            'bufferView': view,
+            'componentType': DTYPE_COMPONENTS[array.dtype],
+            'count': len(array),
+            'type': COMPONENT_TYPES[components],
+        }
+        if normalized:
+            accessor['normalized'] = True
+        if bounds and len(array):
+            flat = array.reshape(len(array), components)
+            cast = float if array.dtype.kind == 'f' else int
+            accessor['min'] = [cast(v) for v in flat.min(axis=0)]
+            accessor['max'] = [cast(v) for v in flat.max(axis=0)]
+        accessors = self._list('accessors')
+        accessors.append(accessor)
+        return len(accessors) - 1
+
+    def to_bytes(self):
+        if self._length:
+            self.json['buffers'] = [{'byteLength': self._length}]
+        doc = json.dumps(self.json, separators=(',', ':')).encode()
+        doc += b' ' * _pad(len(doc))
+        bin_padding = _pad(self._length)
+        total = 12 + 8 + len(doc)
+        if self._length:
+            total += 8 + self._length + bin_padding
+        parts = [GLB_MAGIC, struct.pack('<II', 2, total), struct.pack('<II', len(doc), CHUNK_JSON), doc]
+        if self._length:
+            parts.append(struct.pack('<II', self._length + bin_padding, CHUNK_BIN))
+            parts.extend(self._chunks)
+            parts.append(b'\0' * bin_padding)
+        return b''.join(parts)
+
+    def write(self, path):
+        # Writes next to the destination and renames, so watchers never see a partial file
+        tmp = f'{path}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(self.to_bytes())
+        os.replace(tmp, path)
+        return path
+
+
+class GLBRewriter:
+    # Copies a document into a GLBBuilder, giving subclasses a hook per mesh primitive.
+    # Images, skins and animations are carried over untouched; accessors are copied on
+    # first reference so anything a subclass replaces is simply never written.
+    def __init__(self, doc):
+        self.doc = doc
+        self.builder = GLBBuilder(copy.deepcopy(doc.json))
+        for key in ('accessors', 'bufferViews', 'buffers'):
+            self.builder.json.pop(key, None)
+        self.required_extensions = set()
+        self._accessor_map = {}
+
+    def copy_accessor(self, index):
+        if index not in self._accessor_map:
+            acc = self.doc.accessors[index]
+            new_index = self.builder.add_accessor(self.doc.accessor(index), normalized=acc.get('normalized', False))
+            new = self.builder.json['accessors'][new_index]
+            for key in ('min', 'max', 'name'):
+                if key in acc:
+                    new[key] = acc[key]
+            self._accessor_map[index] = new_index
+        return self._accessor_map[index]
+
+    def copy_primitive(self, primitive):
+        for name, acc in primitive['attributes'].items():
+            primitive['attributes'][name] = self.copy_accessor(acc)
+        if 'indices' in primitive:
+            primitive['indices'] = self.copy_accessor(primitive['indices'])
+        for target in primitive.get('targets', []):
+            for name, acc in target.items():
+                target[name] = self.copy_accessor(acc)
+
+    def primitive(self, primitive):
+        # Subclasses rewrite the primitive in place; the default keeps it as-is
+        self.copy_primitive(primitive)
+
+    def image(self, index, image):
+        # Subclasses may re-encode or re-point the image; the default embeds the original bytes
+        if 'bufferView' in image:
+            image['bufferView'] = self.builder.add_buffer_view(self.doc.buffer_view_bytes(image['bufferView']))
+
+    def run(self):
+        gltf = self.builder.json
+        for index, image in enumerate(list(gltf.get('images', []))):
+            self.image(index, image)
+        for mesh in gltf.get('meshes', []):
+            for primitive in mesh['primitives']:
+                self.primitive(primitive)
+        for skin in gltf.get('skins', []):
+            if 'inverseBindMatrices' in skin:
+                skin['inverseBindMatrices'] = self.copy_accessor(skin['inverseBindMatrices'])
+        for animation in gltf.get('animations', []):
+            for sampler in animation.get('samplers', []):
+                sampler['input'] = self.copy_accessor(sampler['input'])
+                sampler['output'] = self.copy_accessor(sampler['output'])
+        for name in sorted(self.required_extensions):
+            for key in ('extensionsUsed', 'extensionsRequired'):
+                extensions = gltf.setdefault(key, [])
+                if name not in extensions:
+                    extensions.append(name)
+        return self.builder
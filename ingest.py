@@ -0,0 +1,148 @@
+# ingest.py
+import hashlib
+import json
+import os
+import struct
+import uuid
+
+from glb_reader import CHUNK_BIN, CHUNK_JSON, GLB_MAGIC, GLTFError
+
+INGEST_CHUNK_SIZE = 1 << 20  # Socket reads per write; the same size hash_file streams with
+MAX_JSON_CHUNK = 256 << 20  # The JSON chunk is buffered to parse it; anything bigger is not an export
+
+
+class GLBStreamValidator:
+    # Checks a GLB as its bytes arrive, without holding more than the JSON chunk: header
+    # magic and version, chunks that tile the declared length exactly, a first chunk that
+    # is JSON and parses without external uris, and a BIN chunk large enough for the
+    # buffer it backs. Raises GLTFError at the first byte that makes the file invalid, so
+    # bad uploads stop early.
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.received = 0
+        self.length = None  # declared by the file header
+        self.gltf = None
+        self.bin_length = None
+        self._header = bytearray()  # file or chunk header being assembled
+        self._chunks = 0
+        self._chunk_type = None
+        self._chunk_left = 0
+        self._json = None
+
+    def feed(self, data):
+        if self.length is not None and self.received + len(data) > self.length:
+            raise GLTFError(f'More data than the {self.length} bytes the header declares')
+        view = memoryview(data)
+        while view:
+            if self._chunk_left:
+                take = min(len(view), self._chunk_left)
+                if self._json is not None:
+                    self._json += view[:take]
+                self._chunk_left -= take
+                self.received += take
+                view = view[take:]
+                if not self._chunk_left:
+                    self._end_chunk()
+                continue
+            size = 12 if self.length is None else 8
+            take = min(len(view), size - len(self._header))
+            self._header += view[:take]
+            self.received += take
+            view = view[take:]
+            if len(self._header) == size:
+                self._parse_header()
+
+    def _parse_header(self):
+        header, self._header = bytes(self._header), bytearray()
+        if self.length is None:
+            if header[:4] != GLB_MAGIC:
+                raise GLTFError('Not a GLB file')
+            version, length = struct.unpack_from('<II', header, 4)
+            if version != 2:
+                raise GLTFError(f'Unsupported GLB version {version}')
+            if length < 20:
+                raise GLTFError(f'GLB declares {length} bytes, too short for a JSON chunk')
+            if self.max_bytes is not None and length > self.max_bytes:
+                raise GLTFError(f'GLB declares {length} bytes, more than the {self.max_bytes} allowed')
+            self.length = length
+            return
+        chunk_length, chunk_type = struct.unpack('<II', header)
+        if self.received + chunk_length > self.length:
+            raise GLTFError('Chunk runs past end of file')
+        if self._chunks == 0:
+            if chunk_type != CHUNK_JSON:
+                raise GLTFError('First GLB chunk is not JSON')
+            if chunk_length > MAX_JSON_CHUNK:
+                raise GLTFError(f'JSON chunk of {chunk_length} bytes')
+            self._json = bytearray()
+        elif chunk_type == CHUNK_BIN:
+            if self.bin_length is not None:
+                raise GLTFError('More than one BIN chunk')
+            self.bin_length = chunk_length
+        self._chunk_type = chunk_type
+        self._chunk_left = chunk_length
+        if not chunk_length:
+            self._end_chunk()
+
+    def _end_chunk(self):
+        if self._json is not None:
+            try:
+                self.gltf = json.loads(bytes(self._json))
+            except ValueError as e:
+                raise GLTFError(f'JSON chunk does not parse: {e}') from None
+            self._json = None
+            if not isinstance(self.gltf, dict) or 'asset' not in self.gltf:
+                raise GLTFError('JSON chunk is not a glTF document')
+            self._check_self_contained()
+        self._chunks += 1
+
+    def _check_self_contained(self):
+        # An upload is stored on its own, so it may not point at other files: every buffer
+        # is the BIN chunk and every image is a bufferView or a data: uri
+        for i, buffer in enumerate(self.gltf.get('buffers') or []):
+            if not isinstance(buffer, dict) or 'uri' in buffer:
+                raise GLTFError(f'Buffer {i} is not the BIN chunk; uploads must be self-contained')
+        for i, image in enumerate(self.gltf.get('images') or []):
+            if not isinstance(image, dict):
+                raise GLTFError(f'Image {i} is not an object')
+            uri = image.get('uri')
+            if 'bufferView' not in image and not (isinstance(uri, str) and uri.startswith('data:')):
+                raise GLTFError(f'Image {i} refers to an external file; uploads must be self-contained')
+
+    def finish(self):
+        # Call after the last byte; raises unless a complete, consistent GLB was received
+        if self.length is None or self.received != self.length or self._header or self._chunk_left:
+            raise GLTFError(f'Truncated GLB: received {self.received} of {self.length or "?"} bytes')
+        if self.gltf is None:
+            raise GLTFError('GLB has no JSON chunk')
+        buffers = self.gltf.get('buffers', [])
+        if buffers and (self.bin_length or 0) < buffers[0].get('byteLength', 0):
+            raise GLTFError(f"Buffer 0 needs {buffers[0].get('byteLength')} bytes, BIN chunk has {self.bin_length or 0}")
+        return self.gltf
+
+
+def receive_glb(stream, folder, filename, max_bytes=None, chunk_size=INGEST_CHUNK_SIZE):
+    # Copies an uploaded GLB from a file-like stream into folder/filename. Bytes are hashed
+    # (BLAKE2b, as hash_file does) and validated as they arrive, written to a hidden temp
+    # file in the same folder, and renamed over the destination only once the whole file
+    # checked out, so readers never see a partial export. Returns (path, content hash, size).
+    validator = GLBStreamValidator(max_bytes)
+    digest = hashlib.blake2b(digest_size=16)
+    path = os.path.join(folder, filename)
+    tmp = os.path.join(folder, f'.{filename}.{uuid.uuid4().hex}.part')
+    try:
+        with open(tmp, 'wb') as f:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                validator.feed(chunk)
+                digest.update(chunk)
+                f.write(chunk)
+        validator.finish()
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path, digest.hexdigest(), validator.received
@@ -0,0 +1,235 @@
+# lod.py
+import json
+import os
+import time
+
+import numpy as np
+
+from glb_reader import GLTFDocument
+from glb_writer import ARRAY_BUFFER, ELEMENT_ARRAY_BUFFER, GLBRewriter
+
+TRIANGLES = 4
+MIN_TRIANGLES = 32  # Primitives smaller than this are kept whole in every level
+MAX_GRID = 4096
+# A level is only published when it is at most this fraction of the next finer level's bytes;
+# otherwise viewers would download nearly the whole export twice
+MAX_LEVEL_FRACTION = 0.6
+
+# Upper triangle of a symmetric 4x4 quadric, row-major
+_QUADRIC_TERMS = [(0, 0), (0, 1), (0, 2), (0, 3), (1, 1), (1, 2), (1, 3), (2, 2), (2, 3), (3, 3)]
+
+
+def vertex_quadrics(positions, triangles):
+    # Area-weighted sum of face plane quadrics at each vertex, as (V, 10) upper-triangle terms
+    p0, p1, p2 = (positions[triangles[:, k]] for k in range(3))
+    normal = np.cross(p1 - p0, p2 - p0)
+    area = np.linalg.norm(normal, axis=1)
+    unit = normal / np.maximum(area, 1e-30)[:, None]
+    plane = np.concatenate([unit, -np.einsum('ij,ij->i', unit, p0)[:, None]], axis=1)
+    corners = triangles.ravel()
+    quadrics = np.empty((len(positions), len(_QUADRIC_TERMS)))
+    for column, (i, j) in enumerate(_QUADRIC_TERMS):
+        term = np.repeat(plane[:, i] * plane[:, j] * area, 3)
+        quadrics[:, column] = np.bincount(corners, weights=term, minlength=len(positions))
+    return quadrics
+
+
+def _cluster_ids(positions, low, cell):
+    cells = np.floor((positions - low) / cell).astype(np.int64)
+    cells = np.clip(cells, 0, MAX_GRID - 1)
+    return cells[:, 0] + MAX_GRID * (cells[:, 1] + MAX_GRID * cells[:, 2])
+
+
+def _surviving(clusters, triangles):
+    c = clusters[triangles]
+    keep = (c[:, 0] != c[:, 1]) & (c[:, 1] != c[:, 2]) & (c[:, 0] != c[:, 2])
+    return c[keep]
+
+
+def _solve_positions(quadrics, fallback, low, high):
+    # Minimizes each cluster's summed quadric error; ill-conditioned clusters (flat or
+    # sparse regions) keep the mean position, and results are clamped to the cluster cell
+    q = quadrics
+    a = np.stack([
+        np.stack([q[:, 0], q[:, 1], q[:, 2]], -1),
+        np.stack([q[:, 1], q[:, 4], q[:, 5]], -1),
+        np.stack([q[:, 2], q[:, 5], q[:, 7]], -1),
+    ], axis=1)
+    b = -np.stack([q[:, 3], q[:, 6], q[:, 8]], -1)
+    scale = np.maximum(np.abs(a).max(axis=(1, 2)), 1e-30)
+    det = np.linalg.det(a / scale[:, None, None])
+    solvable = np.abs(det) > 1e-3
+    result = fallback.copy()
+    if solvable.any():
+        result[solvable] = np.linalg.solve(a[solvable], b[solvable][..., None])[..., 0]
+    return np.clip(result, low, high)
+
+
+def simplify(positions, indices, target_triangles, attributes=None):
+    # Vertex-clustering decimation with quadric-optimal representatives (Lindstrom 2000):
+    # a uniform grid is searched for the resolution that lands nearest target_triangles,
+    # each occupied cell collapses to the point minimizing its accumulated plane quadrics,
+    # and degenerate or duplicated triangles are dropped. Fully vectorized.
+    # Returns (positions, indices, attributes) for the simplified mesh.
+    positions = np.asarray(positions, dtype=np.float64)
+    triangles = np.asarray(indices, dtype=np.int64).reshape(-1, 3)
+    attributes = attributes or {}
+    low = positions.min(axis=0)
+    extent = max(float((positions.max(axis=0) - low).max()), 1e-12)
+
+    lo, hi = 1, MAX_GRID
+    best = None
+    while lo <= hi:
+        grid = (lo + hi) // 2
+        cell = extent / grid * (1 + 1e-9)
+        clusters = _cluster_ids(positions, low, cell)
+        count = len(_surviving(clusters, triangles))
+        if best is None or abs(count - target_triangles) < abs(best[1] - target_triangles):
+            best = (grid, count)
+        if count < target_triangles:
+            lo = grid + 1
+        elif count > target_triangles:
+            hi = grid - 1
+        else:
+            break
+
+    cell = extent / best[0] * (1 + 1e-9)
+    clusters = _cluster_ids(positions, low, cell)
+    kept = _surviving(clusters, triangles)
+    used, compact = np.unique(clusters, return_inverse=True)
+    compact = compact.ravel()
+    kept = np.searchsorted(used, kept)
+
+    # Drop triangles that collapsed onto the same three clusters, keeping the first winding
+    order = np.sort(kept, axis=1)
+    _, first = np.unique(order, axis=0, return_index=True)
+    kept = kept[np.sort(first)]
+
+    counts = np.bincount(compact, minlength=len(used)).astype(np.float64)
+    mean = np.stack([np.bincount(compact, weights=positions[:, k], minlength=len(used)) for k in range(3)], -1)
+    mean /= counts[:, None]
+    quadrics = vertex_quadrics(positions, triangles)
+    cluster_quadrics = np.stack([np.bincount(compact, weights=quadrics[:, k], minlength=len(used))
+                                 for k in range(quadrics.shape[1])], -1)
+    cells = np.stack([used % MAX_GRID, (used // MAX_GRID) % MAX_GRID, used // (MAX_GRID * MAX_GRID)], -1)
+    cell_low = low + cells * cell
+    new_positions = _solve_positions(cluster_quadrics, mean, cell_low, cell_low + cell)
+
+    new_attributes = {}
+    for name, values in attributes.items():
+        values = np.asarray(values)
+        if values.dtype.kind == 'f':
+            flat = values.reshape(len(values), -1).astype(np.float64)
+            averaged = np.stack([np.bincount(compact, weights=flat[:, k], minlength=len(used))
+                                 for k in range(flat.shape[1])], -1) / counts[:, None]
+            if name in ('NORMAL', 'TANGENT'):
+                xyz = averaged[:, :3]
+                averaged[:, :3] = xyz / np.maximum(np.linalg.norm(xyz, axis=1, keepdims=True), 1e-12)
+            new_attributes[name] = averaged.astype(values.dtype).reshape((len(used),) + values.shape[1:])
+        else:
+            # Integer data (joints, packed ids) cannot be averaged; take one member's value
+            representative = np.zeros(len(used), dtype=np.int64)
+            representative[compact] = np.arange(len(compact))
+            new_attributes[name] = values[representative]
+
+    # Only clusters still referenced by a triangle become vertices
+    referenced = np.unique(kept)
+    remap = np.full(len(used), -1, dtype=np.int64)
+    remap[referenced] = np.arange(len(referenced))
+    new_attributes = {name: values[referenced] for name, values in new_attributes.items()}
+    return new_positions[referenced].astype(np.float32), remap[kept].ravel(), new_attributes
+
+
+class _LODWriter(GLBRewriter):
+    def __init__(self, doc, ratio):
+        super().__init__(doc)
+        self.ratio = ratio
+        self.triangles_in = 0
+        self.triangles_out = 0
+
+    def primitive(self, primitive):
+        attributes = primitive['attributes']
+        triangle_count = 0
+        if primitive.get('mode', TRIANGLES) == TRIANGLES and 'POSITION' in attributes:
+            if 'indices' in primitive:
+                triangle_count = self.doc.accessors[primitive['indices']]['count'] // 3
+            else:
+                triangle_count = self.doc.accessors[attributes['POSITION']]['count'] // 3
+        self.triangles_in += triangle_count
+        target = int(triangle_count * self.ratio)
+        # Morph targets would need the same collapse applied per target; keep those whole
+        if target < MIN_TRIANGLES or 'targets' in primitive:
+            self.triangles_out += triangle_count
+            self.copy_primitive(primitive)
+            return
+
+        positions = self.doc.accessor(attributes['POSITION'])
+        if 'indices' in primitive:
+            indices = self.doc.accessor(primitive['indices'])
+        else:
+            indices = np.arange(len(positions))
+        indices = indices[:len(indices) - len(indices) % 3]
+        others = {name: self._dequantized(acc) for name, acc in attributes.items() if name != 'POSITION'}
+        new_positions, new_indices, new_attributes = simplify(positions, indices, target, others)
+        if not len(new_indices):
+            self.triangles_out += triangle_count
+            self.copy_primitive(primitive)
+            return
+
+        self.triangles_out += len(new_indices) // 3
+        attributes['POSITION'] = self.builder.add_accessor(new_positions, target=ARRAY_BUFFER, bounds=True)
+        for name, values in new_attributes.items():
+            attributes[name] = self.builder.add_accessor(values, target=ARRAY_BUFFER)
+        index_dtype = np.uint16 if len(new_positions) < 65536 else np.uint32
+        primitive['indices'] = self.builder.add_accessor(new_indices.astype(index_dtype), target=ELEMENT_ARRAY_BUFFER)
+
+    def _dequantized(self, index):
+        # Normalized integer attributes are averaged as floats and written back as float32
+        values = self.doc.accessor(index)
+        if self.doc.accessors[index].get('normalized'):
+            return np.maximum(values.astype(np.float32) / np.iinfo(values.dtype).max, -1.0)
+        return values
+
+
+def build_lod(source_path, dest_path, ratio):
+    # Writes one decimated level keeping ratio of each primitive's triangles
+    with GLTFDocument(source_path) as doc:
+        writer = _LODWriter(doc, ratio)
+        writer.run().write(dest_path)
+    return {'ratio': ratio, 'triangles': writer.triangles_out, 'source_triangles': writer.triangles_in,
+            'bytes': os.path.getsize(dest_path)}
+
+
+def lod_path(cache_folder, content_hash, ratio):
+    return os.path.join(cache_folder, f'{content_hash}.lod{round(ratio * 100)}.glb')
+
+
+def manifest_path(cache_folder, content_hash):
+    return os.path.join(cache_folder, f'{content_hash}.lod.json')
+
+
+def build_lod_chain(source_path, cache_folder, content_hash, ratios):
+    # Process-pool entry point: writes the coarse levels plus a manifest, coarsest first.
+    # Levels are built finest first and dropped unless they cut bytes and triangles against
+    # the finer level they would replace -- exports of many small parts keep most
+    # primitives whole and may end up with no coarse level at all.
+    # The manifest is written last so its presence means the whole chain is on disk.
+    os.makedirs(cache_folder, exist_ok=True)
+    levels = []
+    finer = {'bytes': os.path.getsize(source_path), 'triangles': None}
+    for ratio in sorted((r for r in ratios if r < 1.0), reverse=True):
+        start = time.perf_counter()
+        path = lod_path(cache_folder, content_hash, ratio)
+        level = build_lod(source_path, path, ratio)
+        level['seconds'] = time.perf_counter() - start
+        reference = finer['triangles'] if finer['triangles'] is not None else level['source_triangles']
+        if level['bytes'] > MAX_LEVEL_FRACTION * finer['bytes'] or level['triangles'] >= reference:
+            os.remove(path)
+            continue
+        levels.insert(0, level)
+        finer = level
+    tmp = f'{manifest_path(cache_folder, content_hash)}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'hash': content_hash, 'levels': levels}, f)
+    os.replace(tmp, manifest_path(cache_folder, content_hash))
+    return levels
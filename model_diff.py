@@ -0,0 +1,277 @@
+# model_diff.py
+import hashlib
+import json
+
+import numpy as np
+
+from glb_reader import GLTFDocument
+from glb_writer import GLBBuilder
+
+IDENTITY = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+
+def _digest():
+    return hashlib.blake2b(digest_size=16)
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':')).encode()
+
+
+def local_matrix(node):
+    # Column-major 4x4 local transform as a flat list, from either matrix or TRS
+    if 'matrix' in node:
+        return [float(v) for v in node['matrix']]
+    if not any(key in node for key in ('translation', 'rotation', 'scale')):
+        return list(IDENTITY)
+    x, y, z, w = node.get('rotation', [0.0, 0.0, 0.0, 1.0])
+    sx, sy, sz = node.get('scale', [1.0, 1.0, 1.0])
+    tx, ty, tz = node.get('translation', [0.0, 0.0, 0.0])
+    rotation = np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ]) * np.array([sx, sy, sz])
+    m = np.eye(4)
+    m[:3, :3] = rotation
+    m[:3, 3] = [tx, ty, tz]
+    return [float(v) for v in m.T.reshape(-1)]
+
+
+def _accessor_digest(doc, index, digest):
+    acc = doc.accessors[index]
+    digest.update(_canonical([acc['componentType'], acc['type'], acc['count'], acc.get('normalized', False)]))
+    digest.update(np.ascontiguousarray(doc.accessor(index)).data)
+
+
+def _texture_digests(doc, material):
+    # Hashes of every image a material samples, keyed by texture slot
+    digests = {}
+    textures = doc.json.get('textures', [])
+
+    def walk(value, slot):
+        if isinstance(value, dict):
+            if slot.endswith('Texture') and 'index' in value:
+                texture = textures[value['index']]
+                digest = _digest()
+                digest.update(_canonical(texture.get('sampler')))
+                digest.update(_image_bytes(doc, texture.get('source')))
+                digests[slot] = digest.hexdigest()
+            for key, item in value.items():
+                walk(item, key)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item, slot)
+
+    walk(material, '')
+    return digests
+
+
+def _image_bytes(doc, index):
+    if index is None:
+        return b''
+    image = doc.images[index]
+    if 'bufferView' in image:
+        return doc.buffer_view_bytes(image['bufferView'])
+    return image.get('uri', '').encode()
+
+
+def material_digest(doc, index):
+    material = doc.materials[index]
+    digest = _digest()
+    digest.update(_canonical(material))
+    digest.update(_canonical(_texture_digests(doc, material)))
+    return digest.hexdigest()
+
+
+def mesh_digest(doc, index):
+    # Geometry only: attributes, indices, morph targets and primitive modes
+    digest = _digest()
+    for primitive in doc.meshes[index]['primitives']:
+        digest.update(_canonical([primitive.get('mode', 4), sorted(primitive['attributes'])]))
+        for name in sorted(primitive['attributes']):
+            _accessor_digest(doc, primitive['attributes'][name], digest)
+        if 'indices' in primitive:
+            _accessor_digest(doc, primitive['indices'], digest)
+        for target in primitive.get('targets', []):
+            for name in sorted(target):
+                _accessor_digest(doc, target[name], digest)
+    return digest.hexdigest()
+
+
+def mesh_byte_size(doc, index):
+    total = 0
+    for primitive in doc.meshes[index]['primitives']:
+        accessors = list(primitive['attributes'].values())
+        if 'indices' in primitive:
+            accessors.append(primitive['indices'])
+        for acc in accessors:
+            total += doc.accessor(acc).nbytes
+    return total
+
+
+def node_paths(doc):
+    # Stable keys for nodes across exports: the chain of names from the scene root.
+    # Unnamed or duplicate names fall back to the child position under the parent.
+    paths = {}
+    taken = set()
+    nodes = doc.nodes
+    parents = {child: i for i, node in enumerate(nodes) for child in node.get('children', [])}
+    roots = [i for i in range(len(nodes)) if i not in parents]
+
+    def visit(index, prefix, position):
+        name = nodes[index].get('name') or f'#{position}'
+        key = f'{prefix}/{name}'
+        if key in taken:
+            key = f'{key}#{position}'
+        taken.add(key)
+        paths[index] = key
+        for pos, child in enumerate(nodes[index].get('children', [])):
+            visit(child, key, pos)
+
+    for pos, root in enumerate(roots):
+        visit(root, '', pos)
+    return paths
+
+
+def compute_digest(path):
+    # Per-node, per-mesh and per-material content hashes for one export
+    with GLTFDocument(path) as doc:
+        materials = [material_digest(doc, i) for i in range(len(doc.materials))]
+        meshes = [mesh_digest(doc, i) for i in range(len(doc.meshes))]
+        mesh_bytes = [mesh_byte_size(doc, i) for i in range(len(doc.meshes))]
+        nodes = {}
+        for index, key in node_paths(doc).items():
+            node = doc.nodes[index]
+            mesh = node.get('mesh')
+            mesh_materials = []
+            if mesh is not None:
+                mesh_materials = [materials[p['material']] if 'material' in p else None
+                                  for p in doc.meshes[mesh]['primitives']]
+            nodes[key] = {
+                'index': index,
+                'mesh': mesh,
+                'mesh_hash': meshes[mesh] if mesh is not None else None,
+                'materials': mesh_materials,
+                'matrix': local_matrix(node),
+                'bytes': mesh_bytes[mesh] if mesh is not None else 0,
+            }
+    return {'nodes': nodes, 'meshes': meshes, 'mesh_bytes': mesh_bytes, 'materials': materials}
+
+
+def diff_digests(old, new):
+    # Classifies every node as added, removed, changed (geometry or material) or
+    # transform-only, and tallies the bytes a client must fetch to apply the delta
+    old_nodes, new_nodes = old['nodes'], new['nodes']
+    delta = {'added': [], 'removed': [], 'changed': [], 'transform_only': [], 'renumbered': []}
+    fetched_meshes = set()
+    delta_bytes = 0
+    for key, node in new_nodes.items():
+        before = old_nodes.get(key)
+        if before is None:
+            delta['added'].append({'node': key, 'index': node['index'], 'mesh': node['mesh']})
+            if node['mesh'] is not None and node['mesh'] not in fetched_meshes:
+                fetched_meshes.add(node['mesh'])
+                delta_bytes += node['bytes']
+            continue
+        if before['index'] != node['index']:
+            delta['renumbered'].append([before['index'], node['index']])
+        if (before['mesh_hash'], before['materials']) != (node['mesh_hash'], node['materials']):
+            delta['changed'].append({'node': key, 'index': node['index'], 'previous_index': before['index'],
+                                     'mesh': node['mesh'], 'matrix': node['matrix'], 'bytes': node['bytes']})
+            if node['mesh'] is not None and node['mesh'] not in fetched_meshes:
+                fetched_meshes.add(node['mesh'])
+                delta_bytes += node['bytes']
+        elif before['matrix'] != node['matrix']:
+            delta['transform_only'].append({'node': key, 'index': node['index'],
+                                            'previous_index': before['index'], 'matrix': node['matrix']})
+    for key, node in old_nodes.items():
+        if key not in new_nodes:
+            delta['removed'].append({'node': key, 'previous_index': node['index']})
+    delta['delta_bytes'] = delta_bytes
+    delta['full_bytes'] = sum(new['mesh_bytes'])
+    return delta
+
+
+def extract_mesh_glb(path, mesh_index):
+    # Standalone GLB holding a single mesh (with its materials and textures) under one node,
+    # so a client can fetch just what changed and load it with a stock glTF loader
+    with GLTFDocument(path) as doc:
+        builder = GLBBuilder()
+        gltf = builder.json
+        material_map, texture_map, image_map, sampler_map = {}, {}, {}, {}
+
+        def copy_accessor(index):
+            acc = doc.accessors[index]
+            new_index = builder.add_accessor(doc.accessor(index), normalized=acc.get('normalized', False))
+            for key in ('min', 'max'):
+                if key in acc:
+                    builder.json['accessors'][new_index][key] = acc[key]
+            return new_index
+
+        def copy_image(index):
+            if index not in image_map:
+                image = dict(doc.images[index])
+                if 'bufferView' in image:
+                    image['bufferView'] = builder.add_buffer_view(doc.buffer_view_bytes(image['bufferView']))
+                gltf.setdefault('images', []).append(image)
+                image_map[index] = len(gltf['images']) - 1
+            return image_map[index]
+
+        def copy_texture(index):
+            if index not in texture_map:
+                texture = dict(doc.json['textures'][index])
+                if 'source' in texture:
+                    texture['source'] = copy_image(texture['source'])
+                if 'sampler' in texture:
+                    sampler = texture['sampler']
+                    if sampler not in sampler_map:
+                        gltf.setdefault('samplers', []).append(doc.json['samplers'][sampler])
+                        sampler_map[sampler] = len(gltf['samplers']) - 1
+                    texture['sampler'] = sampler_map[sampler]
+                gltf.setdefault('textures', []).append(texture)
+                texture_map[index] = len(gltf['textures']) - 1
+            return texture_map[index]
+
+        def remap_textures(value, slot=''):
+            if isinstance(value, dict):
+                value = {k: remap_textures(v, k) for k, v in value.items()}
+                if slot.endswith('Texture') and 'index' in value:
+                    value['index'] = copy_texture(value['index'])
+                return value
+            if isinstance(value, list):
+                return [remap_textures(v, slot) for v in value]
+            return value
+
+        def copy_material(index):
+            if index not in material_map:
+                gltf.setdefault('materials', []).append(remap_textures(doc.materials[index]))
+                material_map[index] = len(gltf['materials']) - 1
+            return material_map[index]
+
+        source = doc.meshes[mesh_index]
+        primitives = []
+        for primitive in source['primitives']:
+            out = {'attributes': {name: copy_accessor(acc) for name, acc in primitive['attributes'].items()}}
+            if 'indices' in primitive:
+                out['indices'] = copy_accessor(primitive['indices'])
+            if 'material' in primitive:
+                out['material'] = copy_material(primitive['material'])
+            if 'mode' in primitive:
+                out['mode'] = primitive['mode']
+            if 'targets' in primitive:
+                out['targets'] = [{name: copy_accessor(acc) for name, acc in t.items()} for t in primitive['targets']]
+            primitives.append(out)
+        mesh = {'primitives': primitives}
+        if 'name' in source:
+            mesh['name'] = source['name']
+        gltf['meshes'] = [mesh]
+        gltf['nodes'] = [{'mesh': 0, 'name': source.get('name', f'mesh_{mesh_index}')}]
+        gltf['scenes'] = [{'nodes': [0]}]
+        gltf['scene'] = 0
+        used = [ext for ext in doc.json.get('extensionsUsed', []) if ext.startswith('KHR_materials') or ext == 'KHR_mesh_quantization']
+        if used:
+            gltf['extensionsUsed'] = used
+        if 'KHR_mesh_quantization' in doc.json.get('extensionsRequired', []):
+            gltf['extensionsRequired'] = ['KHR_mesh_quantization']
+        return builder.to_bytes()
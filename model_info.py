@@ -0,0 +1,164 @@
+# model_info.py
+import os
+
+import numpy as np
+
+from glb_reader import COMPONENT_DTYPES, TYPE_SIZES, GLTFDocument, GLTFError
+from model_diff import local_matrix
+
+# Primitive modes -> triangles for a given element count
+TRIANGLE_COUNTS = {4: lambda n: n // 3, 5: lambda n: max(n - 2, 0), 6: lambda n: max(n - 2, 0)}
+
+
+def accessor_byte_size(acc):
+    # Tightly packed size from the accessor metadata alone
+    return acc['count'] * TYPE_SIZES[acc['type']] * np.dtype(COMPONENT_DTYPES[acc['componentType']]).itemsize
+
+
+def _position_bounds(doc, index):
+    # Object-space box of a POSITION accessor, dequantizing normalized integer bounds
+    low, high = doc.accessor_bounds(index)
+    acc = doc.accessors[index]
+    if acc.get('normalized'):
+        scale = np.iinfo(COMPONENT_DTYPES[acc['componentType']]).max
+        low, high = np.maximum(low / scale, -1.0), np.maximum(high / scale, -1.0)
+    return low, high
+
+
+def _transform_box(matrix, low, high):
+    corners = np.array([[x, y, z, 1.0] for x in (low[0], high[0]) for y in (low[1], high[1])
+                        for z in (low[2], high[2])])
+    world = corners @ matrix.T
+    return world[:, :3].min(axis=0), world[:, :3].max(axis=0)
+
+
+def _texture_indices(value, found, slot=''):
+    # Every texture index a material references, in any *Texture slot or extension
+    if isinstance(value, dict):
+        if slot.endswith('Texture') and 'index' in value:
+            found.add(value['index'])
+        for key, item in value.items():
+            _texture_indices(item, found, key)
+    elif isinstance(value, list):
+        for item in value:
+            _texture_indices(item, found, slot)
+    return found
+
+
+def _scene_instances(doc):
+    # (mesh index, world matrix) for every mesh instance in the default scene
+    nodes = doc.nodes
+    scenes = doc.json.get('scenes', [])
+    if scenes:
+        roots = scenes[doc.json.get('scene', 0)].get('nodes', [])
+    else:
+        children = {child for node in nodes for child in node.get('children', [])}
+        roots = [i for i in range(len(nodes)) if i not in children]
+    instances = []
+    stack = [(root, np.eye(4)) for root in roots]
+    while stack:
+        index, parent = stack.pop()
+        node = nodes[index]
+        world = parent @ np.array(local_matrix(node)).reshape(4, 4).T
+        if 'mesh' in node:
+            instances.append((node['mesh'], world))
+        stack.extend((child, world) for child in node.get('children', []))
+    return instances
+
+
+def mesh_stats(doc, index):
+    # Geometry counts and byte budget of one mesh, read from accessor metadata only
+    mesh = doc.meshes[index]
+    accessors = doc.accessors
+    triangles = vertices = 0
+    used = set()
+    materials = set()
+    for primitive in mesh['primitives']:
+        attributes = primitive['attributes']
+        if 'POSITION' in attributes:
+            vertices += accessors[attributes['POSITION']]['count']
+        elements = primitive.get('indices', attributes.get('POSITION'))
+        count_triangles = TRIANGLE_COUNTS.get(primitive.get('mode', 4))
+        if elements is not None and count_triangles:
+            triangles += count_triangles(accessors[elements]['count'])
+        used.update(attributes.values())
+        if 'indices' in primitive:
+            used.add(primitive['indices'])
+        for target in primitive.get('targets', []):
+            used.update(target.values())
+        if 'material' in primitive:
+            materials.add(primitive['material'])
+
+    textures = set()
+    for material in materials:
+        _texture_indices(doc.materials[material], textures)
+    images = {doc.json['textures'][t].get('source') for t in textures} - {None}
+    views = doc.buffer_views
+    texture_bytes = sum(views[doc.images[i]['bufferView']]['byteLength'] for i in images if 'bufferView' in doc.images[i])
+    return {
+        'index': index,
+        'name': mesh.get('name'),
+        'primitives': len(mesh['primitives']),
+        'triangles': triangles,
+        'vertices': vertices,
+        'geometry_bytes': sum(accessor_byte_size(accessors[a]) for a in used),
+        'texture_bytes': texture_bytes,
+        'materials': sorted(materials),
+    }
+
+
+def model_info(path):
+    # Scene statistics and world-space bounds for an export. Bounds come from the POSITION
+    # accessors' min/max, which exporters are required to write, so vertex data is only
+    # decoded for accessors that lack them.
+    with GLTFDocument(path) as doc:
+        meshes = [mesh_stats(doc, i) for i in range(len(doc.meshes))]
+        instances = _scene_instances(doc)
+        boxes = {}
+        decoded = 0
+        low, high = np.full(3, np.inf), np.full(3, -np.inf)
+        for mesh_index, world in instances:
+            for primitive in doc.meshes[mesh_index]['primitives']:
+                position = primitive['attributes'].get('POSITION')
+                if position is None:
+                    continue
+                if position not in boxes:
+                    acc = doc.accessors[position]
+                    decoded += not ('min' in acc and 'max' in acc)
+                    try:
+                        boxes[position] = _position_bounds(doc, position)
+                    except (OSError, GLTFError) as e:
+                        print(f'[model-info] No bounds for accessor {position}: {e}')
+                        boxes[position] = None
+                if boxes[position] is not None:
+                    box_low, box_high = _transform_box(world, *boxes[position])
+                    low, high = np.minimum(low, box_low), np.maximum(high, box_high)
+        for mesh in meshes:
+            mesh['instances'] = 0
+        for mesh_index, _ in instances:
+            meshes[mesh_index]['instances'] += 1
+
+        bounds = None
+        if np.isfinite(low).all():
+            bounds = {'min': low.tolist(), 'max': high.tolist(), 'center': ((low + high) / 2).tolist(),
+                      'size': (high - low).tolist()}
+        return {
+            'bytes': os.path.getsize(path),
+            'bounds': bounds,
+            'triangles': sum(meshes[m]['triangles'] for m, _ in instances),
+            'vertices': sum(meshes[m]['vertices'] for m, _ in instances),
+            'unique_triangles': sum(mesh['triangles'] for mesh in meshes),
+            'unique_vertices': sum(mesh['vertices'] for mesh in meshes),
+            'counts': {
+                'nodes': len(doc.nodes),
+                'instances': len(instances),
+                'meshes': len(doc.meshes),
+                'primitives': sum(mesh['primitives'] for mesh in meshes),
+                'materials': len(doc.materials),
+                'textures': len(doc.json.get('textures', [])),
+                'images': len(doc.images),
+            },
+            'geometry_bytes': sum(mesh['geometry_bytes'] for mesh in meshes),
+            'decoded_accessors': decoded,
+            'meshes': meshes,
+        }
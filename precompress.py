@@ -0,0 +1,91 @@
+# precompress.py
+import gzip
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip alone still covers every browser
+    brotli = None
+
+CHUNK_SIZE = 1 << 20
+
+# Content-Encoding -> file suffix, in server preference order
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+
+def _compress_gzip(src, dest, level):
+    with open(src, 'rb') as f_in, open(dest, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=level, mtime=0) as f_out:
+            for chunk in iter(lambda: f_in.read(CHUNK_SIZE), b''):
+                f_out.write(chunk)
+
+
+def _compress_brotli(src, dest, quality):
+    compressor = brotli.Compressor(quality=quality)
+    with open(src, 'rb') as f_in, open(dest, 'wb') as f_out:
+        for chunk in iter(lambda: f_in.read(CHUNK_SIZE), b''):
+            f_out.write(compressor.process(chunk))
+        f_out.write(compressor.finish())
+
+
+class Precompressor:
+    # Builds gzip/brotli variants of each export once, on a background worker, and stores
+    # them by content hash so every viewer after the first gets the compressed bytes for free
+    def __init__(self, cache_folder, workers=1, gzip_level=9, brotli_quality=9):
+        self.cache_folder = cache_folder
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='precompress')
+        self._jobs = {}  # content hash -> Future
+        self._lock = threading.Lock()
+
+    def encodings(self):
+        return [enc for enc in ENCODINGS if enc != 'br' or brotli is not None]
+
+    def variant_path(self, content_hash, encoding):
+        return os.path.join(self.cache_folder, f'{content_hash}.glb{ENCODINGS[encoding]}')
+
+    def ready(self, content_hash):
+        # Encodings whose variant is complete on disk
+        return [enc for enc in self.encodings() if os.path.exists(self.variant_path(content_hash, enc))]
+
+    def submit(self, path, content_hash):
+        with self._lock:
+            job = self._jobs.get(content_hash)
+            if job is None or (job.done() and len(self.ready(content_hash)) < len(self.encodings())):
+                job = self._executor.submit(self._build, path, content_hash)
+                self._jobs[content_hash] = job
+            return job
+
+    def discard(self, content_hash):
+        with self._lock:
+            self._jobs.pop(content_hash, None)
+        for enc in ENCODINGS:
+            try:
+                os.remove(self.variant_path(content_hash, enc))
+            except FileNotFoundError:
+                pass
+
+    def _build(self, path, content_hash):
+        os.makedirs(self.cache_folder, exist_ok=True)
+        source_size = os.path.getsize(path)
+        for enc in self.encodings():
+            dest = self.variant_path(content_hash, enc)
+            if os.path.exists(dest):
+                continue
+            tmp = f'{dest}.tmp'
+            try:
+                if enc == 'gzip':
+                    _compress_gzip(path, tmp, self.gzip_level)
+                else:
+                    _compress_brotli(path, tmp, self.brotli_quality)
+                # Renamed into place only when finished, so a half-written variant is never served
+                os.replace(tmp, dest)
+                ratio = os.path.getsize(dest) / max(source_size, 1)
+                print(f'[precompress] {os.path.basename(path)} {enc}: {ratio:.0%} of original')
+            except Exception as e:
+                print(f'[precompress] Failed to build {enc} for {os.path.basename(path)}: {e}')
+                if os.path.exists(tmp):
+                    os.remove(tmp)
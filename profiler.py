@@ -0,0 +1,87 @@
+# profiler.py
+import sys
+import threading
+from collections import Counter
+
+# Sampling period bounds: faster spins a core and starves the GIL, slower is too coarse to read
+MIN_INTERVAL = 0.001
+MAX_INTERVAL = 1.0
+
+
+def check_interval(interval):
+    # Returns interval as a float, or raises ValueError when it is outside the bounds
+    interval = float(interval)
+    if not MIN_INTERVAL <= interval <= MAX_INTERVAL:
+        raise ValueError(f'Sampling interval must be between {MIN_INTERVAL} and {MAX_INTERVAL} seconds')
+    return interval
+
+
+class SamplingProfiler:
+    # Statistical profiler that can be switched on and off while the server runs. A daemon
+    # thread snapshots every other thread's stack each interval, so instrumented code pays
+    # nothing per call; the cost is one stack walk per sample, spread over all events.
+    # Stacks are aggregated in the folded format flamegraph.pl and speedscope read.
+    def __init__(self, interval=0.005, max_depth=64):
+        self.interval = check_interval(interval)
+        self.max_depth = max_depth
+        self.samples = 0
+        self._stacks = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval=None):
+        if interval is not None:
+            self.interval = check_interval(interval)
+        if self.running:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id, frame in frames.items():
+                if thread_id == own:
+                    continue
+                name = names.get(thread_id)
+                if name is None:
+                    names.update((t.ident, t.name) for t in threading.enumerate())
+                    name = names.setdefault(thread_id, str(thread_id))
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({code.co_filename.rsplit("/", 1)[-1]}:{code.co_firstlineno})')
+                    frame = frame.f_back
+                stack.append(name)
+                with self._lock:
+                    self._stacks[';'.join(reversed(stack))] += 1
+            del frames
+            with self._lock:
+                self.samples += 1
+
+    def folded(self, limit=None):
+        # "thread;outer;...;inner count" lines, heaviest first
+        with self._lock:
+            items = self._stacks.most_common(limit)
+        return '\n'.join(f'{stack} {count}' for stack, count in items) + '\n'
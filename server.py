@@ -1,15 +1,67 @@
 # server.py
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, Response, abort, g, jsonify, request, send_file, send_from_directory
 from flask_socketio import SocketIO
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-import threading, time, os
+from export_catalog import ExportCatalog, hash_file
+from change_scheduler import ChangeScheduler
+from model_diff import compute_digest, diff_digests, extract_mesh_glb
+from precompress import Precompressor
+from glb_optimizer import optimize_glb
+from lod import build_lod_chain, lod_path, manifest_path
+from textures import TextureCache, build_web_light
+from model_info import model_info
+from export_store import ExportStore
+from ingest import receive_glb
+from glb_reader import GLTFError
+from metrics import BYTE_BUCKETS, MetricsRegistry
+from profiler import SamplingProfiler, check_interval
+from werkzeug.utils import safe_join, secure_filename
+from werkzeug.wsgi import ClosingIterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+import hmac, json, multiprocessing, threading, time, os
 
 # Path setup 
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 EXPORTS_FOLDER = os.path.join(PROJECT_ROOT, 'blender_exports')
+CACHE_FOLDER = os.path.join(EXPORTS_FOLDER, '.cache')  # Derived files; the watcher is not recursive
 STATIC_FOLDER = os.path.join(PROJECT_ROOT, 'viewer')
 
+# Post-export optimization: welded, cache-ordered, quantized copy of each export
+OPTIMIZE_EXPORTS = True
+OPTIMIZE_TOLERANCE = 0.005  # Max per-component error allowed when quantizing attributes
+
+# Level-of-detail chain: fraction of triangles kept per level (1.0 is the export itself)
+LOD_RATIOS = (1.0, 0.25, 0.05)
+
+# Texture variants (longest side in pixels) and encodings; needs Pillow
+TEXTURE_SIZES = (2048, 1024, 512)
+TEXTURE_FORMATS = ('webp', 'jpeg')
+BUILD_WEB_LIGHT = True  # Repack each export to reference WEB_LIGHT_TEXTURE_SIZE variants
+WEB_LIGHT_TEXTURE_SIZE = 1024
+
+# Worker processes for CPU-bound stages (decimation, texture encoding)
+PROCESS_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+# Deduplicated version history of every export, with optional retention and garbage collection.
+# Both limits delete data, so they are off unless set, and never applied by the startup backfill.
+STORE_FOLDER = os.path.join(EXPORTS_FOLDER, '.store')
+STORE_RETENTION = None  # An export_store.RetentionPolicy, e.g. keep_last=200; None keeps every version
+EXPORT_FILES_KEPT = None  # e.g. 50 removes older exports from the folder once stored; None keeps every file
+
+# Largest upload POST /ingest accepts (the GLB header's length field tops out at 4 GB)
+INGEST_MAX_BYTES = 2 << 30
+# Shared secret exporters (and POST /profiler) send as X-Ingest-Token; None accepts any client that
+# can reach the port.
+# Uploads must be Content-Type model/gltf-binary either way, which browsers never send cross-origin
+# without a CORS preflight this server does not answer.
+INGEST_TOKEN = None
+
+# Sampling profiler, off until toggled through POST /profiler
+PROFILER_INTERVAL = 0.005
+
 print(f"PROJECT_ROOT: {PROJECT_ROOT}")
 print(f"STATIC_FOLDER: {STATIC_FOLDER} | exists: {os.path.exists(STATIC_FOLDER)}")
 print(f"EXPORTS_FOLDER: {EXPORTS_FOLDER} | exists: {os.path.exists(EXPORTS_FOLDER)}")
@@ -18,6 +70,105 @@ print(f"EXPORTS_FOLDER: {EXPORTS_FOLDER} | exists: {os.path.exists(EXPORTS_FOLDE
 app = Flask(__name__, static_folder='viewer', static_url_path='')
 socketio = SocketIO(app, cors_allowed_origins="*")
 
+# Index of exports, seeded at startup and kept current by the file watcher
+catalog = ExportCatalog(EXPORTS_FOLDER, hash_index=os.path.join(CACHE_FOLDER, 'catalog-hashes.json'))
+
+# Background gzip/brotli variants, built once per export content hash
+precompressor = Precompressor(CACHE_FOLDER)
+
+# Version history; any retained version can be rebuilt byte for byte
+store = ExportStore(STORE_FOLDER)
+
+# Processing stages that run after an export is announced, off the watcher thread
+pipeline = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pipeline')
+
+# Timing of every hop from the artist's save to the viewer's download, served at /metrics
+metrics = MetricsRegistry()
+watch_events = metrics.counter('b2t_watch_events_total', 'Filesystem events received from watchdog', ['type'])
+watch_event_delay = metrics.histogram('b2t_watch_event_delay_seconds',
+                                      'Last write (file mtime) to the watchdog event reporting it')
+watch_write = metrics.histogram('b2t_watch_write_seconds', 'First to last filesystem event of one export write')
+watch_settle = metrics.histogram('b2t_watch_settle_seconds', 'Last filesystem event to the write being declared complete')
+announce_stage = metrics.histogram('b2t_announce_stage_seconds', 'Steps of announcing a settled export', ['stage'])
+export_to_emit = metrics.histogram('b2t_export_to_emit_seconds', 'Last write of an export to its model_updated emit')
+socket_emit = metrics.histogram('b2t_socket_emit_seconds', 'Socket broadcast duration', ['event'])
+socket_emit_bytes = metrics.histogram('b2t_socket_emit_bytes', 'Socket broadcast JSON payload size', ['event'],
+                                      buckets=BYTE_BUCKETS)
+socket_clients = metrics.gauge('b2t_socket_clients', 'Connected viewers')
+pipeline_stage = metrics.histogram('b2t_pipeline_stage_seconds', 'Post-export stage duration, queueing included',
+                                   ['stage'])
+ingest_uploads = metrics.counter('b2t_ingest_uploads_total', 'Uploads to /ingest by outcome', ['result'])
+ingest_receive = metrics.histogram('b2t_ingest_receive_seconds',
+                                   'Upload body received, validated, hashed and committed')
+ingest_to_emit = metrics.histogram('b2t_ingest_to_emit_seconds', 'Last uploaded byte committed to its model_updated emit')
+http_duration = metrics.histogram('b2t_http_request_seconds', 'Request start to response fully sent', ['endpoint'])
+http_bytes = metrics.histogram('b2t_http_response_bytes', 'Response body bytes', ['endpoint', 'status'],
+                               buckets=BYTE_BUCKETS)
+
+profiler = SamplingProfiler(PROFILER_INTERVAL)
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def _record_request(response):
+    # Observed when the server closes the response, so streamed files count their transfer time
+    start = g.get('request_start', time.perf_counter())
+    endpoint = request.endpoint or 'unmatched'
+    size = response.content_length or 0
+    status = str(response.status_code)
+
+    def record():
+        http_duration.observe(time.perf_counter() - start, endpoint)
+        http_bytes.observe(size, endpoint, status)
+    if response.direct_passthrough:
+        # send_file responses bypass the close callbacks, so wrap their file iterator instead
+        response.response = ClosingIterator(response.response, record)
+    else:
+        response.call_on_close(record)
+    return response
+
+@socketio.on('connect')
+def _viewer_connected(auth=None):
+    socket_clients.inc(1)
+
+@socketio.on('disconnect')
+def _viewer_disconnected(*args):
+    socket_clients.inc(-1)
+
+def broadcast(event, payload):
+    # socketio.emit with its duration and payload size recorded
+    start = time.perf_counter()
+    socketio.emit(event, payload)
+    socket_emit.observe(time.perf_counter() - start, event)
+    socket_emit_bytes.observe(len(json.dumps(payload, separators=(',', ':'))), event)
+
+def _time_job(job, stage):
+    # Records a background job from queueing to completion
+    start = time.perf_counter()
+    job.add_done_callback(lambda _: pipeline_stage.observe(time.perf_counter() - start, stage))
+    return job
+
+# CPU-bound stages run in separate processes and never hold the GIL the Flask/SocketIO
+# workers need. Spawned rather than forked since this process is threaded.
+def _new_process_pool():
+    return ProcessPoolExecutor(max_workers=PROCESS_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+
+process_pool = _new_process_pool()
+
+def process_submit(fn, *args):
+    global process_pool
+    try:
+        return process_pool.submit(fn, *args)
+    except BrokenProcessPool:
+        # A worker died (out of memory on a huge export, say); start a fresh pool
+        process_pool = _new_process_pool()
+        return process_pool.submit(fn, *args)
+
+texture_cache = TextureCache(os.path.join(CACHE_FOLDER, 'textures'), TEXTURE_SIZES, TEXTURE_FORMATS)
+_lod_jobs = {}  # content hash -> Future
+
 @app.route('/')
 def index():
     return app.send_static_file('index.html')
@@ -39,56 +190,558 @@ def latest_model():
     if not os.path.exists(EXPORTS_FOLDER):
         return jsonify(error='Exports folder not found'), 404
     
-    glbs = [f for f in os.listdir(EXPORTS_FOLDER) if f.endswith('.glb')]
-    if not glbs:
+    # Newest file by modification time comes straight from the catalog
+    latest = catalog.latest()
+    if latest is None:
         return jsonify(error='No .glb files found'), 404
-    
-    # Find newest file by modification time
-    latest = max(glbs, key=lambda f: os.path.getmtime(os.path.join(EXPORTS_FOLDER, f)))
-    return jsonify(filename=latest)
+    web_light = None
+    if os.path.exists(web_light_path(latest.hash)):
+        web_light = f'/web-light/{latest.hash}/{latest.filename}'
+    return jsonify(filename=latest.filename, size=latest.size, mtime=latest.mtime, hash=latest.hash,
+                   url=model_url(latest), web_light_url=web_light)
+
+# Paginated export history, newest first
+@app.route('/models')
+def list_models():
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    entries, total = catalog.page(offset, limit)
+    return jsonify(total=total, offset=offset, limit=limit,
+                   models=[e.to_dict() for e in entries])
+
+def optimized_path(content_hash):
+    return os.path.join(CACHE_FOLDER, f'{content_hash}.opt.glb')
+
+def model_url(entry):
+    # Viewers load the optimized copy once the pipeline has produced it
+    if os.path.exists(optimized_path(entry.hash)):
+        return f'/optimized/{entry.hash}/{entry.filename}'
+    return f'/exports/{entry.hash}/{entry.filename}'
+
+def _send_export(path, content_hash, immutable=False):
+    # Strong ETag from the content hash; If-None-Match and Range are handled by send_file.
+    # Ranges always address the identity bytes so resumed downloads line up.
+    encoding = None
+    if 'Range' not in request.headers:
+        encoding = request.accept_encodings.best_match(precompressor.ready(content_hash))
+    if encoding:
+        response = send_file(precompressor.variant_path(content_hash, encoding), mimetype='model/gltf-binary',
+                             conditional=True, etag=f'{content_hash}-{encoding}')
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_file(path, mimetype='model/gltf-binary', conditional=True, etag=content_hash)
+    response.vary.add('Accept-Encoding')
+    if immutable:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 # Serve GLB files directly
 @app.route('/blender_exports/<path:filename>')
 def serve_glb(filename):
-    return send_from_directory(EXPORTS_FOLDER, filename)
+    entry = catalog.get(filename)
+    if entry is None:
+        return send_from_directory(EXPORTS_FOLDER, filename)
+    return _send_export(entry.path, entry.hash)
+
+# Hash-addressed URLs never change content, so browsers may cache them forever
+@app.route('/exports/<content_hash>/<filename>')
+def serve_glb_by_hash(content_hash, filename):
+    entry = catalog.get(filename)
+    if entry is None or entry.hash != content_hash:
+        abort(404)
+    return _send_export(entry.path, entry.hash, immutable=True)
+
+# Optimized copies are keyed by the hash of the export they were built from
+@app.route('/optimized/<content_hash>/<filename>')
+def serve_optimized(content_hash, filename):
+    path = optimized_path(content_hash)
+    if not os.path.exists(path):
+        abort(404)
+    return _send_export(path, f'{content_hash}.opt', immutable=True)
+
+def optimize_export(entry):
+    # Pipeline stage: writes the optimized copy and queues its compressed variants
+    dest = optimized_path(entry.hash)
+    if os.path.exists(dest):
+        return
+    os.makedirs(CACHE_FOLDER, exist_ok=True)
+    try:
+        report = optimize_glb(entry.path, dest, tolerance=OPTIMIZE_TOLERANCE)
+    except Exception as e:
+        print(f'[optimize] Failed for {entry.filename}: {e}')
+        return
+    if report['optimized_bytes'] >= report['source_bytes']:
+        os.remove(dest)
+        print(f'[optimize] {entry.filename}: no size reduction, serving the original')
+        return
+    print(f"[optimize] {entry.filename}: {report['source_bytes']} -> {report['optimized_bytes']} bytes "
+          f"({report['reduction']:.1%} smaller, {report['vertices_before']} -> {report['vertices_after']} "
+          f"vertices, {report['seconds']:.2f}s)")
+    precompressor.submit(dest, f'{entry.hash}.opt')
+
+def build_lods(entry):
+    # Pipeline stage: queues the LOD chain in the process pool unless it is already built
+    if entry.hash in _lod_jobs or os.path.exists(manifest_path(CACHE_FOLDER, entry.hash)):
+        return
+    ratios = [r for r in LOD_RATIOS if r < 1.0]
+    job = _time_job(process_submit(build_lod_chain, entry.path, CACHE_FOLDER, entry.hash, ratios), 'lod')
+    _lod_jobs[entry.hash] = job
+    
+    def done(job):
+        _lod_jobs.pop(entry.hash, None)
+        try:
+            levels = job.result()
+        except Exception as e:
+            print(f'[lod] Failed for {entry.filename}: {e}')
+            return
+        summary = ', '.join(f"{l['ratio']:.0%}: {l['triangles']} tris in {l['seconds']:.2f}s" for l in levels)
+        summary = summary or 'no level small enough to be worth serving'
+        print(f'[lod] {entry.filename}: {summary}')
+    job.add_done_callback(done)
+
+def web_light_path(content_hash):
+    return os.path.join(CACHE_FOLDER, f'{content_hash}.light.glb')
+
+def process_textures(entry):
+    # Pipeline stage: encodes texture variants (reusing any cached by image hash) and
+    # repacks a web-light copy that references them
+    try:
+        keys = texture_cache.process(entry.path, process_submit)
+        if not keys:
+            return
+        print(f'[textures] {entry.filename}: {len(keys)} images, cache hit rate {texture_cache.hit_rate():.0%}')
+        if BUILD_WEB_LIGHT and not os.path.exists(web_light_path(entry.hash)):
+            size = build_web_light(entry.path, web_light_path(entry.hash), texture_cache, keys, WEB_LIGHT_TEXTURE_SIZE)
+            print(f'[textures] {entry.filename}: web-light copy {entry.size} -> {size} bytes')
+    except Exception as e:
+        print(f'[textures] Failed for {entry.filename}: {e}')
+
+def version_path(content_hash):
+    return os.path.join(CACHE_FOLDER, 'versions', f'{content_hash}.glb')
+
+def store_export(entry, trim=True):
+    # Pipeline stage: records the export in the version store and, when configured (and trim
+    # is set), trims the exports folder and applies the retention policy, collecting whatever
+    # it dropped
+    try:
+        version = store.ingest(entry.path, entry.hash, entry.filename, entry.mtime)
+        if version is None:
+            return
+        if trim:
+            prune_export_files()
+        dropped = store.apply_retention(STORE_RETENTION) if trim and STORE_RETENTION is not None else []
+        if dropped:
+            removed, freed = store.collect()
+            kept = {v['hash'] for v in store.versions()}
+            for content_hash in {v['hash'] for v in dropped} - kept:
+                if os.path.exists(version_path(content_hash)):
+                    os.remove(version_path(content_hash))
+            print(f'[store] Retention dropped {len(dropped)} versions, freed {freed} bytes in {removed} objects')
+        print(f"[store] {entry.filename} stored as version {version['version']} "
+              f'(store is {store.disk_usage()} bytes)')
+    except Exception as e:
+        print(f'[store] Failed for {entry.filename}: {e}')
+
+def prune_export_files():
+    # Keeps the newest EXPORT_FILES_KEPT files in the folder; older ones live on in the store
+    if EXPORT_FILES_KEPT is None:
+        return
+    entries, _ = catalog.page(EXPORT_FILES_KEPT, max(len(catalog) - EXPORT_FILES_KEPT, 0))
+    for entry in entries:
+        if store.recipe(entry.hash) is None:
+            continue
+        try:
+            os.remove(entry.path)
+            print(f'[store] Removed {entry.filename} from the exports folder (kept in the store)')
+        except FileNotFoundError:
+            pass
+
+def ingest_existing():
+    # Startup: stores exports written while the server was down, oldest first. Nothing is
+    # pruned or dropped here; the first start after an upgrade backfills the whole folder.
+    latest = store.latest()
+    entries, _ = catalog.page(0, len(catalog))
+    for entry in reversed(entries):
+        if latest is None or entry.mtime > latest['mtime']:
+            store_export(entry, trim=False)
+
+def process_export(entry):
+    # Queues every post-export stage for an announced file
+    _time_job(precompressor.submit(entry.path, entry.hash), 'precompress')
+    if OPTIMIZE_EXPORTS:
+        _time_job(pipeline.submit(optimize_export, entry), 'optimize')
+    if len(LOD_RATIOS) > 1:
+        build_lods(entry)
+    if TEXTURE_SIZES:
+        _time_job(pipeline.submit(process_textures, entry), 'textures')
+    _time_job(pipeline.submit(store_export, entry), 'store')
+
+def discard_derived(content_hash):
+    precompressor.discard(content_hash)
+    precompressor.discard(f'{content_hash}.opt')
+    derived = [optimized_path(content_hash), web_light_path(content_hash), manifest_path(CACHE_FOLDER, content_hash)]
+    derived += [lod_path(CACHE_FOLDER, content_hash, r) for r in LOD_RATIOS if r < 1.0]
+    meshes = os.path.join(CACHE_FOLDER, 'meshes')
+    if os.path.isdir(meshes):
+        derived += [os.path.join(meshes, name) for name in os.listdir(meshes) if name.startswith(f'{content_hash}-')]
+    for path in derived:
+        if os.path.exists(path):
+            os.remove(path)
+
+# LOD manifest, coarsest level first, so clients can show something immediately and refine
+@app.route('/lod-manifest/<filename>')
+def lod_manifest(filename):
+    entry = catalog.get(filename)
+    if entry is None:
+        abort(404)
+    levels = []
+    path = manifest_path(CACHE_FOLDER, entry.hash)
+    ready = os.path.exists(path)
+    if ready:
+        with open(path) as f:
+            for level in json.load(f)['levels']:
+                percent = round(level['ratio'] * 100)
+                levels.append({'ratio': level['ratio'], 'triangles': level['triangles'], 'bytes': level['bytes'],
+                               'url': f'/lod/{entry.hash}/{percent}/{entry.filename}'})
+    levels.append({'ratio': 1.0, 'bytes': entry.size, 'url': model_url(entry)})
+    return jsonify(filename=entry.filename, hash=entry.hash, ready=ready, levels=levels)
+
+# Texture variants are addressed by the hash of the source image and never change
+@app.route('/textures/<key>/<name>')
+def serve_texture(key, name):
+    response = send_from_directory(texture_cache.variant_dir(key), name)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+@app.route('/web-light/<content_hash>/<filename>')
+def serve_web_light(content_hash, filename):
+    path = web_light_path(content_hash)
+    if not os.path.exists(path):
+        abort(404)
+    return _send_export(path, f'{content_hash}.light', immutable=True)
+
+@app.route('/lod/<content_hash>/<int:percent>/<filename>')
+def serve_lod(content_hash, percent, filename):
+    path = lod_path(CACHE_FOLDER, content_hash, percent / 100)
+    if not os.path.exists(path):
+        abort(404)
+    return _send_export(path, f'{content_hash}.lod{percent}', immutable=True)
+
+# Stats and world bounds of an export, so viewers can frame the camera before the download
+# finishes. Computed on first request from accessor metadata and kept per content hash.
+@lru_cache(maxsize=256)
+def _model_info(path, content_hash):
+    # Serialized once, so warm requests only pay for the lookup
+    info = model_info(path)
+    info['hash'] = content_hash
+    return json.dumps(info, separators=(',', ':'))
+
+@app.route('/model-info/<filename>')
+def serve_model_info(filename):
+    entry = catalog.get(filename)
+    if entry is not None:
+        path, content_hash = entry.path, entry.hash
+    else:
+        # Files the catalog does not track (.gltf scenes) are hashed on request
+        path = safe_join(EXPORTS_FOLDER, filename)
+        if path is None or not filename.lower().endswith(('.glb', '.gltf')) or not os.path.isfile(path):
+            abort(404)
+        content_hash = hash_file(path)
+    if content_hash in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(content_hash)
+        return response
+    try:
+        body = _model_info(path, content_hash)
+    except (OSError, ValueError) as e:
+        print(f'[model-info] Failed for {filename}: {e}')
+        abort(422)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(content_hash)
+    return response
+
+# Version history, newest first, optionally for one filename
+@app.route('/versions')
+def list_versions():
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    versions = store.versions(request.args.get('filename'))
+    page = versions[::-1][offset:offset + limit]
+    return jsonify(versions=[_version_json(v) for v in page], total=len(versions), offset=offset, limit=limit)
+
+# One version with its neighbours, for stepping through the history
+@app.route('/versions/<int:number>')
+def version_info(number):
+    version = store.get(number)
+    if version is None:
+        abort(404)
+    previous, following = store.neighbors(number)
+    return jsonify(version=_version_json(version), previous=previous and _version_json(previous),
+                   next=following and _version_json(following))
+
+@app.route('/versions/<int:number>/<filename>')
+def serve_version(number, filename):
+    # Served from the exports folder while the file is there, rebuilt from the store otherwise
+    version = store.get(number)
+    if version is None:
+        abort(404)
+    # The URL is cached forever, so the live file is only used if it is untouched since ingest
+    live = safe_join(EXPORTS_FOLDER, version['filename'])
+    try:
+        st = os.stat(live)
+        if (st.st_size, st.st_mtime) == (version['size'], version['mtime']):
+            return _send_export(live, version['hash'], immutable=True)
+    except OSError:
+        pass
+    path = version_path(version['hash'])
+    if not os.path.exists(path):
+        store.rebuild(version['hash'], path)
+    return _send_export(path, version['hash'], immutable=True)
+
+def _version_json(version):
+    return dict(version, url=f"/versions/{version['version']}/{version['filename']}")
+
+def _token_accepted():
+    # The X-Ingest-Token check, passed by every request when INGEST_TOKEN is unset
+    token = request.headers.get('X-Ingest-Token', '').encode()
+    return INGEST_TOKEN is None or hmac.compare_digest(token, INGEST_TOKEN.encode())
+
+# Direct upload from an exporter. The body (plain or chunked) is validated and hashed as it
+# streams in, committed atomically into the exports folder and announced as soon as the
+# last byte lands, without waiting for the watcher to decide the write has finished.
+@app.route('/ingest', methods=['POST'])
+def ingest_upload():
+    if not _token_accepted():
+        ingest_uploads.inc(1, 'rejected')
+        return jsonify(error='Missing or wrong X-Ingest-Token'), 403
+    if request.mimetype != 'model/gltf-binary':
+        ingest_uploads.inc(1, 'rejected')
+        return jsonify(error='Uploads must be sent as Content-Type: model/gltf-binary'), 415
+    filename = secure_filename(request.args.get('filename') or time.strftime('model_%Y-%m-%d-%H-%M-%S.glb'))
+    if not filename.lower().endswith('.glb'):
+        ingest_uploads.inc(1, 'rejected')
+        return jsonify(error='Only .glb exports can be ingested'), 400
+    start = time.perf_counter()
+    try:
+        path, content_hash, size = receive_glb(request.stream, EXPORTS_FOLDER, filename, INGEST_MAX_BYTES)
+    except GLTFError as e:
+        ingest_uploads.inc(1, 'rejected')
+        print(f'[ingest] Rejected {filename}: {e}')
+        return jsonify(error=str(e)), 422
+    committed = time.perf_counter()
+    ingest_receive.observe(committed - start)
+    entry = catalog.update(path, content_hash)
+    if entry is None:
+        abort(409)  # Replaced or removed by someone else in the meantime
+    announced = watch_handler is not None and watch_handler.publish(entry)
+    if announced:
+        ingest_to_emit.observe(time.perf_counter() - committed)
+    ingest_uploads.inc(1, 'accepted')
+    print(f'[ingest] {filename}: {size} bytes in {committed - start:.2f}s')
+    return jsonify(filename=entry.filename, hash=content_hash, size=size, url=model_url(entry),
+                   announced=announced), 201
+
+# Prometheus scrape target
+@app.route('/metrics')
+def serve_metrics():
+    return Response(metrics.render(), content_type=MetricsRegistry.CONTENT_TYPE)
+
+# Runtime-toggled sampling profiler: POST /profiler with {"enabled": true, "interval": 0.002}
+# starts a fresh capture, {"enabled": false} stops it, GET returns folded stacks for flame
+# graphs. Only JSON bodies are accepted, so a page open in a viewer's browser cannot switch
+# it on with a form post; browsers preflight cross-origin JSON and this server never agrees.
+@app.route('/profiler', methods=['GET', 'POST'])
+def profiler_control():
+    if request.method == 'POST':
+        if not _token_accepted():
+            return jsonify(error='Missing or wrong X-Ingest-Token'), 403
+        options = request.get_json(silent=True) if request.is_json else None
+        if not isinstance(options, dict):
+            return jsonify(error='Send a JSON object, e.g. {"enabled": true, "interval": 0.002}'), 415
+        if not options.get('enabled', True):
+            profiler.stop()
+        else:
+            interval = options.get('interval')
+            try:
+                interval = None if interval is None else check_interval(interval)
+            except (TypeError, ValueError) as e:
+                return jsonify(error=str(e)), 400
+            profiler.reset()
+            profiler.start(interval)
+        return jsonify(running=profiler.running, interval=profiler.interval, samples=profiler.samples)
+    return Response(profiler.folded(request.args.get('limit', type=int)), mimetype='text/plain')
+
+# Single mesh of an export as a standalone GLB, so viewers can fetch only what a delta changed.
+# Extracted once per content hash into the cache folder and streamed from disk from then on.
+def mesh_path(content_hash, mesh_index):
+    return os.path.join(CACHE_FOLDER, 'meshes', f'{content_hash}-{mesh_index}.glb')
+
+@app.route('/model-mesh/<filename>/<int:mesh_index>')
+def serve_mesh(filename, mesh_index):
+    entry = catalog.get(filename)
+    if entry is None:
+        abort(404)
+    path = mesh_path(entry.hash, mesh_index)
+    if not os.path.exists(path):
+        try:
+            data = extract_mesh_glb(entry.path, mesh_index)
+        except IndexError:
+            abort(404)
+        except GLTFError as e:
+            print(f'[mesh] Refused {filename} mesh {mesh_index}: {e}')
+            abort(422)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return send_file(path, mimetype='model/gltf-binary', conditional=True, etag=f'{entry.hash}-{mesh_index}')
 
 # File watcher for hot reloading
 class GLBHandler(FileSystemEventHandler):
-    _last_emit = 0  # Simple debounce mechanism
+    # Watchdog events only mark paths as changed; the scheduler announces each file
+    # once its write has finished, so nothing blocks the observer thread.
+    # emit(event, payload) sends announcements; the threaded Socket.IO server by default.
+    def __init__(self, emit=None):
+        super().__init__()
+        self.emit = emit or broadcast
+        self.scheduler = ChangeScheduler(self._announce, extensions=('.glb',), on_settle=self._settled)
+        self._announced = {}  # filename -> hash last sent to viewers
+        self._last_digest = None  # (hash, digest) of the export viewers were last told about
+        self._lock = threading.Lock()  # Uploads announce from request threads
+        # Digests read every mesh, so they run after the announcement, in announcement order
+        self._deltas = ThreadPoolExecutor(max_workers=1, thread_name_prefix='delta')
+        self._has_base = False  # a digest is queued or done that the next delta can diff against
     
-    def _maybe_emit(self, path):
-        if not path.endswith('.glb'):
-            return
-        
-        now = time.time()
-        if now - GLBHandler._last_emit < 0.5:  # Half-second debounce
+    def _settled(self, path, change):
+        # Splits the time before an announcement into OS event delay, writing and settling
+        now = time.monotonic()
+        last_event_wall = time.time() - (now - change.last_event)
+        watch_event_delay.observe(max(last_event_wall - change.signature[1] / 1e9, 0.0))
+        watch_write.observe(change.last_event - change.first_event)
+        watch_settle.observe(now - change.last_event)
+    
+    def _announce(self, path):
+        # Keep the catalog current; a file that is already gone has nothing to announce
+        start = time.perf_counter()
+        entry = catalog.update(path)
+        if entry is None:
             return
+        entry.hash  # Hashed here so the catalog stage accounts for it
+        announce_stage.observe(time.perf_counter() - start, 'catalog')
+        if self.publish(entry):
+            export_to_emit.observe(max(time.time() - entry.mtime, 0.0))
+    
+    def publish(self, entry):
+        # Queues the post-export stages and tells viewers; False if they already have these bytes.
+        # Uploads committed through /ingest arrive here directly, and the watcher's later
+        # event for the same file is then skipped as a repeat.
+        # model_updated goes out without waiting for the digest. delta_pending tells viewers
+        # that a model_delta for this hash follows; they may wait briefly for it instead of
+        # starting a full download.
+        with self._lock:
+            if self._announced.get(entry.filename) == entry.hash:
+                return False
+            self._announced[entry.filename] = entry.hash
+            
+            print(f'[watchdog] GLB updated: {entry.filename}')
+            with announce_stage.time('queue'):
+                process_export(entry)
+            self.emit('model_updated', {'filename': entry.filename, 'hash': entry.hash, 'size': entry.size,
+                                       'url': model_url(entry), 'delta': None, 'delta_pending': self._has_base})
+            self._queue_delta(entry, announce=self._has_base)
+            return True
+    
+    def remember(self, entry):
+        # Records the export viewers load at startup so the first update can be sent as a delta
+        if entry is not None:
+            with self._lock:
+                self._announced[entry.filename] = entry.hash
+                process_export(entry)
+                self._queue_delta(entry, announce=False)
+    
+    def _queue_delta(self, entry, announce):
+        self._has_base = True
+        start = time.perf_counter()
         
-        GLBHandler._last_emit = now
-        print(f'[watchdog] GLB updated: {os.path.basename(path)}')
-        socketio.emit('model_updated')
+        def run():
+            delta = self._delta(entry)
+            announce_stage.observe(time.perf_counter() - start, 'delta')
+            if announce:
+                self.emit('model_delta', {'filename': entry.filename, 'hash': entry.hash, 'delta': delta})
+        self._deltas.submit(run)
+    
+    def _delta(self, entry):
+        # Node/mesh/material diff against the previous announcement; None means "reload everything"
+        try:
+            digest = compute_digest(entry.path)
+        except Exception as e:
+            print(f'[delta] Could not digest {entry.filename}: {e}')
+            self._last_digest = None
+            return None
+        previous, self._last_digest = self._last_digest, (entry.hash, digest)
+        if previous is None:
+            return None
+        delta = diff_digests(previous[1], digest)
+        delta['previous_hash'] = previous[0]
+        print(f"[delta] {len(delta['changed'])} changed, {len(delta['transform_only'])} moved, "
+              f"{len(delta['added'])} added, {len(delta['removed'])} removed "
+              f"({delta['delta_bytes']} of {delta['full_bytes']} mesh bytes)")
+        return delta
     
     def on_created(self, event):
-        self._maybe_emit(event.src_path)
+        watch_events.inc(1, 'created')
+        if not event.is_directory:
+            self.scheduler.touch(event.src_path)
     
     def on_modified(self, event):
-        self._maybe_emit(event.src_path)
+        watch_events.inc(1, 'modified')
+        if not event.is_directory:
+            self.scheduler.touch(event.src_path)
     
     def on_moved(self, event):
-        self._maybe_emit(event.dest_path)
+        watch_events.inc(1, 'moved')
+        if not event.is_directory:
+            self.scheduler.discard(event.src_path)
+            self._announced.pop(os.path.basename(event.src_path), None)
+            catalog.move(event.src_path, event.dest_path)
+            self.scheduler.touch(event.dest_path)
+    
+    def on_deleted(self, event):
+        watch_events.inc(1, 'deleted')
+        if not event.is_directory:
+            self.scheduler.discard(event.src_path)
+            self._announced.pop(os.path.basename(event.src_path), None)
+            entry = catalog.remove(event.src_path)
+            # Drop derived files unless another export has the same bytes
+            if entry is not None and entry._hash and not catalog.has_hash(entry._hash):
+                discard_derived(entry._hash)
 
-def start_watcher():
+watch_handler = None  # The running GLBHandler, which /ingest announces uploads through
+
+def start_watcher(emit=None):
+    global watch_handler
     print(f'[watchdog] Monitoring: {EXPORTS_FOLDER}')
+    handler = watch_handler = GLBHandler(emit)
+    handler.scheduler.start()
     observer = Observer()
-    observer.schedule(GLBHandler(), path=EXPORTS_FOLDER, recursive=False)
+    observer.schedule(handler, path=EXPORTS_FOLDER, recursive=False)
     observer.start()
     
+    # Seed after the observer is live so nothing written during the scan is missed
+    print(f'[catalog] Indexed {catalog.seed()} exports')
+    pipeline.submit(ingest_existing)
+    handler.remember(catalog.latest())
+    
     try:
         while True:
             time.sleep(1)
     except KeyboardInterrupt:
         observer.stop()
     observer.join()
+    handler.scheduler.stop()
 
 # Start everything up
 if __name__ == '__main__':
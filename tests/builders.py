@@ -0,0 +1,177 @@
+# tests/builders.py
+# Synthetic exports and the checks run on them, shared by the tests and the benchmarks
+# (which put this folder on sys.path)
+import io
+import json
+import struct
+from collections import deque
+
+import numpy as np
+
+from glb_reader import GLTFDocument
+from glb_writer import ARRAY_BUFFER, ELEMENT_ARRAY_BUFFER, GLBBuilder
+from model_info import _scene_instances
+
+PARTS = 50
+
+
+def build_assembly(path, parts, vertices, edited=None, moved=None, removed=None):
+    builder = GLBBuilder()
+    gltf = builder.json
+    gltf['materials'] = [{'name': 'paint', 'pbrMetallicRoughness': {'baseColorFactor': [0.8, 0.1, 0.1, 1.0]}}]
+    gltf['meshes'], gltf['nodes'] = [], []
+    for part in range(parts):
+        if part == removed:
+            continue
+        rng = np.random.default_rng(part)
+        positions = rng.random((vertices, 3), dtype=np.float32)
+        if part == edited:
+            positions[:10] += 0.5
+        normals = np.tile(np.array([0, 0, 1], dtype=np.float32), (vertices, 1))
+        indices = rng.integers(0, vertices, size=vertices * 2 * 3, dtype=np.uint32)
+        gltf['meshes'].append({'name': f'part_{part}', 'primitives': [{
+            'attributes': {
+                'POSITION': builder.add_accessor(positions, target=ARRAY_BUFFER, bounds=True),
+                'NORMAL': builder.add_accessor(normals, target=ARRAY_BUFFER),
+            },
+            'indices': builder.add_accessor(indices, target=ELEMENT_ARRAY_BUFFER),
+            'material': 0,
+        }]})
+        node = {'name': f'part_{part}', 'mesh': len(gltf['meshes']) - 1, 'translation': [float(part), 0.0, 0.0]}
+        if part == moved:
+            node['translation'] = [float(part), 1.0, 0.0]
+        gltf['nodes'].append(node)
+    gltf['nodes'].append({'name': 'car', 'children': list(range(len(gltf['nodes'])))})
+    gltf['scenes'] = [{'nodes': [len(gltf['nodes']) - 1]}]
+    gltf['scene'] = 0
+    builder.write(path)
+
+
+def write_glb(path, size, parts=PARTS):
+    # Valid GLB of about size bytes holding parts meshes (float positions, uint32 triangles),
+    # written a part at a time the way an exporter streams to disk
+    vertices = max((size - 300 * parts) // (parts * 36), 3)
+    position_bytes, index_bytes = vertices * 12, vertices * 24
+    part_bytes = position_bytes + index_bytes
+    gltf = {'asset': {'version': '2.0'}, 'buffers': [{'byteLength': part_bytes * parts}],
+            'bufferViews': [], 'accessors': [], 'meshes': [], 'nodes': []}
+    for part in range(parts):
+        offset = part * part_bytes
+        gltf['bufferViews'] += [
+            {'buffer': 0, 'byteOffset': offset, 'byteLength': position_bytes, 'target': 34962},
+            {'buffer': 0, 'byteOffset': offset + position_bytes, 'byteLength': index_bytes, 'target': 34963}]
+        gltf['accessors'] += [
+            {'bufferView': 2 * part, 'componentType': 5126, 'count': vertices, 'type': 'VEC3',
+             'min': [0.0, 0.0, 0.0], 'max': [1.0, 1.0, 1.0]},
+            {'bufferView': 2 * part + 1, 'componentType': 5125, 'count': vertices * 6, 'type': 'SCALAR'}]
+        gltf['meshes'].append({'name': f'part_{part}',
+                               'primitives': [{'attributes': {'POSITION': 2 * part}, 'indices': 2 * part + 1}]})
+        gltf['nodes'].append({'name': f'part_{part}', 'mesh': part, 'translation': [float(part), 0.0, 0.0]})
+    gltf['nodes'].append({'name': 'assembly', 'children': list(range(parts))})
+    gltf['scenes'] = [{'nodes': [parts]}]
+    gltf['scene'] = 0
+    json_bytes = json.dumps(gltf, separators=(',', ':')).encode()
+    json_bytes += b' ' * (-len(json_bytes) % 4)
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<4sII', b'glTF', 2, 12 + 8 + len(json_bytes) + 8 + part_bytes * parts))
+        f.write(struct.pack('<II', len(json_bytes), 0x4E4F534A) + json_bytes)
+        f.write(struct.pack('<II', part_bytes * parts, 0x004E4942))
+        for part in range(parts):
+            rng = np.random.default_rng(part)
+            f.write(rng.random((vertices, 3), dtype=np.float32).tobytes())
+            f.write(rng.integers(0, vertices, size=vertices * 6, dtype=np.uint32).tobytes())
+
+
+def make_png(resolution, seed):
+    # Smooth gradients plus noise, closer to a baked texture than flat colour or pure noise
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:resolution, 0:resolution] / resolution
+    base = np.stack([x, y, (x + y) / 2], -1) * 200 + rng.integers(0, 40, (resolution, resolution, 3))
+    from PIL import Image  # Only the texture tests and benchmark need Pillow
+    buffer = io.BytesIO()
+    Image.fromarray(base.astype(np.uint8)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def build_textured(path, images):
+    builder = GLBBuilder()
+    positions = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], dtype=np.float32)
+    uvs = np.array([[0, 0], [1, 0], [0, 1]], dtype=np.float32)
+    position = builder.add_accessor(positions, bounds=True)
+    uv = builder.add_accessor(uvs)
+    gltf = builder.json
+    gltf['images'] = [{'bufferView': builder.add_buffer_view(data), 'mimeType': 'image/png'} for data in images]
+    gltf['textures'] = [{'source': i} for i in range(len(images))]
+    gltf['materials'] = [{'pbrMetallicRoughness': {'baseColorTexture': {'index': i}}} for i in range(len(images))]
+    gltf['meshes'] = [{'primitives': [{'attributes': {'POSITION': position, 'TEXCOORD_0': uv}, 'material': i}
+                                      for i in range(len(images))]}]
+    gltf['nodes'] = [{'mesh': 0}]
+    gltf['scenes'] = [{'nodes': [0]}]
+    builder.write(path)
+
+
+def build_soup(path, n):
+    # n x n height field written as unindexed triangles, shuffled like a poorly ordered export
+    rng = np.random.default_rng(1)
+    u, v = np.meshgrid(np.linspace(0, 1, n + 1), np.linspace(0, 1, n + 1))
+    height = 0.1 * np.sin(u * 12) * np.cos(v * 9)
+    grid = np.stack([u, height, v], axis=-1).reshape(-1, 3).astype(np.float32)
+    uv = np.stack([u, v], axis=-1).reshape(-1, 2).astype(np.float32)
+    normals = np.stack([-np.gradient(height, axis=1), np.ones_like(height), -np.gradient(height, axis=0)], -1)
+    normals = (normals / np.linalg.norm(normals, axis=-1, keepdims=True)).reshape(-1, 3).astype(np.float32)
+    colors = np.concatenate([np.clip(grid[:, [0, 2, 0]], 0, 1), np.ones((len(grid), 1))], 1).astype(np.float32)
+    i = np.arange(n)[:, None] * (n + 1) + np.arange(n)[None, :]
+    quads = np.stack([i, i + 1, i + n + 1, i + 1, i + n + 2, i + n + 1], -1).reshape(-1, 3)
+    corners = quads[rng.permutation(len(quads))].ravel()
+    builder = GLBBuilder()
+    builder.json['meshes'] = [{'primitives': [{'attributes': {
+        'POSITION': builder.add_accessor(grid[corners], target=ARRAY_BUFFER, bounds=True),
+        'NORMAL': builder.add_accessor(normals[corners], target=ARRAY_BUFFER),
+        'COLOR_0': builder.add_accessor(colors[corners], target=ARRAY_BUFFER),
+        'TEXCOORD_0': builder.add_accessor(uv[corners], target=ARRAY_BUFFER),
+    }}]}]
+    builder.json['nodes'] = [{'mesh': 0}]
+    builder.json['scenes'] = [{'nodes': [0]}]
+    builder.write(path)
+
+
+def corners(path):
+    # De-indexed, dequantized triangle corners sorted canonically by position
+    with GLTFDocument(path) as doc:
+        primitive = doc.meshes[0]['primitives'][0]
+        count = doc.accessors[primitive['attributes']['POSITION']]['count']
+        indices = doc.accessor(primitive['indices']) if 'indices' in primitive else np.arange(count)
+        out = {}
+        for name, acc in primitive['attributes'].items():
+            data = doc.accessor(acc).astype(np.float64)
+            info = doc.accessors[acc]
+            if info.get('normalized'):
+                data = np.maximum(data / float(np.iinfo(doc.accessor(acc).dtype).max), -1.0)
+            out[name] = data[indices].reshape(-1, 3, data.shape[1])
+        order = np.lexsort(out['POSITION'].reshape(len(out['POSITION']), -1).T[::-1])
+        return {name: data[order] for name, data in out.items()}, np.asarray(indices)
+
+
+def acmr(indices, cache_size=32):
+    # Average cache misses per triangle for a FIFO post-transform cache
+    cache, members, misses = deque(), set(), 0
+    for index in indices.tolist():
+        if index not in members:
+            misses += 1
+            cache.append(index)
+            members.add(index)
+            if len(cache) > cache_size:
+                members.discard(cache.popleft())
+    return misses / (len(indices) / 3)
+
+
+def decoded_bounds(path):
+    # What Box3.setFromObject does after the download: transform every vertex to world space
+    with GLTFDocument(path) as doc:
+        low, high = np.full(3, np.inf), np.full(3, -np.inf)
+        for mesh_index, world in _scene_instances(doc):
+            for primitive in doc.meshes[mesh_index]['primitives']:
+                positions = doc.accessor(primitive['attributes']['POSITION'])
+                points = positions @ world[:3, :3].T + world[:3, 3]
+                low, high = np.minimum(low, points.min(axis=0)), np.maximum(high, points.max(axis=0))
+    return low, high
@@ -0,0 +1,31 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The modules live at the repository root, next to server.py; the synthetic export
+# builders in this folder (builders.py, vred_stubs.py) are shared with the benchmarks
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def exports_folder(tmp_path):
+    # The folder server_module watches; override it to keep files outside the exports
+    return tmp_path
+
+
+@pytest.fixture
+def server_module(exports_folder, monkeypatch):
+    # server pointed at a temporary exports folder (cache inside it) with an empty catalog
+    # and the post-export stages switched off
+    server = pytest.importorskip('server')
+    from export_catalog import ExportCatalog
+    monkeypatch.setattr(server, 'EXPORTS_FOLDER', str(exports_folder))
+    monkeypatch.setattr(server, 'CACHE_FOLDER', str(exports_folder / '.cache'))
+    monkeypatch.setattr(server, 'catalog', ExportCatalog(str(exports_folder)))
+    monkeypatch.setattr(server, 'process_export', lambda entry: None)
+    return server
@@ -0,0 +1,96 @@
+# tests/test_async_server.py
+import http.client
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from builders import write_glb
+
+uvicorn = pytest.importorskip('uvicorn')
+socketio = pytest.importorskip('socketio')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def app_server(server_module):
+    async_server = pytest.importorskip('async_server')
+    port = free_port()
+    uvicorn_server = uvicorn.Server(uvicorn.Config(async_server.create_app(watch=False), port=port,
+                                                   log_level='error'))
+    thread = threading.Thread(target=uvicorn_server.run, daemon=True)
+    thread.start()
+    while not uvicorn_server.started:
+        time.sleep(0.01)
+    yield port, server_module, async_server
+    uvicorn_server.should_exit = True
+    thread.join(10)
+
+
+def get(port, path, timeout=10):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    conn.request('GET', path)
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response.status, body
+
+
+def test_a_stalled_download_does_not_hold_up_other_requests(app_server, tmp_path):
+    port, server, _ = app_server
+    path = str(tmp_path / 'big.glb')
+    write_glb(path, 64 << 20)
+    server.catalog.update(path)
+    stalled = socket.create_connection(('127.0.0.1', port))
+    try:
+        stalled.sendall(b'GET /blender_exports/big.glb HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        assert stalled.recv(1024).startswith(b'HTTP/1.1 200')  # Then never read again
+        time.sleep(0.5)
+        start = time.perf_counter()
+        status, body = get(port, '/models')
+        assert status == 200 and json.loads(body)['total'] == 1
+        assert time.perf_counter() - start < 2
+    finally:
+        stalled.close()
+
+
+def test_chunked_upload_streams_through_to_ingest(app_server, tmp_path):
+    port, server, _ = app_server
+    source = str(tmp_path / 'source.bin')
+    write_glb(source, 3 << 20)
+
+    def body():
+        with open(source, 'rb') as f:
+            yield from iter(lambda: f.read(1 << 16), b'')
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request('POST', '/ingest?filename=uploaded.glb', body=body(), encode_chunked=True,
+                 headers={'Content-Type': 'model/gltf-binary'})
+    response = conn.getresponse()
+    result = json.loads(response.read())
+    conn.close()
+    assert response.status == 201, result
+    assert (tmp_path / 'uploaded.glb').read_bytes() == open(source, 'rb').read()
+    assert server.catalog.get('uploaded.glb').hash == result['hash']
+
+
+def test_rooms_nothing_is_published_to_are_refused(app_server):
+    port, _, async_server = app_server
+    client = socketio.Client(reconnection=False)
+    with pytest.raises(socketio.exceptions.ConnectionError):
+        client.connect(f'http://127.0.0.1:{port}?room=projectA', transports=['websocket'])
+    client.connect(f'http://127.0.0.1:{port}?room=file:car.glb', transports=['websocket'])
+    try:
+        assert 'error' in client.call('subscribe', {'rooms': ['file:car.glb', 'projectA']})
+        assert client.call('subscribe', 'file:a.glb,file:b.glb') == {'rooms': ['file:a.glb', 'file:b.glb']}
+        assert client.call('subscribe', ['file:a.glb']) == {'rooms': ['file:a.glb']}
+        # Anything that is not rooms falls back to the folder room instead of failing
+        assert client.call('subscribe', 42) == {'rooms': [async_server.DEFAULT_ROOM]}
+    finally:
+        client.disconnect()
@@ -0,0 +1,117 @@
+# tests/test_change_scheduler.py
+import os
+import struct
+import threading
+import time
+
+from change_scheduler import ChangeScheduler
+
+
+def write_glb_in_chunks(path, size, chunks, pause, touch, stall=0.0):
+    # Synthetic exporter: header first, then the body in flushed chunks, reporting every
+    # flush the way watchdog reports modified events. stall pauses once halfway through.
+    body = os.urandom(size - 12)
+    step = max(len(body) // chunks, 1)
+    with open(path, 'wb') as f:
+        f.write(b'glTF' + struct.pack('<II', 2, size))
+        f.flush()
+        touch(path)
+        for i in range(0, len(body), step):
+            if stall and i >= len(body) // 2 > i - step:
+                time.sleep(stall)
+            f.write(body[i:i + step])
+            f.flush()
+            touch(path)
+            time.sleep(pause)
+    finished = time.monotonic()
+    touch(path)
+    return finished
+
+
+class Recorder:
+    def __init__(self, expected):
+        self.fired = {}
+        self.expected = expected
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, path):
+        with self._lock:
+            self.fired.setdefault(path, []).append(time.monotonic())
+            if sum(len(v) for v in self.fired.values()) >= self.expected:
+                self.done.set()
+
+
+def test_concurrent_chunked_writes_each_fire_once_after_the_last_byte(tmp_path):
+    recorder = Recorder(expected=8)
+    scheduler = ChangeScheduler(recorder).start()
+    finished = {}
+
+    def writer(i):
+        path = str(tmp_path / f'model_{i}.glb')
+        finished[path] = write_glb_in_chunks(path, 1 << 20, chunks=8, pause=0.01, touch=scheduler.touch)
+
+    try:
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert recorder.done.wait(10)
+        time.sleep(0.2)  # Room for any duplicate callback to show up
+    finally:
+        scheduler.stop()
+    assert sorted(recorder.fired) == sorted(finished)
+    for path, times in recorder.fired.items():
+        assert len(times) == 1, path
+        assert times[0] >= finished[path], f'{path} fired before its last byte'
+
+
+def test_stall_longer_than_quiet_period_does_not_fire_early(tmp_path):
+    # The declared GLB length, not the quiet period alone, decides when the write is done
+    recorder = Recorder(expected=1)
+    scheduler = ChangeScheduler(recorder, quiet_period=0.05).start()
+    path = str(tmp_path / 'slow.glb')
+    try:
+        finished = write_glb_in_chunks(path, 1 << 18, chunks=4, pause=0.0, touch=scheduler.touch, stall=0.3)
+        assert recorder.done.wait(5)
+    finally:
+        scheduler.stop()
+    assert recorder.fired[path][0] >= finished
+
+
+def test_rewrites_after_settling_fire_again(tmp_path):
+    recorder = Recorder(expected=2)
+    scheduler = ChangeScheduler(recorder).start()
+    path = str(tmp_path / 'model.glb')
+    try:
+        write_glb_in_chunks(path, 1 << 16, chunks=2, pause=0.0, touch=scheduler.touch)
+        deadline = time.monotonic() + 5
+        while path not in recorder.fired and time.monotonic() < deadline:
+            time.sleep(0.01)
+        write_glb_in_chunks(path, 1 << 17, chunks=2, pause=0.0, touch=scheduler.touch)
+        assert recorder.done.wait(5)
+    finally:
+        scheduler.stop()
+    assert len(recorder.fired[path]) == 2
+
+
+def test_deleted_and_unwatched_files_never_fire(tmp_path):
+    recorder = Recorder(expected=1)
+    scheduler = ChangeScheduler(recorder).start()
+    gone = str(tmp_path / 'gone.glb')
+    other = str(tmp_path / 'notes.txt')
+    try:
+        with open(gone, 'wb') as f:
+            f.write(b'glTF' + struct.pack('<II', 2, 1 << 10))  # Header only: still being written
+        scheduler.touch(gone)
+        os.remove(gone)
+        with open(other, 'w') as f:
+            f.write('not an export')
+        scheduler.touch(other)
+        assert other not in scheduler.pending()
+        time.sleep(0.3)
+    finally:
+        scheduler.stop()
+    assert recorder.fired == {}
+    assert scheduler.pending() == []
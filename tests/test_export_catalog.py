@@ -0,0 +1,43 @@
+# tests/test_export_catalog.py
+import os
+
+import export_catalog
+from export_catalog import ExportCatalog
+
+
+def drain(catalog):
+    # The hasher is one thread working in order; an empty job returns once the queue is done
+    catalog._hasher.submit(lambda: None).result()
+
+
+def test_restart_rehashes_only_files_that_changed(tmp_path, monkeypatch):
+    folder = tmp_path / 'exports'
+    folder.mkdir()
+    for i in range(5):
+        (folder / f'model_{i}.glb').write_bytes(os.urandom(1000))
+    index = str(tmp_path / 'cache' / 'hashes.json')
+    first = ExportCatalog(str(folder), hash_index=index)
+    first.seed()
+    drain(first)
+    hashes = {e.filename: e.hash for e in first.page(0, 5)[0]}
+
+    hashed = []
+    real_hash_file = export_catalog.hash_file
+    monkeypatch.setattr(export_catalog, 'hash_file', lambda path: hashed.append(path) or real_hash_file(path))
+    (folder / 'model_3.glb').write_bytes(os.urandom(2000))
+    second = ExportCatalog(str(folder), hash_index=index)
+    second.seed()
+    drain(second)
+    assert [os.path.basename(path) for path in hashed] == ['model_3.glb']
+    for entry in second.page(0, 5)[0]:
+        assert entry.to_dict()['hash'] == (real_hash_file(entry.path) if entry.filename == 'model_3.glb'
+                                           else hashes[entry.filename])
+
+
+def test_listing_never_hashes(tmp_path, monkeypatch):
+    (tmp_path / 'model.glb').write_bytes(b'x' * 100)
+    monkeypatch.setattr(export_catalog, 'hash_file', lambda path: 'h')
+    catalog = ExportCatalog(str(tmp_path))
+    monkeypatch.setattr(catalog, '_queue_hash', lambda entry: None)  # Background hasher held off
+    catalog.seed()
+    assert catalog.latest().to_dict()['hash'] is None
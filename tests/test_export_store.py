@@ -0,0 +1,129 @@
+# tests/test_export_store.py
+import hashlib
+import os
+import time
+
+import pytest
+
+from builders import build_assembly
+from export_store import ExportStore, RetentionPolicy
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+@pytest.fixture
+def stored(tmp_path):
+    # Twelve exports of one assembly, each editing one part and moving another
+    store = ExportStore(str(tmp_path / 'store'))
+    path = str(tmp_path / 'assembly.glb')
+    originals = []
+    for i in range(12):
+        build_assembly(path, 10, 300, edited=i % 10, moved=(i * 7) % 10)
+        content_hash = file_hash(path)
+        store.ingest(path, content_hash, filename=f'model_{i:02d}.glb', mtime=float(i))
+        with open(path, 'rb') as f:
+            originals.append((content_hash, f.read()))
+    return store, originals
+
+
+def test_every_version_rebuilds_byte_for_byte(stored, tmp_path):
+    store, originals = stored
+    raw = sum(len(data) for _, data in originals)
+    assert store.disk_usage() < raw / 2  # Unchanged parts are shared between versions
+    for content_hash, data in originals:
+        rebuilt = store.rebuild(content_hash, str(tmp_path / 'rebuilt.glb'))
+        with open(rebuilt, 'rb') as f:
+            assert f.read() == data
+
+
+def test_reingesting_the_same_file_keeps_one_version(stored, tmp_path):
+    store, _ = stored
+    path = str(tmp_path / 'assembly.glb')
+    latest = store.latest()
+    again = store.ingest(path, latest['hash'], filename=latest['filename'], mtime=latest['mtime'])
+    assert again['version'] == latest['version'] and len(store.versions()) == 12
+
+
+
+def test_a_file_rewritten_after_hashing_is_not_stored_under_the_old_hash(tmp_path):
+    store = ExportStore(str(tmp_path / 'store'))
+    path = str(tmp_path / 'assembly.glb')
+    build_assembly(path, 10, 300, edited=0)
+    stale_hash = file_hash(path)
+    build_assembly(path, 10, 300, edited=1)  # Exporter rewrote it before the store got to it
+    assert store.ingest(path, stale_hash, mtime=1.0) is None
+    assert store.recipe(stale_hash) is None and not store.versions()
+    version = store.ingest(path, file_hash(path), mtime=2.0)
+    assert store.recipe(version['hash'])['size'] == os.path.getsize(path) == version['size']
+
+
+def test_same_name_and_mtime_with_new_content_is_a_new_version(stored, tmp_path):
+    store, _ = stored
+    path = str(tmp_path / 'assembly.glb')
+    latest = store.latest()
+    build_assembly(path, 10, 300, edited=5, moved=5)
+    version = store.ingest(path, file_hash(path), filename=latest['filename'], mtime=latest['mtime'])
+    assert version['version'] == latest['version'] + 1 and version['hash'] != latest['hash']
+
+def test_retention_and_collect_keep_the_newest_intact(stored, tmp_path):
+    store, originals = stored
+    dropped = store.apply_retention(RetentionPolicy(keep_last=3))
+    assert len(dropped) == 9
+    removed, freed = store.collect()
+    assert removed and freed
+    for version in store.versions():
+        rebuilt = store.rebuild(version['hash'], str(tmp_path / 'rebuilt.glb'))
+        assert file_hash(rebuilt) == version['hash']
+    assert [h for h, _ in originals[-3:]] == [v['hash'] for v in store.versions()]
+    reopened = ExportStore(store.folder)
+    assert [v['version'] for v in reopened.versions()] == [10, 11, 12]
+
+
+def test_max_age_counts_from_the_export_not_from_storing(stored):
+    store, _ = stored
+    # Versions were stored just now, but their files date from the first seconds of 1970
+    assert not store.apply_retention(RetentionPolicy(max_age=3600), now=10.5)
+    dropped = store.apply_retention(RetentionPolicy(max_age=3.0), now=10.5)
+    assert [v['version'] for v in dropped] == list(range(1, 9))
+    assert store.apply_retention(RetentionPolicy(max_age=3600), now=time.time())
+    assert len(store.versions()) == 1  # keep_min
+
+
+@pytest.fixture
+def server_module(server_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(server_module, 'store', ExportStore(str(tmp_path / '.store')))
+    return server_module
+
+
+def write_exports(server, folder, count):
+    for i in range(count):
+        path = os.path.join(folder, f'model_{i}.glb')
+        build_assembly(path, 4, 100, edited=i % 4)
+        os.utime(path, (1000.0 + i, 1000.0 + i))
+        server.catalog.update(path)
+
+
+def test_nothing_is_deleted_by_default(server_module, tmp_path):
+    write_exports(server_module, str(tmp_path), 4)
+    for entry in reversed(server_module.catalog.page(0, 4)[0]):
+        server_module.store_export(entry)
+    assert len(list(tmp_path.glob('*.glb'))) == 4
+    assert len(server_module.store.versions()) == 4
+
+
+def test_startup_backfill_never_prunes(server_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(server_module, 'EXPORT_FILES_KEPT', 1)
+    monkeypatch.setattr(server_module, 'STORE_RETENTION', RetentionPolicy(keep_last=1))
+    write_exports(server_module, str(tmp_path), 4)
+    server_module.ingest_existing()
+    assert len(list(tmp_path.glob('*.glb'))) == 4
+    assert len(server_module.store.versions()) == 4
+    # Once opted in, exports stored while running are trimmed
+    path = str(tmp_path / 'model_new.glb')
+    build_assembly(path, 4, 100, edited=3, moved=1)
+    server_module.store_export(server_module.catalog.update(path))
+    assert [p.name for p in tmp_path.glob('*.glb')] == ['model_new.glb']
+    assert len(server_module.store.versions()) == 1
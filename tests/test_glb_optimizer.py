@@ -0,0 +1,39 @@
+# tests/test_glb_optimizer.py
+import numpy as np
+import pytest
+
+from builders import acmr, build_soup, corners
+from glb_optimizer import optimize_glb
+
+TOLERANCE = 0.005
+
+
+@pytest.fixture
+def optimized(tmp_path):
+    source, dest = str(tmp_path / 'export.glb'), str(tmp_path / 'export.opt.glb')
+    build_soup(source, 40)
+    report = optimize_glb(source, dest, tolerance=TOLERANCE)
+    return source, dest, report
+
+
+def test_positions_survive_exactly(optimized):
+    before, _ = corners(optimized[0])
+    after, _ = corners(optimized[1])
+    assert np.array_equal(before['POSITION'], after['POSITION'])
+
+
+@pytest.mark.parametrize('name', ['NORMAL', 'COLOR_0', 'TEXCOORD_0'])
+def test_quantized_attributes_stay_within_tolerance(optimized, name):
+    before, _ = corners(optimized[0])
+    after, _ = corners(optimized[1])
+    assert np.abs(before[name] - after[name]).max() <= TOLERANCE
+
+
+def test_welding_shrinks_the_file_and_improves_cache_reuse(optimized):
+    _, before_indices = corners(optimized[0])
+    _, after_indices = corners(optimized[1])
+    report = optimized[2]
+    assert report['vertices_after'] < report['vertices_before']
+    assert report['optimized_bytes'] < report['source_bytes']
+    assert len(after_indices) == len(before_indices)
+    assert acmr(after_indices) < acmr(before_indices)
@@ -0,0 +1,73 @@
+# tests/test_glb_reader.py
+import json
+import struct
+
+import pytest
+
+from glb_reader import GLTFDocument, GLTFError
+
+
+def write_external_glb(path, uri):
+    # One triangle-less mesh whose buffer and image both live at uri
+    gltf = {'asset': {'version': '2.0'}, 'buffers': [{'uri': uri, 'byteLength': 12}],
+            'bufferViews': [{'buffer': 0, 'byteLength': 12}],
+            'accessors': [{'bufferView': 0, 'componentType': 5126, 'count': 1, 'type': 'VEC3'}],
+            'meshes': [{'primitives': [{'attributes': {'POSITION': 0}}]}], 'nodes': [{'mesh': 0}],
+            'images': [{'uri': uri, 'mimeType': 'image/png'}]}
+    data = json.dumps(gltf).encode()
+    data += b' ' * (-len(data) % 4)
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<4sII', b'glTF', 2, 20 + len(data)) + struct.pack('<II', len(data), 0x4E4F534A) + data)
+
+
+@pytest.fixture
+def exports_folder(tmp_path):
+    # A file worth stealing beside the exports folder, and a legitimate one inside it
+    exports = tmp_path / 'exports'
+    exports.mkdir()
+    (tmp_path / 'secret.bin').write_bytes(b'SECRET-BYTES')
+    (exports / 'data.bin').write_bytes(b'\0' * 12)
+    return exports
+
+
+@pytest.fixture
+def folders(exports_folder):
+    return exports_folder, exports_folder.parent / 'secret.bin'
+
+
+def escaping_uris(secret):
+    return [str(secret), '../secret.bin', '%2e%2e/secret.bin', '..%2Fsecret.bin', secret.as_uri()]
+
+
+def test_uris_that_leave_the_export_folder_are_refused(folders):
+    exports, secret = folders
+    for uri in escaping_uris(secret):
+        path = str(exports / 'model.glb')
+        write_external_glb(path, uri)
+        with GLTFDocument(path) as doc:
+            with pytest.raises(GLTFError, match='outside'):
+                doc.buffer(0)
+            with pytest.raises(ValueError):
+                doc.image_bytes(0)
+
+
+def test_sibling_files_still_load(folders):
+    exports, _ = folders
+    path = str(exports / 'model.glb')
+    write_external_glb(path, 'data.bin')
+    with GLTFDocument(path) as doc:
+        assert bytes(doc.buffer(0)) == b'\0' * 12
+        assert bytes(doc.image_bytes(0)) == b'\0' * 12
+
+
+def test_mesh_route_refuses_escaping_buffers(server_module, folders):
+    server = server_module
+    exports, secret = folders
+    client = server.app.test_client()
+    for i, uri in enumerate(escaping_uris(secret)):
+        path = str(exports / f'model_{i}.glb')
+        write_external_glb(path, uri)
+        server.catalog.update(path)
+        response = client.get(f'/model-mesh/model_{i}.glb/0')
+        assert response.status_code == 422, uri
+        assert b'SECRET' not in response.data
@@ -0,0 +1,126 @@
+# tests/test_ingest.py
+import io
+import json
+import struct
+
+import pytest
+
+from builders import write_glb
+from glb_reader import GLTFError
+from ingest import GLBStreamValidator, receive_glb
+
+
+@pytest.fixture
+def good(tmp_path):
+    path = tmp_path / 'good.bin'
+    write_glb(str(path), 1 << 16, parts=4)
+    return path.read_bytes()
+
+
+def broken(data):
+    return {'truncated': data[:-100], 'not a glb': b'PK\x03\x04' + data[4:],
+            'trailing bytes': data + b'\0' * 8, 'bad json': data[:20] + b'X' + data[21:]}
+
+
+def with_json(data, edit):
+    # The same GLB with its JSON chunk passed through edit and re-padded
+    length = struct.unpack_from('<I', data, 12)[0]
+    gltf = json.loads(data[20:20 + length])
+    edit(gltf)
+    json_bytes = json.dumps(gltf).encode()
+    json_bytes += b' ' * (-len(json_bytes) % 4)
+    rest = data[20 + length:]
+    return (struct.pack('<4sII', b'glTF', 2, 20 + len(json_bytes) + len(rest))
+            + struct.pack('<II', len(json_bytes), 0x4E4F534A) + json_bytes + rest)
+
+
+def external(data):
+    return {
+        'buffer uri': with_json(data, lambda g: g['buffers'][0].update(uri='../../etc/passwd')),
+        'second buffer': with_json(data, lambda g: g['buffers'].append({'uri': 'data.bin', 'byteLength': 4})),
+        'image file': with_json(data, lambda g: g.update(images=[{'uri': 'texture.png'}])),
+        'image without source': with_json(data, lambda g: g.update(images=[{'mimeType': 'image/png'}])),
+    }
+
+
+def test_a_valid_glb_passes_in_any_chunking(good):
+    for size in (1, 7, 4096, len(good)):
+        validator = GLBStreamValidator()
+        for offset in range(0, len(good), size):
+            validator.feed(good[offset:offset + size])
+        assert len(validator.finish()['meshes']) == 4
+
+
+@pytest.mark.parametrize('case', ['truncated', 'not a glb', 'trailing bytes', 'bad json'])
+def test_broken_uploads_leave_nothing_behind(good, tmp_path, case):
+    folder = tmp_path / 'exports'
+    folder.mkdir()
+    with pytest.raises(GLTFError):
+        receive_glb(io.BytesIO(broken(good)[case]), str(folder), 'model.glb', chunk_size=1000)
+    assert not list(folder.iterdir())
+
+
+def test_embedded_images_pass_and_external_references_do_not(good):
+    validator = GLBStreamValidator()
+    validator.feed(with_json(good, lambda g: g.update(images=[{'uri': 'data:image/png;base64,AAAA'},
+                                                             {'bufferView': 0, 'mimeType': 'image/png'}])))
+    assert len(validator.finish()['images']) == 2
+    for case, body in external(good).items():
+        with pytest.raises(GLTFError, match='self-contained|not an object'):
+            GLBStreamValidator().feed(body)
+
+
+def test_declared_length_over_the_limit_is_refused_at_the_header(good, tmp_path):
+    with pytest.raises(GLTFError, match='allowed'):
+        receive_glb(io.BytesIO(good), str(tmp_path), 'model.glb', max_bytes=len(good) - 1)
+
+
+@pytest.fixture
+def events(server_module, monkeypatch):
+    events = []
+    monkeypatch.setattr(server_module, 'watch_handler',
+                        server_module.GLBHandler(emit=lambda *event: events.append(event)))
+    return events
+
+
+def post(server, body, filename='model.glb', content_type='model/gltf-binary', headers=None):
+    client = server.app.test_client()
+    return client.post(f'/ingest?filename={filename}', data=body, content_type=content_type, headers=headers)
+
+
+def test_upload_is_committed_and_announced(server_module, events, good, tmp_path):
+    response = post(server_module, good)
+    assert response.status_code == 201 and response.json['announced']
+    assert (tmp_path / 'model.glb').read_bytes() == good
+    assert server_module.catalog.get('model.glb').hash == response.json['hash']
+    event, update = events[0]
+    assert event == 'model_updated' and update['hash'] == response.json['hash']
+
+
+def test_broken_uploads_are_rejected(server_module, events, good, tmp_path):
+    for case, body in broken(good).items():
+        response = post(server_module, body)
+        assert response.status_code == 422, case
+    assert not list(tmp_path.glob('*model*')) and not events
+
+
+def test_uploads_referring_to_other_files_are_rejected(server_module, events, good, tmp_path):
+    for case, body in external(good).items():
+        response = post(server_module, body)
+        assert response.status_code == 422, case
+    assert [p.name for p in tmp_path.iterdir()] == ['good.bin'] and not events and not len(server_module.catalog)
+
+
+def test_only_glb_content_is_accepted(server_module, good, tmp_path):
+    # A form post or text/plain fetch from a web page needs no preflight; both are refused
+    for content_type in ('text/plain', 'application/x-www-form-urlencoded', 'multipart/form-data'):
+        assert post(server_module, good, content_type=content_type).status_code == 415
+    assert post(server_module, good, filename='model.txt').status_code == 400
+    assert not list(tmp_path.glob('model*'))
+
+
+def test_token_is_required_once_configured(server_module, good, monkeypatch):
+    monkeypatch.setattr(server_module, 'INGEST_TOKEN', 's3cret')
+    assert post(server_module, good).status_code == 403
+    assert post(server_module, good, headers={'X-Ingest-Token': 'wrong'}).status_code == 403
+    assert post(server_module, good, headers={'X-Ingest-Token': 's3cret'}).status_code == 201
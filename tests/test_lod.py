@@ -0,0 +1,34 @@
+# tests/test_lod.py
+import json
+import os
+
+from builders import build_assembly, build_soup
+from glb_optimizer import optimize_glb
+from lod import MAX_LEVEL_FRACTION, build_lod_chain, lod_path, manifest_path
+
+
+def test_levels_that_barely_shrink_are_left_out(tmp_path):
+    # Small parts stay whole at every ratio, so the "coarse" levels equal the export
+    source = str(tmp_path / 'assembly.glb')
+    build_assembly(source, 20, 300)
+    cache = str(tmp_path / 'cache')
+    levels = build_lod_chain(source, cache, 'parts', (1.0, 0.25, 0.05))
+    assert levels == []
+    with open(manifest_path(cache, 'parts')) as f:
+        assert json.load(f)['levels'] == []
+    assert not os.path.exists(lod_path(cache, 'parts', 0.25))
+    assert not os.path.exists(lod_path(cache, 'parts', 0.05))
+
+
+def test_published_levels_shrink_coarsest_first(tmp_path):
+    raw, source = str(tmp_path / 'raw.glb'), str(tmp_path / 'export.glb')
+    build_soup(raw, 120)
+    optimize_glb(raw, source)
+    cache = str(tmp_path / 'cache')
+    levels = build_lod_chain(source, cache, 'grid', (1.0, 0.25, 0.05))
+    assert [level['ratio'] for level in levels] == [0.05, 0.25]
+    sizes = [level['bytes'] for level in levels] + [os.path.getsize(source)]
+    triangles = [level['triangles'] for level in levels] + [levels[0]['source_triangles']]
+    for coarse, fine in zip(sizes, sizes[1:]):
+        assert coarse <= MAX_LEVEL_FRACTION * fine
+    assert triangles == sorted(triangles) and len(set(triangles)) == 3
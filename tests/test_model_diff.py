@@ -0,0 +1,76 @@
+# tests/test_model_diff.py
+import queue
+
+import numpy as np
+import pytest
+
+from builders import build_assembly
+from glb_reader import GLTFDocument
+from model_diff import compute_digest, diff_digests, extract_mesh_glb
+
+
+@pytest.fixture
+def versions(tmp_path):
+    v1, v2 = str(tmp_path / 'v1.glb'), str(tmp_path / 'v2.glb')
+    build_assembly(v1, 30, 500)
+    build_assembly(v2, 30, 500, edited=7, moved=12, removed=20)
+    return v1, v2
+
+
+def test_edit_move_and_delete_are_classified(versions):
+    delta = diff_digests(compute_digest(versions[0]), compute_digest(versions[1]))
+    assert [c['node'] for c in delta['changed']] == ['/car/part_7']
+    assert [c['node'] for c in delta['transform_only']] == ['/car/part_12']
+    assert [r['node'] for r in delta['removed']] == ['/car/part_20']
+    assert not delta['added']
+    assert 0 < delta['delta_bytes'] < delta['full_bytes']
+
+
+def test_identical_exports_have_an_empty_delta(versions):
+    digest = compute_digest(versions[0])
+    delta = diff_digests(digest, digest)
+    assert not (delta['changed'] or delta['transform_only'] or delta['added'] or delta['removed'])
+    assert delta['delta_bytes'] == 0
+
+
+def test_extracted_mesh_matches_the_source(versions, tmp_path):
+    delta = diff_digests(compute_digest(versions[0]), compute_digest(versions[1]))
+    mesh_index = delta['changed'][0]['mesh']
+    path = tmp_path / 'mesh.glb'
+    path.write_bytes(extract_mesh_glb(versions[1], mesh_index))
+    with GLTFDocument(versions[1]) as full, GLTFDocument(str(path)) as single:
+        source = full.meshes[mesh_index]['primitives'][0]['attributes']['POSITION']
+        assert np.array_equal(full.accessor(source), single.accessor(0))
+
+
+def test_announcement_goes_out_before_the_delta(server_module, tmp_path):
+    events = queue.Queue()
+    handler = server_module.GLBHandler(emit=lambda event, payload: events.put((event, payload)))
+    path = str(tmp_path / 'car.glb')
+    build_assembly(path, 30, 500)
+    handler.remember(server_module.catalog.update(path))
+    build_assembly(path, 30, 500, edited=3)
+    assert handler.publish(server_module.catalog.update(path))
+    event, update = events.get(timeout=5)
+    assert event == 'model_updated'
+    assert update['delta'] is None and update['delta_pending']
+    event, message = events.get(timeout=10)
+    assert event == 'model_delta' and message['hash'] == update['hash']
+    assert [c['node'] for c in message['delta']['changed']] == ['/car/part_3']
+    # The same bytes again are not announced twice
+    assert not handler.publish(server_module.catalog.update(path))
+
+
+def test_meshes_are_served_from_the_cache_folder(server_module, tmp_path):
+    path = str(tmp_path / 'car.glb')
+    build_assembly(path, 5, 200)
+    entry = server_module.catalog.update(path)
+    client = server_module.app.test_client()
+    response = client.get('/model-mesh/car.glb/2')
+    assert response.status_code == 200
+    cached = server_module.mesh_path(entry.hash, 2)
+    with open(cached, 'rb') as f:
+        assert f.read() == response.data
+    revalidated = client.get('/model-mesh/car.glb/2', headers={'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+    assert client.get('/model-mesh/car.glb/99').status_code == 404
@@ -0,0 +1,45 @@
+# tests/test_model_info.py
+import json
+import os
+
+import numpy as np
+import pytest
+
+from builders import build_assembly, decoded_bounds
+from model_info import model_info
+
+SCENE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'blender_exports', 'scene.gltf')
+
+
+def test_scene_gltf_is_described_without_its_buffer():
+    # scene.bin is not in the repository, so this only passes if no accessor is decoded
+    info = model_info(SCENE)
+    assert info['decoded_accessors'] == 0
+    assert info['counts'] == {'nodes': 65, 'instances': 63, 'meshes': 63, 'primitives': 63,
+                              'materials': 1, 'textures': 0, 'images': 0}
+    assert info['triangles'] == info['unique_triangles'] == 4761310
+    assert info['vertices'] == 3944754
+    low, high = np.array(info['bounds']['min']), np.array(info['bounds']['max'])
+    assert (high > low).all()
+    assert np.allclose(info['bounds']['center'], (low + high) / 2)
+    assert np.allclose(info['bounds']['size'], high - low)
+
+
+def test_bounds_match_decoded_world_positions(tmp_path):
+    path = str(tmp_path / 'assembly.glb')
+    build_assembly(path, 12, 400)
+    info = model_info(path)
+    low, high = decoded_bounds(path)
+    assert np.allclose(low, info['bounds']['min']) and np.allclose(high, info['bounds']['max'])
+    assert info['counts']['meshes'] == 12 and info['triangles'] == 12 * 800
+
+
+def test_model_info_route_serves_scene_gltf_with_an_etag():
+    server = pytest.importorskip('server')
+    client = server.app.test_client()
+    response = client.get('/model-info/scene.gltf')
+    assert response.status_code == 200
+    assert json.loads(response.data)['counts']['meshes'] == 63
+    etag = response.headers['ETag']
+    assert client.get('/model-info/scene.gltf', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/model-info/missing.gltf').status_code == 404
@@ -0,0 +1,46 @@
+# tests/test_profiler.py
+import pytest
+
+from profiler import MAX_INTERVAL, MIN_INTERVAL, SamplingProfiler
+
+
+@pytest.mark.parametrize('interval', [-1, 0, MIN_INTERVAL / 2, MAX_INTERVAL * 2, float('nan'), float('inf')])
+def test_intervals_out_of_bounds_are_refused(interval):
+    profiler = SamplingProfiler()
+    with pytest.raises(ValueError):
+        profiler.start(interval)
+    assert not profiler.running
+
+
+@pytest.fixture
+def client(monkeypatch):
+    server = pytest.importorskip('server')
+    monkeypatch.setattr(server, 'profiler', SamplingProfiler())
+    yield server.app.test_client()
+    server.profiler.stop()
+
+
+def test_only_json_toggles_the_profiler(client):
+    import server
+    # A form or text/plain post needs no CORS preflight, so any web page could send one
+    assert client.post('/profiler', data={'enabled': '1'}).status_code == 415
+    assert client.post('/profiler?enabled=1', data='{}', content_type='text/plain').status_code == 415
+    assert not server.profiler.running
+    response = client.post('/profiler', json={'enabled': True, 'interval': 0.002})
+    assert response.status_code == 200 and response.json['running'] and response.json['interval'] == 0.002
+    assert not client.post('/profiler', json={'enabled': False}).json['running']
+
+
+@pytest.mark.parametrize('interval', [-1, 0, 5, 'fast', [0.002]])
+def test_bad_intervals_get_400(client, interval):
+    response = client.post('/profiler', json={'enabled': True, 'interval': interval})
+    assert response.status_code == 400
+    assert not client.post('/profiler', json={'enabled': False}).json['running']
+
+
+def test_token_is_required_once_configured(client, monkeypatch):
+    import server
+    monkeypatch.setattr(server, 'INGEST_TOKEN', 's3cret')
+    assert client.post('/profiler', json={'enabled': True}).status_code == 403
+    response = client.post('/profiler', json={'enabled': True}, headers={'X-Ingest-Token': 's3cret'})
+    assert response.status_code == 200 and response.json['running']
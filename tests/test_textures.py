@@ -0,0 +1,54 @@
+# tests/test_textures.py
+import io
+import json
+import re
+import struct
+from concurrent.futures import Future
+from urllib.parse import urljoin, urlsplit
+
+import pytest
+
+from builders import build_textured, make_png
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def run_now(fn, *args):
+    future = Future()
+    future.set_result(fn(*args))
+    return future
+
+
+def loader_url(model_url, uri):
+    # three's LoaderUtils.resolveURL: absolute and data: uris as they are, anything else
+    # appended to the model's folder, then normalised by the browser against the page
+    if not re.match(r'^(https?:)?//|^data:|^blob:', uri):
+        uri = model_url.rsplit('/', 1)[0] + '/' + uri
+    return urlsplit(urljoin('http://localhost/', uri)).path
+
+
+def test_web_light_images_resolve_to_served_textures(server_module, tmp_path, monkeypatch):
+    from textures import TextureCache
+    server = server_module
+    monkeypatch.setattr(server, 'texture_cache', TextureCache(str(tmp_path / '.cache' / 'textures')))
+    monkeypatch.setattr(server, 'process_submit', run_now)
+    path = str(tmp_path / 'model.glb')
+    build_textured(path, [make_png(256, seed) for seed in range(2)])
+    entry = server.catalog.update(path)
+    server.process_textures(entry)
+
+    client = server.app.test_client()
+    model_url = f'/web-light/{entry.hash}/model.glb'
+    response = client.get(model_url)
+    assert response.status_code == 200
+    data = response.data
+    length = struct.unpack_from('<I', data, 12)[0]
+    images = json.loads(data[20:20 + length])['images']
+    assert len(images) == 4  # JPEG source plus a WebP alternative for each texture
+    for image in images:
+        url = loader_url(model_url, image['uri'])
+        assert url.startswith('/textures/')
+        texture = client.get(url)
+        assert texture.status_code == 200, url
+        with Image.open(io.BytesIO(texture.data)) as decoded:
+            assert decoded.size == (256, 256)
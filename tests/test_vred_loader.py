@@ -0,0 +1,108 @@
+# tests/test_vred_loader.py
+import struct
+import sys
+import threading
+import time
+
+import pytest
+
+import vred_stubs
+from vred_stubs import PART_MATERIALS, StubScene
+
+vred_loader = vred_stubs.vred_loader  # Imported there with the outside-VRED chatter silenced
+
+
+@pytest.fixture
+def scene(monkeypatch):
+    # VRED services stubbed into the loader's namespace, with faster loads than the benchmark
+    monkeypatch.setattr(vred_stubs, 'LOAD_SECONDS', 0.05)
+    scene = StubScene(500)
+    for name in ('vrFileIO', 'vrNodeService', 'vrMaterialService', 'vrCameraService', 'vrCamera',
+                 'vrController', 'vrLightService'):
+        monkeypatch.setattr(vred_loader, name, scene, raising=False)
+    monkeypatch.setattr(vred_loader.VREDModelHandler, '_current_model_node', None)
+    return scene
+
+
+def test_a_burst_loads_the_newest_export_and_leaves_one_model(scene, tmp_path, capsys):
+    results = []
+    loaded = threading.Event()
+    paths = [str(tmp_path / f'model_{i:02d}.glb') for i in range(20)]
+
+    def on_loaded(path, timings):
+        results.append((path, timings))
+        if path == paths[-1]:
+            loaded.set()
+    handler = vred_loader.VREDModelHandler(on_loaded=on_loaded)
+    handler.start()
+    try:
+        for path in paths:
+            with open(path, 'wb') as f:
+                f.write(struct.pack('<4sII', b'glTF', 2, 1024) + b'\0' * 1012)
+            handler.scheduler.touch(path)
+            time.sleep(0.01)
+        assert loaded.wait(10)
+    finally:
+        handler.stop()
+    assert scene.loads < len(paths) and handler.worker.skipped
+    path, timings = results[-1]
+    assert path == paths[-1] and 'refresh' in timings
+    assert len(scene.roots) == 1
+
+
+def test_only_the_loaded_models_materials_are_updated(scene, capsys):
+    handler = vred_loader.VREDModelHandler()
+    handler._reload_model('model.glb')
+    root = scene.roots[0]
+    assert len(vred_loader.subtree_materials(root)) == PART_MATERIALS  # Shared by 200 parts, listed once
+    for material in scene.materials:
+        touched = material in root.owned
+        assert (material.roughness == vred_loader.MATERIAL_ROUGHNESS) is touched
+        assert (material.metallic == vred_loader.MATERIAL_METALLIC) is touched
+
+
+def test_load_worker_keeps_only_the_latest_waiting_path(capsys):
+    started, release, loads = threading.Event(), threading.Event(), []
+
+    def load(path, superseded):
+        loads.append(path)
+        started.set()
+        release.wait(5)
+    worker = vred_loader.LoadWorker(load).start()
+    try:
+        worker.submit('a')
+        assert started.wait(5)
+        for path in ('b', 'c', 'd'):
+            worker.submit(path)
+        assert worker.superseded()
+        release.set()
+        deadline = time.perf_counter() + 5
+        while len(loads) < 2 and time.perf_counter() < deadline:
+            time.sleep(0.01)
+    finally:
+        worker.stop()
+    assert loads == ['a', 'd'] and worker.skipped == 2
+
+
+def test_runs_standalone_without_the_repository(scene, tmp_path, monkeypatch, capsys):
+    # As pasted into VRED's script editor: no __file__ and no change_scheduler to import
+    monkeypatch.setitem(sys.modules, 'change_scheduler', None)
+    with open(vred_loader.__file__) as f:
+        namespace = {'__name__': 'vred_standalone'}
+        exec(compile(f.read(), '<script editor>', 'exec'), namespace)
+    for name in ('vrFileIO', 'vrNodeService', 'vrMaterialService', 'vrCameraService', 'vrCamera',
+                 'vrController', 'vrLightService'):
+        namespace[name] = scene
+    loaded = threading.Event()
+    handler = namespace['VREDModelHandler'](on_loaded=lambda path, timings: loaded.set())
+    assert type(handler.scheduler).__module__ == 'vred_standalone'
+    handler.start()
+    try:
+        path = str(tmp_path / 'model.glb')
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<4sII', b'glTF', 2, 1024) + b'\0' * 1012)
+        handler.scheduler.touch(path)
+        assert loaded.wait(5)
+    finally:
+        handler.stop()
+    assert scene.loads == 1
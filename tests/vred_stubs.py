@@ -0,0 +1,99 @@
+# tests/vred_stubs.py
+# VRED outside VRED: vrFileIO, vrNodeService, vrMaterialService and friends as one stub scene
+# with fixed step costs, installed into the loader module's namespace the way VRED provides
+# them. Shared by tests/test_vred_loader.py and benchmarks/bench_vred_loader.py.
+import contextlib
+import io
+import time
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import vred_loader  # Runs main(), which stops at the environment check outside VRED
+
+LOAD_SECONDS = 0.15
+FIT_SECONDS = 0.01
+REFRESH_SECONDS = 0.02
+PARTS = 200
+PART_MATERIALS = 20
+
+
+class StubMaterial:
+    __slots__ = ('object_id', 'roughness', 'metallic')
+
+    def __init__(self, object_id):
+        self.object_id = object_id
+        self.roughness = self.metallic = None
+
+    def getObjectId(self):
+        return self.object_id
+
+    def setRoughness(self, value):
+        self.roughness = value
+
+    def setMetallic(self, value):
+        self.metallic = value
+
+
+class StubNode:
+    def __init__(self, scene, children=(), material=None):
+        self.scene = scene
+        self.children = list(children)
+        self.material = material
+
+    def getChildren(self):
+        return self.children
+
+    def getMaterial(self):
+        return self.material
+
+    def remove(self):
+        self.scene.remove(self)
+
+
+class StubScene:
+    # Stands in for the VRED services; counts loads and how many materials were touched
+    def __init__(self, scene_materials):
+        self.materials = [StubMaterial(i) for i in range(scene_materials)]  # The rest of the scene
+        self.roots = []
+        self.loads = 0
+        self._ids = scene_materials
+
+    def load(self, path):
+        time.sleep(LOAD_SECONDS)
+        self.loads += 1
+        materials = [StubMaterial(self._ids + i) for i in range(PART_MATERIALS)]
+        self._ids += PART_MATERIALS
+        self.materials.extend(materials)
+        parts = [StubNode(self, material=materials[i % PART_MATERIALS]) for i in range(PARTS)]
+        root = StubNode(self, [StubNode(self, parts[i:i + 20]) for i in range(0, PARTS, 20)])
+        root.owned = set(materials)
+        self.roots.append(root)
+        return root
+
+    def remove(self, root):
+        self.roots.remove(root)
+        self.materials = [m for m in self.materials if m not in root.owned]
+
+    def getAllMaterials(self):
+        return list(self.materials)
+
+    def getActiveCamera(self):
+        return self
+
+    def fitAll(self):
+        time.sleep(FIT_SECONDS)
+
+    def vrRefresh(self):
+        time.sleep(REFRESH_SECONDS)
+
+    def setAmbientLightIntensity(self, value):
+        pass
+
+    def removeNode(self, node):
+        self.remove(node)
+
+
+def install(scene):
+    for name, stub in {'vrFileIO': scene, 'vrNodeService': scene, 'vrMaterialService': scene,
+                       'vrCameraService': scene, 'vrCamera': scene, 'vrController': scene,
+                       'vrLightService': scene}.items():
+        setattr(vred_loader, name, stub)
@@ -0,0 +1,177 @@
+# textures.py
+import hashlib
+import io
+import json
+import os
+
+from glb_reader import GLTFDocument
+from glb_writer import GLBRewriter
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it exports are served with their original textures
+    Image = None
+
+EXTENSIONS = {'webp': '.webp', 'jpeg': '.jpg', 'png': '.png'}
+MIME_TYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+MANIFEST = 'variants.json'
+
+
+def image_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _has_alpha(image):
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        return image.convert('RGBA').getchannel('A').getextrema()[0] < 255
+    return False
+
+
+def encode_variants(data, dest_dir, sizes, formats, quality=85):
+    # Process-pool entry point: decodes one image and writes every size/format variant to
+    # dest_dir. JPEG cannot carry alpha, so images with transparency get PNG instead.
+    # The manifest is written last, so its presence means the set is complete.
+    os.makedirs(dest_dir, exist_ok=True)
+    with Image.open(io.BytesIO(data)) as source:
+        source.load()
+        alpha = _has_alpha(source)
+        source = source.convert('RGBA' if alpha else 'RGB')
+        longest = max(source.size)
+        variants = []
+        for size in sorted(set(sizes), reverse=True):
+            target = min(size, longest)
+            scale = target / longest
+            resized = source
+            if scale < 1:
+                dims = (max(1, round(source.width * scale)), max(1, round(source.height * scale)))
+                resized = source.resize(dims, Image.LANCZOS)
+            for fmt in formats:
+                if fmt == 'jpeg' and alpha:
+                    fmt = 'png'
+                name = f'{size}{EXTENSIONS[fmt]}'
+                tmp = os.path.join(dest_dir, f'{name}.tmp')
+                options = {'optimize': True} if fmt == 'png' else {'quality': quality}
+                resized.save(tmp, format=fmt.upper(), **options)
+                os.replace(tmp, os.path.join(dest_dir, name))
+                variants.append({'size': size, 'format': fmt, 'file': name, 'width': resized.width,
+                                 'height': resized.height, 'bytes': os.path.getsize(os.path.join(dest_dir, name))})
+    manifest = {'alpha': alpha, 'source_bytes': len(data), 'variants': variants}
+    with open(os.path.join(dest_dir, f'{MANIFEST}.tmp'), 'w') as f:
+        json.dump(manifest, f)
+    os.replace(os.path.join(dest_dir, f'{MANIFEST}.tmp'), os.path.join(dest_dir, MANIFEST))
+    return manifest
+
+
+class TextureCache:
+    # Downscaled/transcoded texture variants keyed by the hash of the encoded source image,
+    # so a texture shared by consecutive exports is only ever encoded once
+    def __init__(self, folder, sizes=(2048, 1024, 512), formats=('webp', 'jpeg')):
+        self.folder = folder
+        self.sizes = tuple(sizes)
+        self.formats = tuple(formats)
+        self.hits = 0
+        self.misses = 0
+
+    def variant_dir(self, key):
+        return os.path.join(self.folder, key)
+
+    def manifest(self, key):
+        try:
+            with open(os.path.join(self.variant_dir(key), MANIFEST)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def variant(self, key, size, fmt):
+        # Cached variant file for a texture, falling back to PNG where the texture has alpha
+        manifest = self.manifest(key)
+        if manifest is None:
+            return None
+        for variant in manifest['variants']:
+            if variant['size'] == size and (variant['format'] == fmt or (fmt == 'jpeg' and variant['format'] == 'png')):
+                return variant
+        return None
+
+    def process(self, path, submit):
+        # Extracts every image of an export and encodes the missing ones through submit
+        # (a process pool's submit, typically).
+        # Returns {image index: texture key} once all variants exist.
+        if Image is None:
+            return {}
+        keys, jobs = {}, {}
+        with GLTFDocument(path) as doc:
+            for index in range(len(doc.images)):
+                try:
+                    data = bytes(doc.image_bytes(index))
+                except (OSError, ValueError) as e:
+                    print(f'[textures] Skipping image {index} of {os.path.basename(path)}: {e}')
+                    continue
+                key = image_hash(data)
+                keys[index] = key
+                if key in jobs:
+                    continue
+                if self.manifest(key) is not None:
+                    self.hits += 1
+                    continue
+                self.misses += 1
+                jobs[key] = submit(encode_variants, data, self.variant_dir(key), self.sizes, self.formats)
+        for key, job in jobs.items():
+            try:
+                job.result()
+            except Exception as e:
+                print(f'[textures] Failed to encode {key}: {e}')
+                keys = {i: k for i, k in keys.items() if k != key}
+        return keys
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class _WebLightWriter(GLBRewriter):
+    # Points every image at its cached variant instead of embedding it. The core-format
+    # (JPEG/PNG) variant is the image source; WebP is offered through EXT_texture_webp.
+    def __init__(self, doc, cache, keys, size, url_prefix):
+        super().__init__(doc)
+        self.cache = cache
+        self.keys = keys
+        self.size = size
+        self.url_prefix = url_prefix
+        self._webp_images = {}  # original image index -> webp image index
+
+    def image(self, index, image):
+        key = self.keys.get(index)
+        fallback = self.cache.variant(key, self.size, 'jpeg') if key else None
+        if fallback is None:
+            super().image(index, image)
+            return
+        image.pop('bufferView', None)
+        image['uri'] = f'{self.url_prefix}/{key}/{fallback["file"]}'
+        image['mimeType'] = MIME_TYPES[fallback['format']]
+        webp = self.cache.variant(key, self.size, 'webp')
+        if webp is not None:
+            images = self.builder.json['images']
+            images.append({'uri': f'{self.url_prefix}/{key}/{webp["file"]}', 'mimeType': 'image/webp'})
+            self._webp_images[index] = len(images) - 1
+
+    def run(self):
+        builder = super().run()
+        if self._webp_images:
+            for texture in builder.json.get('textures', []):
+                webp = self._webp_images.get(texture.get('source'))
+                if webp is not None:
+                    texture.setdefault('extensions', {})['EXT_texture_webp'] = {'source': webp}
+            used = builder.json.setdefault('extensionsUsed', [])
+            if 'EXT_texture_webp' not in used:
+                used.append('EXT_texture_webp')
+        return builder
+
+
+def build_web_light(source_path, dest_path, cache, keys, size=1024, url_prefix='../../textures'):
+    # Repacks an export so its textures are fetched (and browser-cached) separately
+    # at the given size rather than embedded at full resolution. GLTFLoader prefixes image
+    # uris with the model's folder unless they carry a scheme, so the prefix is relative to
+    # /web-light/<hash>/<filename> and lands on /textures/<key>/<file>.
+    with GLTFDocument(source_path) as doc:
+        _WebLightWriter(doc, cache, keys, size, url_prefix).run().write(dest_path)
+    return os.path.getsize(dest_path)
@@ -5,8 +5,13 @@ import { OrbitControls } from 'https://cdn.skypack.dev/three@0.128.0/examples/js
 import { io } from 'https://cdn.socket.io/4.7.2/socket.io.esm.min.js';
 
 // WebSocket connection and GLTF loader
-const socket = io();
+// ?room=a,b subscribes to rooms on the async server: the export folder, or file:<name> for one export
+const params = new URLSearchParams(window.location.search);
+const socket = params.get('room') ? io({ query: { room: params.get('room') } }) : io();
+socket.on('connect_error', (error) => console.error('Socket connection refused:', error.message));
 const loader = new GLTFLoader();
+// ?light=1 loads the web-light copy (cached downscaled textures) when the server has one
+const LIGHT_TEXTURES = params.has('light');
 let scene, camera, renderer, controls, model;
 
 // Basic Three.js setup
@@ -43,66 +48,266 @@ window.addEventListener('resize', () => {
     renderer.setSize(window.innerWidth, window.innerHeight);
 });
 
-// Load the most recent GLB file from server
-async function loadLatestModel() {
-    const infoDiv = document.getElementById('model-info');
+// Hash of the export currently on screen, used to ignore repeat notifications
+let currentHash = null;
+
+// glTF node index -> Object3D for the model on screen, used to apply deltas in place
+let nodeObjects = new Map();
+
+function indexNodes(gltf) {
+    nodeObjects = new Map();
+    gltf.parser.associations.forEach((info, object) => {
+        // Older three.js releases store { type, index }, newer ones { nodes: index }
+        const index = info.nodes !== undefined ? info.nodes : (info.type === 'nodes' ? info.index : undefined);
+        if (index !== undefined && object.isObject3D) {
+            nodeObjects.set(index, object);
+        }
+    });
+}
+
+function setMatrix(object, matrix) {
+    object.matrix.fromArray(matrix);
+    object.matrix.decompose(object.position, object.quaternion, object.scale);
+}
+
+async function fetchMesh(filename, meshIndex) {
+    const response = await fetch(`/model-mesh/${filename}/${meshIndex}`);
+    if (!response.ok) {
+        throw new Error(`Mesh ${meshIndex} unavailable (${response.status})`);
+    }
+    const buffer = await response.arrayBuffer();
+    const gltf = await new Promise((resolve, reject) => loader.parse(buffer, '', resolve, reject));
+    return gltf.scene.children[0];
+}
+
+// Apply a mesh-level delta to the model on screen; returns false when a full reload is needed
+async function applyDelta(update) {
+    const delta = update.delta;
+    if (!model || !delta || delta.previous_hash !== currentHash || delta.added.length) {
+        return false;
+    }
+    const previous = [...delta.changed, ...delta.transform_only, ...delta.removed].map((c) => c.previous_index);
+    if (!previous.every((index) => nodeObjects.has(index))) {
+        return false;
+    }
+    
+    // Fetch every changed mesh before touching the scene so a failure leaves it intact
+    const replacements = await Promise.all(delta.changed.map((change) =>
+        change.mesh === null ? new THREE.Group() : fetchMesh(update.filename, change.mesh)));
+    
+    const tracked = new Set(nodeObjects.values());
+    const next = new Map();
+    const renumbered = new Map(delta.renumbered);
+    const removed = new Set(delta.removed.map((r) => r.previous_index));
+    nodeObjects.forEach((object, index) => {
+        if (!removed.has(index)) {
+            next.set(renumbered.has(index) ? renumbered.get(index) : index, object);
+        }
+    });
+    
+    delta.removed.forEach(({ previous_index }) => {
+        const object = nodeObjects.get(previous_index);
+        if (object.parent) object.parent.remove(object);
+    });
+    delta.transform_only.forEach((change) => setMatrix(nodeObjects.get(change.previous_index), change.matrix));
+    delta.changed.forEach((change, i) => {
+        const old = nodeObjects.get(change.previous_index);
+        const replacement = replacements[i];
+        replacement.name = old.name;
+        setMatrix(replacement, change.matrix);
+        // Child nodes are tracked by the delta on their own, so carry them over
+        old.children.filter((child) => tracked.has(child)).forEach((child) => replacement.add(child));
+        old.parent.add(replacement);
+        old.parent.remove(old);
+        next.set(change.index, replacement);
+    });
+    
+    nodeObjects = next;
+    currentHash = update.hash;
+    
+    showInfo(update.filename, (update.size / 1024).toFixed(1),
+             `<div>Delta: ${(delta.delta_bytes / 1024).toFixed(1)} of ${(delta.full_bytes / 1024).toFixed(1)} KB</div>`);
+    console.log(`Applied delta for ${update.filename}: ${delta.changed.length} changed, ` +
+                `${delta.transform_only.length} moved, ${delta.removed.length} removed`);
+    return true;
+}
+
+// Put a scene on screen in place of the current model, optionally framing the camera on it
+function showModel(object, frame) {
+    if (model) {
+        scene.remove(model);
+    }
+    model = object;
+    scene.add(model);
+    if (!frame) {
+        return;
+    }
+    
+    frameBox(new THREE.Box3().setFromObject(model));
+}
+
+// Auto-frame a bounding box in the viewport
+function frameBox(box) {
+    const center = box.getCenter(new THREE.Vector3());
+    
+    // Point camera controls at model center
+    controls.target.copy(center);
+    controls.update();
     
+    // Position camera to fit entire model
+    const size = box.getSize(new THREE.Vector3());
+    const maxDim = Math.max(size.x, size.y, size.z);
+    const distance = maxDim * 1.5; 
+    
+    camera.position.copy(center);
+    camera.position.add(new THREE.Vector3(distance, distance * 0.4, distance));
+    camera.lookAt(center);
+}
+
+function showInfo(filename, fileSize, extra) {
+    const infoDiv = document.getElementById('model-info');
+    infoDiv.innerHTML = `
+        <div>File: ${filename}</div>
+        <div>Size: ${fileSize} KB</div>
+        ${extra}
+    `;
+    infoDiv.style.display = 'block';
+}
+
+// Server-side stats and world bounds, available before the model itself has downloaded
+async function fetchModelInfo(filename, hash) {
+    try {
+        const response = await fetch(`/model-info/${filename}`);
+        if (!response.ok) {
+            return null;
+        }
+        const info = await response.json();
+        return !hash || info.hash === hash ? info : null;
+    } catch (error) {
+        return null;
+    }
+}
+
+function formatStats(info) {
+    if (!info) {
+        return '';
+    }
+    const { counts } = info;
+    return `
+        <div>Triangles: ${info.triangles.toLocaleString()}</div>
+        <div>Vertices: ${info.vertices.toLocaleString()}</div>
+        <div>Meshes: ${counts.meshes} (${counts.instances} instances), Materials: ${counts.materials}, Textures: ${counts.textures}</div>
+    `;
+}
+
+// Coarsest level from the LOD manifest, or null while the chain is still being built
+async function fetchCoarseLevel(filename, hash) {
     try {
-        const response = await fetch('/latest-model');
-        const { filename } = await response.json();
+        const response = await fetch(`/lod-manifest/${filename}`);
+        if (!response.ok) {
+            return null;
+        }
+        const manifest = await response.json();
+        if (!manifest.ready || manifest.hash !== hash || manifest.levels.length < 2) {
+            return null;
+        }
+        return manifest.levels[0];
+    } catch (error) {
+        return null;
+    }
+}
+
+// Load the most recent GLB file from server, or the one named in an update event
+async function loadLatestModel(update = null) {
+    try {
+        let filename = update && update.filename;
+        let hash = update && update.hash;
+        let size = update && update.size;
+        let url = update && update.url;
+        if (!filename || LIGHT_TEXTURES) {
+            const response = await fetch('/latest-model');
+            let webLightUrl;
+            ({ filename, hash, size, url, web_light_url: webLightUrl } = await response.json());
+            // Opt-in (?light=1): downscaled textures fetched separately instead of embedded
+            if (LIGHT_TEXTURES && webLightUrl) {
+                url = webLightUrl;
+            }
+        }
         
         if (!filename) {
             console.log('No GLB files found');
             return;
         }
         
-        // Get file size from server
-        const fileResponse = await fetch(`/blender_exports/${filename}`, { method: 'HEAD' });
-        const fileSize = (parseInt(fileResponse.headers.get('content-length')) / 1024).toFixed(1);
+        // Size comes with the model metadata, so no extra HEAD request is needed
+        const fileSize = (size / 1024).toFixed(1);
+        
+        // The server hands out hash-addressed URLs (the optimized copy once it is ready),
+        // which are immutable and can be served straight from the browser cache
+        if (!url) {
+            url = hash ? `/exports/${hash}/${filename}` : `/blender_exports/${filename}`;
+        }
         
         // Remove old model if it exists
         if (model) {
             scene.remove(model);
+            model = null;
         }
         
-        // Load new model with timing
+        // Show the coarsest LOD first when the server has built one, then refine in place
         const startTime = performance.now();
+        let refined = false;
+        let framed = false;
+        let stats = '';
+        let shown = false;
+        
+        // Frame the camera and show stats as soon as the server reports them
+        fetchModelInfo(filename, hash).then((info) => {
+            stats = formatStats(info);
+            if (info && info.bounds && !framed) {
+                frameBox(new THREE.Box3(new THREE.Vector3(...info.bounds.min), new THREE.Vector3(...info.bounds.max)));
+                framed = true;
+            }
+            if (info && !shown) {
+                showInfo(filename, fileSize, `<div>Loading...</div>${stats}`);
+            }
+        });
+        
+        const coarse = await fetchCoarseLevel(filename, hash);
+        if (coarse) {
+            loader.load(coarse.url, (gltf) => {
+                if (refined) {
+                    return;
+                }
+                showModel(gltf.scene, !framed);
+                framed = true;
+                const firstTime = ((performance.now() - startTime) / 1000).toFixed(2);
+                shown = true;
+                showInfo(filename, fileSize, `<div>First geometry: ${firstTime}s (${(coarse.ratio * 100).toFixed(0)}% LOD)</div>${stats}`);
+                console.log(`Showing ${(coarse.ratio * 100).toFixed(0)}% LOD of ${filename} (${firstTime}s)`);
+            });
+        }
+        
+        // Load full model with timing
         loader.load(
-            `/blender_exports/${filename}`,
+            url,
             (gltf) => {
                 const loadTime = ((performance.now() - startTime) / 1000).toFixed(2);
-                model = gltf.scene;
-                scene.add(model);
-                
-                // Auto-frame the model in the viewport
-                const box = new THREE.Box3().setFromObject(model);
-                const center = box.getCenter(new THREE.Vector3());
-                
-                // Point camera controls at model center
-                controls.target.copy(center);
-                controls.update();
-                
-                // Position camera to fit entire model
-                const size = box.getSize(new THREE.Vector3());
-                const maxDim = Math.max(size.x, size.y, size.z);
-                const distance = maxDim * 1.5; 
-                
-                camera.position.copy(center);
-                camera.position.add(new THREE.Vector3(distance, distance * 0.4, distance));
-                camera.lookAt(center);
+                refined = true;
+                showModel(gltf.scene, !framed);
+                framed = true;
+                currentHash = hash || null;
+                indexNodes(gltf);
                 
                 // Show info in top-right corner
-                infoDiv.innerHTML = `
-                    <div>File: ${filename}</div>
-                    <div>Size: ${fileSize} KB</div>
-                    <div>Load Time: ${loadTime}s</div>
-                `;
-                infoDiv.style.display = 'block';
-                
+                shown = true;
+                showInfo(filename, fileSize, `<div>Load Time: ${loadTime}s</div>${stats}`);
                 console.log(`Loaded: ${filename} (${loadTime}s)`);
             },
             (progress) => {
-                const percent = (progress.loaded / progress.total * 100).toFixed(1);
+                // Compressed responses report no usable total, so fall back to the known size
+                const total = progress.total || size;
+                const percent = (Math.min(progress.loaded / total, 1) * 100).toFixed(1);
                 console.log(`Loading progress: ${percent}%`);
             },
             (error) => {
@@ -115,10 +320,68 @@ async function loadLatestModel() {
 }
 
 // Listen for model updates from server
-socket.on('model_updated', () => {
-    console.log('Model updated - reloading...');
-    // Small delay to ensure file write is complete
-    setTimeout(loadLatestModel, 1000);
+// The server only announces files whose write has completed, so load right away
+// Deltas are applied in place when possible, otherwise the whole model is reloaded
+let latestUpdate = null;
+
+// Deltas are computed after the announcement and arrive as model_delta. A viewer waits up to
+// DELTA_WAIT_MS for one before falling back to a full reload.
+const DELTA_WAIT_MS = 2000;
+const deltas = new Map();  // hash -> delta (null when the server could not diff)
+const deltaWaiters = new Map();  // hash -> resolve
+socket.on('model_delta', (message) => {
+    const resolve = deltaWaiters.get(message.hash);
+    if (resolve) {
+        deltaWaiters.delete(message.hash);
+        resolve(message.delta);
+        return;
+    }
+    deltas.clear();  // Only the newest is ever useful
+    deltas.set(message.hash, message.delta);
+});
+
+function waitForDelta(hash) {
+    if (deltas.has(hash)) {
+        return Promise.resolve(deltas.get(hash));
+    }
+    return new Promise((resolve) => {
+        deltaWaiters.set(hash, resolve);
+        setTimeout(() => {
+            if (deltaWaiters.get(hash) === resolve) {
+                deltaWaiters.delete(hash);
+                resolve(null);
+            }
+        }, DELTA_WAIT_MS);
+    });
+}
+
+socket.on('model_updated', async (update) => {
+    if (update && update.hash && update.hash === currentHash) {
+        return;
+    }
+    // Large rooms get a fetch window; waiting a random slice of it spreads the downloads
+    latestUpdate = update;
+    if (update && update.fetch_window_ms) {
+        await new Promise((resolve) => setTimeout(resolve, Math.random() * update.fetch_window_ms));
+        if (latestUpdate !== update) {
+            return;
+        }
+    }
+    try {
+        if (update && !update.delta && update.delta_pending) {
+            update.delta = await waitForDelta(update.hash);
+            if (latestUpdate !== update) {
+                return;
+            }
+        }
+        if (update && update.delta && await applyDelta(update)) {
+            return;
+        }
+    } catch (error) {
+        console.error('Failed to apply delta:', error);
+    }
+    console.log(`Model updated - reloading ${update ? update.filename : ''}...`);
+    loadLatestModel(update);
 });
 
 // Load initial model
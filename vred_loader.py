@@ -1,30 +1,232 @@
 import os
+import struct
+import sys
 import time
 import threading
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+# Shared helpers live next to this script in the repository. VRED's script editor runs the
+# code without a __file__, and a copied script has no repository beside it; the minimal
+# scheduler below covers both cases.
+if '__file__' in globals():
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+try:
+    from change_scheduler import ChangeScheduler
+except ImportError:
+    class ChangeScheduler:
+        # Standalone stand-in for change_scheduler.ChangeScheduler: calls callback(path)
+        # once a file's size and mtime held still for quiet_period and, for GLBs, the
+        # header's declared length matches the size on disk
+        def __init__(self, callback, extensions=('.glb',), poll_interval=0.05, quiet_period=0.25,
+                     timeout=120.0, name='change-scheduler'):
+            self.callback = callback
+            self.extensions = tuple(ext.lower() for ext in extensions)
+            self.poll_interval = poll_interval
+            self.quiet_period = quiet_period
+            self.timeout = timeout
+            self._pending = {}  # path -> [first event, stable since, (size, mtime_ns)]
+            self._cond = threading.Condition()
+            self._running = False
+            self._thread = None
+            self._name = name
+
+        def start(self):
+            with self._cond:
+                if self._running:
+                    return self
+                self._running = True
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+            return self
+
+        def stop(self):
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
+            if self._thread is not None:
+                self._thread.join()
+
+        def touch(self, path):
+            if not path.lower().endswith(self.extensions):
+                return
+            now = time.monotonic()
+            with self._cond:
+                pending = self._pending.setdefault(path, [now, now, None])
+                pending[1] = now
+                self._cond.notify()
+
+        def discard(self, path):
+            with self._cond:
+                self._pending.pop(path, None)
+
+        @staticmethod
+        def _complete(path, size):
+            if not path.lower().endswith('.glb'):
+                return size > 0
+            try:
+                with open(path, 'rb') as f:
+                    header = f.read(12)
+            except OSError:
+                return False
+            return len(header) == 12 and header[:4] == b'glTF' and struct.unpack('<I', header[8:])[0] == size
+
+        def _run(self):
+            while True:
+                with self._cond:
+                    while self._running and not self._pending:
+                        self._cond.wait()
+                    if not self._running:
+                        return
+                    self._cond.wait(self.poll_interval)
+                    paths = list(self._pending)
+                now = time.monotonic()
+                for path in paths:
+                    try:
+                        st = os.stat(path)
+                        signature = (st.st_size, st.st_mtime_ns)
+                    except OSError:
+                        signature = None
+                    with self._cond:
+                        pending = self._pending.get(path)
+                        if pending is None:
+                            continue
+                        if signature is None or now - pending[0] > self.timeout:
+                            del self._pending[path]
+                            continue
+                        if signature != pending[2]:
+                            pending[1], pending[2] = max(now, pending[1]), signature
+                            continue
+                        if now - pending[1] < self.quiet_period or not self._complete(path, signature[0]):
+                            continue
+                        del self._pending[path]
+                    try:
+                        self.callback(path)
+                    except Exception as e:
+                        print(f"[VRED] Error handling {os.path.basename(path)}: {e}")
+
 # Configuration: Set the folder to watch and supported file formats
 EXPORTS_FOLDER = "/Users/shubhamjena/Desktop/Personal projects/blend-to-vred/blender_exports"
 SUPPORTED_FORMATS = ['.fbx', '.obj', '.dae', '.3ds', '.ply', '.stl', '.x3d', '.gltf', '.glb']
 
+# Material defaults applied to every newly loaded model
+MATERIAL_ROUGHNESS = 0.5
+MATERIAL_METALLIC = 0.0
+AMBIENT_LIGHT_INTENSITY = 0.3
+
+def _node_children(node):
+    # Children of a scene node in either the vrdNode (getChildren) or vrNodePtr API
+    if hasattr(node, 'getChildren'):
+        return node.getChildren()
+    if hasattr(node, 'getNChildren'):
+        return [node.getChild(i) for i in range(node.getNChildren())]
+    return []
+
+def subtree_materials(root):
+    # Unique materials used by the nodes under root, found without visiting the rest of the
+    # scene, so the cost follows the loaded file rather than everything already in VRED
+    materials, seen, stack = [], set(), [root]
+    while stack:
+        node = stack.pop()
+        material = node.getMaterial() if hasattr(node, 'getMaterial') else None
+        if material is not None:
+            key = material.getObjectId() if hasattr(material, 'getObjectId') else id(material)
+            if key not in seen:
+                seen.add(key)
+                materials.append(material)
+        stack.extend(_node_children(node))
+    return materials
+
+class LoadWorker:
+    # Runs model loads on one dedicated thread with a single-slot, latest-wins queue: a
+    # submit replaces any path still waiting, so a burst of exports loads the newest one
+    # instead of every file in turn. The load callback receives superseded(), which turns
+    # true once something newer is waiting, so it can stop between steps.
+    def __init__(self, load, name='vred-load-worker'):
+        self.load = load
+        self.skipped = 0  # paths replaced before they were loaded
+        self._pending = None
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._name = name
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def submit(self, path):
+        with self._cond:
+            if self._pending is not None and self._pending != path:
+                self.skipped += 1
+                print(f"[VRED] Skipping stale export: {os.path.basename(self._pending)}")
+            self._pending = path
+            self._cond.notify()
+
+    def superseded(self):
+        with self._cond:
+            return self._pending is not None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and self._pending is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                path, self._pending = self._pending, None
+            try:
+                self.load(path, self.superseded)
+            except Exception as e:
+                print(f"[VRED] Error loading {os.path.basename(path)}: {e}")
+
 # Handler class that reacts to file changes in the watched folder
 class VREDModelHandler(FileSystemEventHandler):
-    _last_reload = 0  # Used to prevent too-frequent reloads (debounce)
     _current_model_node = None  # Stores the currently loaded model node in VRED
     
-    def _should_reload(self, path):
-        # Checks if the file is a supported format and if enough time has passed since last reload
-        if not any(path.lower().endswith(ext) for ext in SUPPORTED_FORMATS):
-            return False
-        now = time.time()
-        if now - VREDModelHandler._last_reload < 1.5:
-            return False
-        VREDModelHandler._last_reload = now
-        return True
+    def __init__(self, on_loaded=None):
+        super().__init__()
+        # Settled files go to the load worker; watchdog and scheduler threads never wait on VRED.
+        # on_loaded(path, timings), if given, runs after each load with its per-step seconds.
+        self.on_loaded = on_loaded
+        self.worker = LoadWorker(self._reload_model)
+        # Formats without a length header get a longer quiet period before they count as written
+        self.scheduler = ChangeScheduler(self.worker.submit, extensions=SUPPORTED_FORMATS,
+                                         quiet_period=0.25, name='vred-change-scheduler')
+        self._lighting_applied = False
+    
+    def start(self):
+        self.worker.start()
+        self.scheduler.start()
+    
+    def stop(self):
+        self.scheduler.stop()
+        self.worker.stop()
     
-    def _reload_model(self, filepath):
-        # Loads a new model into VRED, removing the old one if present
+    def _reload_model(self, filepath, superseded=lambda: False):
+        # Loads a new model into VRED, removing the old one if present. Steps are timed;
+        # fit, materials and refresh are skipped when a newer export is already waiting,
+        # since the next load replaces this model straight away.
+        timings = {}
+        step = time.perf_counter()
+        
+        def lap(name):
+            nonlocal step
+            now = time.perf_counter()
+            timings[name] = now - step
+            step = now
         try:
             print(f"[VRED] Loading: {os.path.basename(filepath)}")
             # Remove previous model if it exists
@@ -35,99 +237,99 @@ class VREDModelHandler(FileSystemEventHandler):
                         VREDModelHandler._current_model_node.remove()
                     else:
                         vrNodeService.removeNode(VREDModelHandler._current_model_node)
+                    VREDModelHandler._current_model_node = None
                     print("[VRED] Removed previous model")
                 except Exception as e:
                     print(f"[VRED] Warning: Could not remove previous model - {e}")
+            lap('remove')
             # Load the new model file
             try:
                 VREDModelHandler._current_model_node = vrFileIO.load(filepath)
             except Exception as e:
                 print(f"[VRED] Error loading file: {e}")
-                return
-            if VREDModelHandler._current_model_node:
-                print(f"[VRED] Successfully loaded: {os.path.basename(filepath)}")
-                # Fit the camera to the new model
-                try:
-                    camera = vrCameraService.getActiveCamera()
-                    if camera:
-                        camera.fitAll()
-                    else:
-                        vrCamera.fitAll()
-                except Exception as e:
-                    print(f"[VRED] Warning: Could not fit camera - {e}")
-                # Update scene materials and lighting
-                self._update_scene()
-                # Refresh the VRED viewport
-                try:
-                    vrController.vrRefresh()
-                except Exception as e:
-                    print(f"[VRED] Warning: Could not refresh viewport - {e}")
-            else:
+                return timings
+            lap('load')
+            node = VREDModelHandler._current_model_node
+            if not node:
                 print(f"[VRED] Failed to load: {filepath}")
+                return timings
+            print(f"[VRED] Successfully loaded: {os.path.basename(filepath)}")
+            if superseded():
+                print(f"[VRED] Newer export waiting, skipping fit and refresh for {os.path.basename(filepath)}")
+                return timings
+            # Fit the camera to the new model
+            try:
+                camera = vrCameraService.getActiveCamera()
+                if camera:
+                    camera.fitAll()
+                else:
+                    vrCamera.fitAll()
+            except Exception as e:
+                print(f"[VRED] Warning: Could not fit camera - {e}")
+            lap('fit')
+            # Update materials and lighting for the new model only
+            self._update_scene(node)
+            lap('materials')
+            # Refresh the VRED viewport
+            try:
+                vrController.vrRefresh()
+            except Exception as e:
+                print(f"[VRED] Warning: Could not refresh viewport - {e}")
+            lap('refresh')
+            print(f"[VRED] {os.path.basename(filepath)} ready in {sum(timings.values()):.3f}s (" +
+                  ', '.join(f"{name} {seconds:.3f}s" for name, seconds in timings.items()) + ")")
         except Exception as e:
             print(f"[VRED] Error loading model: {e}")
+        finally:
+            if self.on_loaded is not None:
+                self.on_loaded(filepath, timings)
+        return timings
     
-    def _update_scene(self):
-        # Updates materials and lighting in the scene for consistency
+    def _update_scene(self, root):
+        # Applies material defaults to the materials of the loaded subtree. The ambient
+        # light is scene-wide and never changes, so it is set once rather than per load.
         try:
-            # Update all materials' properties if possible
-            if hasattr(vrMaterialService, 'getAllMaterials'):
-                materials = vrMaterialService.getAllMaterials()
-                for material in materials:
-                    try:
-                        if hasattr(material, 'setRoughness'):
-                            material.setRoughness(0.5)
-                        if hasattr(material, 'setMetallic'):
-                            material.setMetallic(0.0)
-                    except Exception as e:
-                        print(f"[VRED] Warning: Could not update material - {e}")
-                        continue
+            for material in subtree_materials(root):
+                try:
+                    if hasattr(material, 'setRoughness'):
+                        material.setRoughness(MATERIAL_ROUGHNESS)
+                    if hasattr(material, 'setMetallic'):
+                        material.setMetallic(MATERIAL_METALLIC)
+                except Exception as e:
+                    print(f"[VRED] Warning: Could not update material - {e}")
+                    continue
             # Set ambient light intensity if possible
-            if hasattr(vrLightService, 'setAmbientLightIntensity'):
+            if not self._lighting_applied and hasattr(vrLightService, 'setAmbientLightIntensity'):
                 try:
-                    vrLightService.setAmbientLightIntensity(0.3)
+                    vrLightService.setAmbientLightIntensity(AMBIENT_LIGHT_INTENSITY)
+                    self._lighting_applied = True
                 except Exception as e:
                     print(f"[VRED] Warning: Could not set ambient light - {e}")
         except Exception as e:
-            print(f"[VREZ] Error updating scene: {e}")
-    
-    def _ensure_valid_path(self, path):
-        # Checks if the file exists and is not being written to (size is stable)
-        if not os.path.exists(path):
-            return False
-        try:
-            size1 = os.path.getsize(path)
-            time.sleep(0.1)
-            size2 = os.path.getsize(path)
-            return size1 == size2
-        except:
-            return False
+            print(f"[VRED] Error updating scene: {e}")
     
     def on_created(self, event):
         # Called when a new file is created in the watched folder
-        if self._should_reload(event.src_path) and self._ensure_valid_path(event.src_path):
-            time.sleep(0.5)  # Wait a bit to ensure file is fully written
-            self._reload_model(event.src_path)
+        if not event.is_directory:
+            self.scheduler.touch(event.src_path)
     
     def on_modified(self, event):
         # Called when a file is modified in the watched folder
-        if self._should_reload(event.src_path) and self._ensure_valid_path(event.src_path):
-            time.sleep(0.5)
-            self._reload_model(event.src_path)
+        if not event.is_directory:
+            self.scheduler.touch(event.src_path)
     
     def on_moved(self, event):
         # Called when a file is moved/renamed into the watched folder
-        if self._should_reload(event.dest_path) and self._ensure_valid_path(event.dest_path):
-            self._reload_model(event.dest_path)
+        if not event.is_directory:
+            self.scheduler.discard(event.src_path)
+            self.scheduler.touch(event.dest_path)
 
 def check_vred_environment():
     # Checks if the script is running inside VRED by looking for required modules
     required_modules = ['vrFileIO', 'vrNodeService', 'vrController']
     missing_modules = []
     for module in required_modules:
-        try:
-            globals()[module]
-        except NameError:
+        if module not in globals():
             missing_modules.append(module)
     if missing_modules:
         print(f"[VRED] Warning: Missing modules: {missing_modules}")
@@ -146,8 +348,10 @@ def start_file_watcher():
         return
     print(f"[VRED] Starting file watcher on: {EXPORTS_FOLDER}")
     print(f"[VRED] Watching for files: {', '.join(SUPPORTED_FORMATS)}")
+    handler = VREDModelHandler()
+    handler.start()
     observer = Observer()
-    observer.schedule(VREDModelHandler(), path=EXPORTS_FOLDER, recursive=False)
+    observer.schedule(handler, path=EXPORTS_FOLDER, recursive=False)
     observer.start()
     try:
         while True:
@@ -159,6 +363,7 @@ def start_file_watcher():
         print(f"[VRED] Error in file watcher: {e}")
         observer.stop()
     observer.join()
+    handler.stop()
 
 def load_latest_model():
     # Loads the most recently modified model file on startup